@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from analytics.trending import compact_scores
+
+
+class Command(BaseCommand):
+    help = "Rescale trending scores to the current era and drop the ones that have decayed away."
+
+    def handle(self, *args, **options):
+        deleted = compact_scores()
+        self.stdout.write(self.style.SUCCESS(f"Dropped {deleted} stale trending scores."))
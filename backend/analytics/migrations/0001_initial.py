@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('menu', '0002_alter_menu_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuItemSalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the hour')),
+                ('order_count', models.IntegerField(default=0)),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cancelled_count', models.IntegerField(default=0)),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='menu.menu')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_sales_rollups', to='authentication.userprofile')),
+            ],
+            options={
+                'verbose_name_plural': 'Menu item sales rollups',
+                'ordering': ['bucket'],
+                'indexes': [models.Index(fields=['vendor', 'bucket'], name='item_rollup_vendor_bucket')],
+                'constraints': [models.UniqueConstraint(fields=('menu_item', 'vendor', 'bucket'), name='unique_menu_item_sales_bucket')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VendorSalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the hour')),
+                ('order_count', models.IntegerField(default=0)),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cancelled_count', models.IntegerField(default=0)),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='authentication.userprofile')),
+            ],
+            options={
+                'verbose_name_plural': 'Vendor sales rollups',
+                'ordering': ['bucket'],
+                'constraints': [models.UniqueConstraint(fields=('vendor', 'bucket'), name='unique_vendor_sales_bucket')],
+            },
+        ),
+    ]
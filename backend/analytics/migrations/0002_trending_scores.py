@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('authentication', '0001_initial'),
+        ('menu', '0002_alter_menu_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingItemScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('era', models.IntegerField()),
+                ('score', models.FloatField(default=0)),
+                ('menu_item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='trending_score', to='menu.menu')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trending_item_scores', to='authentication.userprofile')),
+            ],
+            options={
+                'verbose_name_plural': 'Trending item scores',
+                'indexes': [models.Index(fields=['era', '-score'], name='trending_item_era_score')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingVendorScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('era', models.IntegerField()),
+                ('score', models.FloatField(default=0)),
+                ('vendor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='trending_score', to='authentication.userprofile')),
+            ],
+            options={
+                'verbose_name_plural': 'Trending vendor scores',
+                'indexes': [models.Index(fields=['era', '-score'], name='trending_vendor_era_score')],
+            },
+        ),
+    ]
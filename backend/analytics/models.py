@@ -0,0 +1,97 @@
+from django.db import models
+
+from auth.models import UserProfile
+from menu.models import Menu
+
+
+# Create your models here.
+class VendorSalesRollup(models.Model):
+    """
+    Hourly sales totals for one vendor, bucketed by the hour orders were placed.
+    Quantity excludes orders that were later cancelled; revenue only counts
+    orders that reached orders.stats.REVENUE_STATUSES.
+    """
+    vendor = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='sales_rollups')
+    bucket = models.DateTimeField(help_text="Start of the hour")
+    order_count = models.IntegerField(default=0)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cancelled_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Vendor {self.vendor_id} sales at {self.bucket}"
+
+    class Meta:
+        verbose_name_plural = "Vendor sales rollups"
+        ordering = ['bucket']
+        constraints = [
+            models.UniqueConstraint(fields=['vendor', 'bucket'], name='unique_vendor_sales_bucket'),
+        ]
+
+
+class MenuItemSalesRollup(models.Model):
+    """
+    Hourly sales totals for one menu item, bucketed by the hour orders were placed.
+    Quantity excludes orders that were later cancelled; revenue only counts
+    orders that reached orders.stats.REVENUE_STATUSES.
+    """
+    menu_item = models.ForeignKey(Menu, on_delete=models.CASCADE, related_name='sales_rollups')
+    vendor = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='item_sales_rollups')
+    bucket = models.DateTimeField(help_text="Start of the hour")
+    order_count = models.IntegerField(default=0)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cancelled_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Menu item {self.menu_item_id} sales at {self.bucket}"
+
+    class Meta:
+        verbose_name_plural = "Menu item sales rollups"
+        ordering = ['bucket']
+        constraints = [
+            models.UniqueConstraint(fields=['menu_item', 'vendor', 'bucket'], name='unique_menu_item_sales_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['vendor', 'bucket'], name='item_rollup_vendor_bucket'),
+        ]
+
+
+class TrendingItemScore(models.Model):
+    """
+    Exponentially decayed order count of one menu item.
+
+    ``score`` is scaled to the start of ``era`` (see analytics/trending.py),
+    so rows of the same era rank by their stored score.
+    """
+    menu_item = models.OneToOneField(Menu, on_delete=models.CASCADE, related_name='trending_score')
+    vendor = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='trending_item_scores')
+    era = models.IntegerField()
+    score = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"Menu item {self.menu_item_id} trending score"
+
+    class Meta:
+        verbose_name_plural = "Trending item scores"
+        indexes = [
+            models.Index(fields=['era', '-score'], name='trending_item_era_score'),
+        ]
+
+
+class TrendingVendorScore(models.Model):
+    """
+    Exponentially decayed order count of one vendor, scaled like TrendingItemScore.
+    """
+    vendor = models.OneToOneField(UserProfile, on_delete=models.CASCADE, related_name='trending_score')
+    era = models.IntegerField()
+    score = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"Vendor {self.vendor_id} trending score"
+
+    class Meta:
+        verbose_name_plural = "Trending vendor scores"
+        indexes = [
+            models.Index(fields=['era', '-score'], name='trending_vendor_era_score'),
+        ]
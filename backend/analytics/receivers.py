@@ -0,0 +1,20 @@
+# analytics/receivers.py
+from django.dispatch import receiver
+
+from orders.signals import orders_created, orders_status_changed
+from . import rollups, trending
+
+
+@receiver(orders_created)
+def update_rollups_on_create(sender, orders, **kwargs):
+    rollups.record_orders_created(orders)
+
+
+@receiver(orders_created)
+def update_trending_on_create(sender, orders, **kwargs):
+    trending.record_orders_created(orders)
+
+
+@receiver(orders_status_changed)
+def update_rollups_on_status_change(sender, changes, **kwargs):
+    rollups.record_status_changes(changes)
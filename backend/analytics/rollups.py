@@ -0,0 +1,184 @@
+# analytics/rollups.py
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from orders.models import ArchivedOrder, Order
+from orders.stats import REVENUE_STATUSES
+from .models import MenuItemSalesRollup, VendorSalesRollup
+
+PERIODS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+COUNTER_FIELDS = ['order_count', 'quantity', 'revenue', 'cancelled_count']
+
+
+def hour_bucket(moment):
+    """
+    Return the start of the hour a timestamp falls in, in the current time
+    zone like TruncHour, so live updates and rebuilds fill the same buckets.
+    """
+    return timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert(model, conflict_fields, deltas):
+    """
+    Add counter deltas to many rollup rows with one INSERT ... ON CONFLICT DO
+    UPDATE statement, creating rows that do not exist yet.
+
+    ``deltas`` maps a tuple of ``conflict_fields`` values to a dict of
+    counter increments.
+    """
+    if not deltas:
+        return
+
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    fields = [model._meta.get_field(name) for name in conflict_fields + COUNTER_FIELDS]
+    placeholders = '(' + ', '.join(['%s'] * len(fields)) + ')'
+
+    params = []
+    for key, counters in deltas.items():
+        values = list(key) + [counters.get(name, 0) for name in COUNTER_FIELDS]
+        params.extend(field.get_db_prep_value(value, connection) for field, value in zip(fields, values))
+
+    sql = (
+        f"INSERT INTO {table} ({', '.join(quote(field.column) for field in fields)}) "
+        f"VALUES {', '.join([placeholders] * len(deltas))} "
+        f"ON CONFLICT ({', '.join(quote(field.column) for field in fields[:len(conflict_fields)])}) DO UPDATE SET "
+        + ', '.join(
+            f"{quote(name)} = {table}.{quote(name)} + excluded.{quote(name)}" for name in COUNTER_FIELDS
+        )
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def _apply(vendor_deltas, item_deltas):
+    _upsert(VendorSalesRollup, ['vendor', 'bucket'], vendor_deltas)
+    _upsert(MenuItemSalesRollup, ['menu_item', 'vendor', 'bucket'], item_deltas)
+
+
+def _counts(order, status):
+    """Return the counters an order in ``status`` contributes to its bucket."""
+    cancelled = status == 'cancelled'
+    return {
+        'cancelled_count': int(cancelled),
+        'quantity': 0 if cancelled else order.quantity,
+        'revenue': order.total_price if status in REVENUE_STATUSES else 0,
+    }
+
+
+def _collect(changes):
+    """
+    Group per-order counter changes by vendor hour and menu item hour.
+    ``changes`` yields ``(order, counters)`` pairs.
+    """
+    vendor_deltas = defaultdict(lambda: defaultdict(int))
+    item_deltas = defaultdict(lambda: defaultdict(int))
+    for order, counters in changes:
+        bucket = hour_bucket(order.created_at)
+        for deltas in (
+            vendor_deltas[(order.vendor_id, bucket)],
+            item_deltas[(order.menu_item_id, order.vendor_id, bucket)],
+        ):
+            _add(deltas, counters)
+    return vendor_deltas, item_deltas
+
+
+def record_orders_created(orders):
+    """Add newly placed orders to their hourly buckets."""
+    _apply(*_collect(
+        (order, {'order_count': 1, **_counts(order, order.status)}) for order in orders
+    ))
+
+
+def record_status_changes(changes):
+    """
+    Move orders between their bucket's counters as they change status:
+    cancelled orders leave quantity, and revenue follows REVENUE_STATUSES
+    like orders.stats.
+    """
+    deltas = []
+    for order, previous_status in changes:
+        before, after = _counts(order, previous_status), _counts(order, order.status)
+        delta = {name: after[name] - before[name] for name in after}
+        if any(delta.values()):
+            deltas.append((order, delta))
+    if deltas:
+        _apply(*_collect(deltas))
+
+
+def rebuild_rollups(since=None):
+    """
+    Recompute every rollup bucket (from ``since`` onwards) from the orders table.
+    Returns the number of vendor and menu item buckets written.
+    """
+    sources = [Order.objects.all(), ArchivedOrder.objects.all()]
+    vendor_rollups = VendorSalesRollup.objects.all()
+    item_rollups = MenuItemSalesRollup.objects.all()
+    if since is not None:
+        since = hour_bucket(since)
+        sources = [orders.filter(created_at__gte=since) for orders in sources]
+        vendor_rollups = vendor_rollups.filter(bucket__gte=since)
+        item_rollups = item_rollups.filter(bucket__gte=since)
+
+    not_cancelled = ~Q(status='cancelled')
+    counters = {
+        'order_count': Count('id'),
+        'quantity': Sum('quantity', filter=not_cancelled, default=0),
+        'revenue': Sum('total_price', filter=Q(status__in=REVENUE_STATUSES), default=0),
+        'cancelled_count': Count('id', filter=Q(status='cancelled')),
+    }
+
+    # Live and archived orders are aggregated separately and summed per bucket
+    vendor_deltas = defaultdict(lambda: defaultdict(int))
+    item_deltas = defaultdict(lambda: defaultdict(int))
+    for orders in sources:
+        hourly = orders.annotate(hour=TruncHour('created_at')).order_by()
+        for row in hourly.values('vendor_id', 'hour').annotate(**counters).iterator():
+            _add(vendor_deltas[(row.pop('vendor_id'), row.pop('hour'))], row)
+        for row in hourly.values('menu_item_id', 'vendor_id', 'hour').annotate(**counters).iterator():
+            _add(item_deltas[(row.pop('menu_item_id'), row.pop('vendor_id'), row.pop('hour'))], row)
+
+    with transaction.atomic():
+        vendor_rollups.delete()
+        item_rollups.delete()
+        vendor_rows = VendorSalesRollup.objects.bulk_create(
+            VendorSalesRollup(vendor_id=vendor_id, bucket=bucket, **row)
+            for (vendor_id, bucket), row in vendor_deltas.items()
+        )
+        item_rows = MenuItemSalesRollup.objects.bulk_create(
+            MenuItemSalesRollup(menu_item_id=menu_item_id, vendor_id=vendor_id, bucket=bucket, **row)
+            for (menu_item_id, vendor_id, bucket), row in item_deltas.items()
+        )
+    return len(vendor_rows), len(item_rows)
+
+
+def _add(totals, row):
+    for name, value in row.items():
+        totals[name] += value
+
+
+def sales_series(rollups, period):
+    """
+    Roll hourly buckets up to day/week/month periods.
+    """
+    trunc = PERIODS[period]
+    return list(
+        rollups.annotate(period_start=trunc('bucket'))
+        .values('period_start')
+        .annotate(
+            order_count=Sum('order_count'),
+            quantity=Sum('quantity'),
+            revenue=Sum('revenue'),
+            cancelled_count=Sum('cancelled_count'),
+        )
+        .order_by('period_start')
+    )
@@ -0,0 +1,34 @@
+# analytics/serializers.py
+from rest_framework import serializers
+
+
+class SalesPointSerializer(serializers.Serializer):
+    """
+    Serializer for one period of a sales series.
+    """
+    period_start = serializers.DateTimeField()
+    order_count = serializers.IntegerField()
+    quantity = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    cancelled_count = serializers.IntegerField()
+
+
+class TrendingItemSerializer(serializers.Serializer):
+    """
+    Serializer for one menu item on the trending leaderboard.
+    """
+    menu_item = serializers.IntegerField()
+    name = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    vendor = serializers.IntegerField()
+    vendor_name = serializers.CharField(allow_null=True)
+    score = serializers.FloatField(help_text="Order count decayed by age")
+
+
+class TrendingVendorSerializer(serializers.Serializer):
+    """
+    Serializer for one vendor on the trending leaderboard.
+    """
+    vendor = serializers.IntegerField()
+    vendor_name = serializers.CharField(allow_null=True)
+    score = serializers.FloatField(help_text="Order count decayed by age")
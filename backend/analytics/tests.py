@@ -0,0 +1,179 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from auth.models import UserProfile
+from menu.models import Menu
+from analytics.models import MenuItemSalesRollup, TrendingItemScore, TrendingVendorScore, VendorSalesRollup
+from analytics.trending import _weight, current_era
+
+
+class SalesAnalyticsTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        # Users
+        self.vendor = UserProfile.objects.create_user(
+            username="vendor1", password="pass1234", role="vendor", vendor_name="Vendor One"
+        )
+        self.student = UserProfile.objects.create_user(
+            username="student1", password="pass1234", role="student"
+        )
+
+        # Menu items owned by vendor
+        self.burger = Menu.objects.create(name="Burger", price=10.00, vendor=self.vendor)
+        self.fries = Menu.objects.create(name="Fries", price=4.00, vendor=self.vendor)
+
+    def authenticate(self, user):
+        self.client.force_authenticate(user=user)
+
+    def place_orders(self):
+        self.authenticate(self.student)
+        response = self.client.post(reverse("order:order-checkout"), {"items": [
+            {"menu_item": self.burger.id, "quantity": 2},
+            {"menu_item": self.fries.id, "quantity": 1},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        fries_order = next(item["id"] for item in response.data["items"] if item["menu_item_name"] == "Fries")
+        self.client.patch(reverse("order:order-cancel", args=[fries_order]))
+        burger_order = next(item["id"] for item in response.data["items"] if item["menu_item_name"] == "Burger")
+
+        # revenue counts once the burger order is ready, like the order stats
+        self.authenticate(self.vendor)
+        for next_status in ("preparing", "ready"):
+            self.client.patch(
+                reverse("order:order-update-status", args=[burger_order]), {"status": next_status}, format="json"
+            )
+        self.authenticate(self.student)
+
+    def test_rollups_are_maintained_on_order_writes(self):
+        self.place_orders()
+
+        rollup = VendorSalesRollup.objects.get(vendor=self.vendor)
+        self.assertEqual(rollup.order_count, 2)
+        self.assertEqual(rollup.cancelled_count, 1)
+        self.assertEqual(rollup.quantity, 2)
+        self.assertEqual(str(rollup.revenue), "20.00")
+
+        # pending orders are not revenue yet
+        self.client.post(reverse("order:order-checkout"), {"items": [
+            {"menu_item": self.fries.id, "quantity": 1},
+        ]}, format="json")
+        rollup = VendorSalesRollup.objects.get(vendor=self.vendor)
+        self.assertEqual((rollup.order_count, rollup.quantity, str(rollup.revenue)), (3, 3, "20.00"))
+
+        # rebuilding from the orders table gives the same buckets
+        call_command("rebuild_sales_rollups", stdout=StringIO())
+        rebuilt = VendorSalesRollup.objects.get(vendor=self.vendor)
+        self.assertEqual(
+            (rebuilt.order_count, rebuilt.cancelled_count, rebuilt.quantity, rebuilt.revenue),
+            (rollup.order_count, rollup.cancelled_count, rollup.quantity, rollup.revenue),
+        )
+        self.assertEqual(MenuItemSalesRollup.objects.get(menu_item=self.fries).cancelled_count, 1)
+
+    @override_settings(TIME_ZONE="Asia/Kolkata")
+    def test_live_and_rebuilt_rollups_share_local_hour_buckets(self):
+        self.place_orders()
+        live = list(VendorSalesRollup.objects.values_list("bucket", "order_count"))
+
+        call_command("rebuild_sales_rollups", stdout=StringIO())
+        self.assertEqual(list(VendorSalesRollup.objects.values_list("bucket", "order_count")), live)
+        # half-hour offset: local hours start at :30 UTC, as stored
+        self.assertEqual(live[0][0].minute, 30)
+
+    def test_sales_endpoint_serves_series_for_vendor(self):
+        self.place_orders()
+        url = reverse("analytics:sales")
+
+        # students have no access
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.authenticate(self.vendor)
+        response = self.client.get(url, {"period": "month"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["series"]), 1)
+        self.assertEqual(response.data["series"][0]["revenue"], "20.00")
+
+        response = self.client.get(url, {"period": "day", "menu_item": self.burger.id})
+        self.assertEqual(response.data["series"][0]["quantity"], 2)
+
+        response = self.client.get(url, {"period": "year"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TrendingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = UserProfile.objects.create_user(
+            username="vendor1", password="pass1234", role="vendor", vendor_name="Vendor One"
+        )
+        self.other_vendor = UserProfile.objects.create_user(
+            username="vendor2", password="pass1234", role="vendor", vendor_name="Vendor Two"
+        )
+        self.student = UserProfile.objects.create_user(
+            username="student1", password="pass1234", role="student"
+        )
+        self.burger = Menu.objects.create(name="Burger", price=10.00, vendor=self.vendor)
+        self.fries = Menu.objects.create(name="Fries", price=4.00, vendor=self.vendor)
+        self.salad = Menu.objects.create(name="Salad", price=6.00, vendor=self.other_vendor)
+        self.client.force_authenticate(user=self.student)
+
+    def order(self, *items):
+        response = self.client.post(reverse("order:order-checkout"), {"items": [
+            {"menu_item": item.id, "quantity": 1} for item in items
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_leaderboards_rank_by_decayed_order_count(self):
+        self.order(self.burger, self.fries)
+        self.order(self.burger)
+        self.order(self.salad)
+
+        # reading a leaderboard never touches the orders table
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("analytics:trending", args=["items"]), {"limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any("orders_" in query["sql"] for query in queries.captured_queries))
+        # Salad and Fries were ordered once each, the more recent order ranks higher
+        self.assertEqual([entry["name"] for entry in response.data["results"]], ["Burger", "Salad"])
+        self.assertAlmostEqual(response.data["results"][0]["score"], 2, places=2)
+
+        response = self.client.get(reverse("analytics:trending", args=["vendors"]))
+        self.assertEqual([entry["vendor"] for entry in response.data["results"]], [self.vendor.id, self.other_vendor.id])
+
+        # the cached leaderboard is served without queries
+        with self.assertNumQueries(0):
+            self.client.get(reverse("analytics:trending", args=["vendors"]))
+
+        response = self.client.get(reverse("analytics:trending", args=["menus"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_compaction_drops_stale_scores(self):
+        self.order(self.burger)
+        self.order(self.salad)
+        era = current_era()
+        TrendingItemScore.objects.filter(menu_item=self.salad).update(era=era - 3)
+        TrendingVendorScore.objects.filter(vendor=self.vendor).update(era=era - 1)
+
+        call_command("compact_trending", stdout=StringIO())
+
+        self.assertEqual(list(TrendingItemScore.objects.values_list("menu_item", flat=True)), [self.burger.id])
+        # a previous-era score is rescaled to the current era, or dropped once it has decayed away
+        for score in TrendingVendorScore.objects.all():
+            self.assertEqual(score.era, era)
+
+        # a new order on top of a row older than the previous era restarts it from that order alone
+        TrendingItemScore.objects.filter(menu_item=self.burger).update(era=era - 2, score=1000)
+        self.order(self.burger)
+        score = TrendingItemScore.objects.get(menu_item=self.burger)
+        self.assertEqual(score.era, era)
+        self.assertAlmostEqual(score.score / _weight(timezone.now(), era), 1, places=2)
@@ -0,0 +1,185 @@
+# analytics/trending.py
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, F, FloatField, When
+from django.utils import timezone
+
+from .models import TrendingItemScore, TrendingVendorScore
+
+# Scores are kept with forward decay: an order placed at time t adds
+# 2 ** ((t - era_start) / half_life) to its row, so older orders weigh
+# exponentially less than newer ones without rows ever being rewritten on
+# read. Scaling against the start of a fixed-length era keeps the weights
+# small; a row from the previous era is carried over by multiplying it with
+# 2 ** (-ERA_SECONDS / half_life), and anything older has decayed to nothing.
+ERA_SECONDS = 7 * 24 * 3600
+
+KINDS = {
+    'items': TrendingItemScore,
+    'vendors': TrendingVendorScore,
+}
+
+CACHE_KEY = 'analytics:trending:{kind}:{limit}'
+
+
+def _half_life():
+    return settings.TRENDING_HALF_LIFE_HOURS * 3600
+
+
+def current_era(now=None):
+    return int((now or timezone.now()).timestamp() // ERA_SECONDS)
+
+
+def _weight(moment, era):
+    """Score an order placed at ``moment`` adds to a row of ``era``."""
+    return 2 ** ((moment.timestamp() - era * ERA_SECONDS) / _half_life())
+
+
+def _carry():
+    """Factor that rescales a score from one era to the next."""
+    return 2 ** (-ERA_SECONDS / _half_life())
+
+
+def _upsert(model, key_fields, increments, era):
+    """
+    Add decayed increments to many score rows with one INSERT ... ON CONFLICT
+    DO UPDATE statement, carrying rows of the previous era over and resetting
+    rows that are older than that.
+
+    ``increments`` maps a tuple of ``key_fields`` values to a score increment
+    scaled to ``era``.
+    """
+    if not increments:
+        return
+
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    fields = [model._meta.get_field(name) for name in key_fields + ['era', 'score']]
+    placeholders = '(' + ', '.join(['%s'] * len(fields)) + ')'
+
+    params = []
+    for key, increment in increments.items():
+        values = list(key) + [era, increment]
+        params.extend(field.get_db_prep_value(value, connection) for field, value in zip(fields, values))
+
+    score, row_era = f"{table}.{quote('score')}", f"{table}.{quote('era')}"
+    carry = _carry()
+    updates = [
+        f"{quote('score')} = CASE"
+        f" WHEN {row_era} = excluded.{quote('era')} THEN {score} + excluded.{quote('score')}"
+        f" WHEN {row_era} = excluded.{quote('era')} - 1 THEN {score} * {carry!r} + excluded.{quote('score')}"
+        f" WHEN {row_era} = excluded.{quote('era')} + 1 THEN {score} + excluded.{quote('score')} * {carry!r}"
+        f" ELSE excluded.{quote('score')} END",
+        f"{quote('era')} = CASE WHEN {row_era} > excluded.{quote('era')} THEN {row_era}"
+        f" ELSE excluded.{quote('era')} END",
+    ]
+    # Any other column (the item's vendor) follows the latest order
+    updates += [
+        f"{quote(field.column)} = excluded.{quote(field.column)}" for field in fields[1:len(key_fields)]
+    ]
+
+    sql = (
+        f"INSERT INTO {table} ({', '.join(quote(field.column) for field in fields)}) "
+        f"VALUES {', '.join([placeholders] * len(increments))} "
+        f"ON CONFLICT ({quote(fields[0].column)}) DO UPDATE SET " + ', '.join(updates)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def record_orders_created(orders):
+    """Count newly placed orders towards their item's and vendor's score."""
+    era = current_era()
+    item_increments = defaultdict(float)
+    vendor_increments = defaultdict(float)
+    for order in orders:
+        weight = _weight(order.created_at, era)
+        item_increments[(order.menu_item_id, order.vendor_id)] += weight
+        vendor_increments[(order.vendor_id,)] += weight
+    _upsert(TrendingItemScore, ['menu_item', 'vendor'], item_increments, era)
+    _upsert(TrendingVendorScore, ['vendor'], vendor_increments, era)
+
+
+def _ranked(model, now):
+    """Rows still carrying a score, annotated with ``rank`` scaled to the current era."""
+    era = current_era(now)
+    return model.objects.filter(era__gte=era - 1).annotate(rank=Case(
+        When(era=era, then=F('score')),
+        default=F('score') * _carry(),
+        output_field=FloatField(),
+    ))
+
+
+def _decayed(rank, now):
+    """Turn a rank scaled to the current era into an order count decayed to now."""
+    return round(rank / _weight(now, current_era(now)), 3)
+
+
+def top_items(limit):
+    now = timezone.now()
+    rows = (
+        _ranked(TrendingItemScore, now)
+        .filter(menu_item__available=True)
+        .select_related('menu_item', 'vendor')
+        .order_by('-rank', 'menu_item_id')[:limit]
+    )
+    return [{
+        'menu_item': row.menu_item_id,
+        'name': row.menu_item.name,
+        'price': row.menu_item.price,
+        'vendor': row.vendor_id,
+        'vendor_name': row.vendor.vendor_name,
+        'score': _decayed(row.rank, now),
+    } for row in rows]
+
+
+def top_vendors(limit):
+    now = timezone.now()
+    rows = _ranked(TrendingVendorScore, now).select_related('vendor').order_by('-rank', 'vendor_id')[:limit]
+    return [{
+        'vendor': row.vendor_id,
+        'vendor_name': row.vendor.vendor_name,
+        'score': _decayed(row.rank, now),
+    } for row in rows]
+
+
+LEADERBOARDS = {
+    'items': top_items,
+    'vendors': top_vendors,
+}
+
+
+def leaderboard(kind, limit):
+    """
+    Return the top ``limit`` items or vendors by decayed order count, cached
+    for ``TRENDING_CACHE_TIMEOUT`` seconds. Reads only the score tables.
+    """
+    key = CACHE_KEY.format(kind=kind, limit=limit)
+    entries = cache.get(key)
+    if entries is None:
+        entries = LEADERBOARDS[kind](limit)
+        cache.set(key, entries, settings.TRENDING_CACHE_TIMEOUT)
+    return entries
+
+
+def compact_scores(now=None):
+    """
+    Rescale rows of the previous era to the current one and delete rows whose
+    decayed score has dropped below ``TRENDING_MIN_SCORE``, including every
+    row older than the previous era. Returns the number of rows deleted.
+    """
+    now = now or timezone.now()
+    era = current_era(now)
+    # A row of the current era scores below the minimum once its stored score
+    # is below the minimum scaled to the current era
+    threshold = settings.TRENDING_MIN_SCORE * _weight(now, era)
+
+    deleted = 0
+    for model in KINDS.values():
+        model.objects.filter(era=era - 1).update(score=F('score') * _carry(), era=era)
+        deleted += model.objects.filter(era__lt=era).delete()[0]
+        deleted += model.objects.filter(era=era, score__lt=threshold).delete()[0]
+    return deleted
@@ -0,0 +1,10 @@
+# analytics/urls.py
+from django.urls import path
+from . import views
+
+app_name = 'analytics'
+
+urlpatterns = [
+    path('sales/', views.SalesAnalyticsView.as_view(), name='sales'),
+    path('trending/<str:kind>/', views.TrendingView.as_view(), name='trending'),
+]
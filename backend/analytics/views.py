@@ -0,0 +1,118 @@
+# analytics/views.py
+from datetime import timedelta
+
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework import permissions, status
+
+from orders.filters import day_start
+from orders.permissions import IsVendorOrAdmin
+from .models import MenuItemSalesRollup, VendorSalesRollup
+from .rollups import PERIODS, sales_series
+from .serializers import SalesPointSerializer, TrendingItemSerializer, TrendingVendorSerializer
+from .trending import LEADERBOARDS, leaderboard
+
+MAX_TRENDING_LIMIT = 50
+
+
+@extend_schema(
+    description="Sales series per day, week or month, served from hourly rollups. "
+                "Vendors see their own sales; admins see all vendors or one vendor with ?vendor=.",
+    summary="Sales analytics",
+    responses={
+        200: OpenApiResponse(response=SalesPointSerializer, description="Sales series"),
+        400: OpenApiResponse(description="Bad request"),
+        403: OpenApiResponse(description="Forbidden")
+    }
+)
+class SalesAnalyticsView(APIView):
+    """
+    Sales series per day, week or month, served from hourly rollups.
+    """
+    permission_classes = [IsVendorOrAdmin]
+    
+    def get(self, request):
+        period = request.GET.get('period', 'day')
+        if period not in PERIODS:
+            return Response(
+                {'error': f"period must be one of: {', '.join(PERIODS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Filter by menu item uses the per-item rollups
+        menu_item_id = request.GET.get('menu_item')
+        if menu_item_id:
+            try:
+                queryset = MenuItemSalesRollup.objects.filter(menu_item_id=int(menu_item_id))
+            except ValueError:
+                return Response({'error': 'Invalid menu_item.'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            queryset = VendorSalesRollup.objects.all()
+        
+        # Scope by vendor
+        if request.user.role == 'vendor':
+            vendor_id = request.user.id
+        else:
+            vendor_id = request.GET.get('vendor')
+        if vendor_id:
+            try:
+                queryset = queryset.filter(vendor_id=int(vendor_id))
+            except ValueError:
+                return Response({'error': 'Invalid vendor.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Date range, last 30 days by default
+        end = day_start(request.GET.get('end_date'))
+        end = end + timedelta(days=1) if end else timezone.now()
+        start = day_start(request.GET.get('start_date')) or end - timedelta(days=30)
+        queryset = queryset.filter(bucket__gte=start, bucket__lt=end)
+        
+        series = sales_series(queryset, period)
+        
+        return Response({
+            'period': period,
+            'start': start,
+            'end': end,
+            'series': SalesPointSerializer(series, many=True).data
+        })
+
+
+@extend_schema(
+    description="Top menu items (`items`) or vendors (`vendors`) by order count, with older orders "
+                "weighing exponentially less. Served from incrementally maintained scores; ?limit= defaults to 10.",
+    summary="Trending leaderboard",
+    responses={
+        200: OpenApiResponse(response=TrendingItemSerializer(many=True), description="Trending items or vendors"),
+        400: OpenApiResponse(description="Bad request"),
+        404: OpenApiResponse(description="Unknown leaderboard")
+    }
+)
+class TrendingView(APIView):
+    """
+    Trending menu items or vendors, read from the decayed score tables.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializers = {
+        'items': TrendingItemSerializer,
+        'vendors': TrendingVendorSerializer,
+    }
+
+    def get(self, request, kind):
+        if kind not in LEADERBOARDS:
+            return Response(
+                {'error': f"Unknown leaderboard. Use one of: {', '.join(LEADERBOARDS)}."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            limit = int(request.GET.get('limit', 10))
+        except ValueError:
+            return Response({'error': 'Invalid limit.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, MAX_TRENDING_LIMIT))
+
+        entries = leaderboard(kind, limit)
+        return Response({
+            'kind': kind,
+            'results': self.serializers[kind](entries, many=True).data
+        })
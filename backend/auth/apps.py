@@ -5,3 +5,7 @@ class AuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auth'
     label = 'authentication'
+
+    def ready(self):
+        # Connect user signal receivers
+        from . import receivers  # noqa: F401
@@ -32,3 +32,12 @@ class UserProfile(User):
     @property
     def is_student(self):
         return self.role == 'student'
+
+
+def is_admin(user):
+    """
+    Whether a request's user is an admin. JWT authentication yields a plain
+    auth.User carrying the token's role claim rather than a UserProfile, so
+    UserProfile.is_admin cannot be relied on.
+    """
+    return getattr(user, 'role', None) == 'admin' or user.is_superuser
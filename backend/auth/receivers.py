@@ -0,0 +1,18 @@
+# auth/receivers.py
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from turbocafe.authentication import forget_inactive_users
+
+from .models import UserProfile
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=User)
+def refresh_inactive_users(sender, instance, update_fields=None, **kwargs):
+    # Stateless menu reads check deactivation against a cached list of ids
+    if update_fields is not None and 'is_active' not in update_fields:
+        return
+    forget_inactive_users()
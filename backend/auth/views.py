@@ -63,6 +63,7 @@ class UserLoginView(APIView):
     Handles user login. Validates user credentials and returns JWT tokens.
     """
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'login'
     
     def post(self, request):
         """
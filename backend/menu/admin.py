@@ -1,7 +1,8 @@
 from django.contrib import admin
 
-from menu.models import Menu
+from menu.models import Menu, MenuAvailabilityWindow
 
 
 # Register your models here.
-admin.site.register(Menu)
\ No newline at end of file
+admin.site.register(Menu)
+admin.site.register(MenuAvailabilityWindow)
\ No newline at end of file
@@ -5,3 +5,7 @@ class AMenuConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'menu'
     label = 'menu'
+
+    def ready(self):
+        # Keep the search index in sync with menu writes
+        from . import receivers  # noqa: F401
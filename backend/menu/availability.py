@@ -0,0 +1,86 @@
+# menu/availability.py
+from django.db import transaction
+from django.utils import timezone
+
+from .bulk import sync_bulk_write
+from .models import Menu, MenuAvailabilityWindow
+
+# Items with availability windows are not checked against the clock on every
+# request. refresh_availability() stores whether a window is open now in
+# Menu.schedule_open and switches `available` when that changes, so menu
+# reads keep filtering on `available` alone.
+
+
+def window_is_open(weekday, opens_at, closes_at, now):
+    """Whether a window contains the local datetime ``now``."""
+    today = now.weekday()
+    time = now.time()
+    if opens_at < closes_at:
+        return weekday in (None, today) and opens_at <= time < closes_at
+    # The window runs past midnight: the evening part on its day, the morning part on the next
+    if time >= opens_at and weekday in (None, today):
+        return True
+    return time < closes_at and weekday in (None, (today - 1) % 7)
+
+
+def scheduled_state(now, menu_ids=None):
+    """
+    Return the ids of items that have availability windows and, of those,
+    the ids with a window open at ``now``.
+    """
+    windows = MenuAvailabilityWindow.objects.all()
+    if menu_ids is not None:
+        windows = windows.filter(menu_id__in=menu_ids)
+    scheduled, open_ids = set(), set()
+    for menu_id, weekday, opens_at, closes_at in windows.values_list('menu_id', 'weekday', 'opens_at', 'closes_at'):
+        scheduled.add(menu_id)
+        if window_is_open(weekday, opens_at, closes_at, now):
+            open_ids.add(menu_id)
+    return scheduled, open_ids
+
+
+def refresh_availability(now=None, menu_ids=None):
+    """
+    Bring Menu.schedule_open up to date for every item, or the given ones.
+
+    Items whose window just opened become available and those whose window
+    just closed unavailable; in between, a vendor's own toggles stand.
+    Items whose schedule was removed go back to manual control. Only rows
+    that change are written, with one UPDATE per kind of change. Returns
+    ``{'opened', 'closed', 'cleared'}`` counts.
+    """
+    now = timezone.localtime(now)
+    scheduled, open_ids = scheduled_state(now, menu_ids)
+    menus = Menu.objects.all() if menu_ids is None else Menu.objects.filter(pk__in=menu_ids)
+
+    with transaction.atomic():
+        opened = list(menus.filter(pk__in=open_ids).exclude(schedule_open=True).values_list('pk', flat=True))
+        closed = list(
+            menus.filter(pk__in=scheduled - open_ids).exclude(schedule_open=False).values_list('pk', flat=True)
+        )
+        cleared = list(
+            menus.exclude(pk__in=scheduled).filter(schedule_open__isnull=False).values_list('pk', flat=True)
+        )
+        updated_at = timezone.now()
+        if opened:
+            Menu.objects.filter(pk__in=opened).update(schedule_open=True, available=True, updated_at=updated_at)
+        if closed:
+            Menu.objects.filter(pk__in=closed).update(schedule_open=False, available=False, updated_at=updated_at)
+        if cleared:
+            Menu.objects.filter(pk__in=cleared).update(schedule_open=None, updated_at=updated_at)
+        if opened or closed or cleared:
+            sync_bulk_write(opened + closed + cleared)
+    return {'opened': len(opened), 'closed': len(closed), 'cleared': len(cleared)}
+
+
+def replace_windows(menu, windows):
+    """
+    Replace a menu item's availability windows with ``windows`` (validated
+    window dicts) and apply the new schedule right away.
+    """
+    with transaction.atomic():
+        menu.availability_windows.all().delete()
+        MenuAvailabilityWindow.objects.bulk_create(
+            [MenuAvailabilityWindow(menu=menu, **window) for window in windows]
+        )
+        refresh_availability(menu_ids=[menu.pk])
@@ -0,0 +1,75 @@
+# menu/blobs.py
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from turbocafe.storage import is_blob
+from .models import ImageBlob, Menu, image_storage
+
+
+def record_references(deltas):
+    """
+    Apply reference count changes, keyed by image name, to the blobs they
+    name. Names outside the blob store (older uploads) are ignored.
+    """
+    for name, delta in deltas.items():
+        if not delta or not is_blob(name):
+            continue
+        blob, _ = ImageBlob.objects.get_or_create(name=name)
+        ImageBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + delta)
+
+
+def record_image_replaced(previous, current):
+    """Move one reference from a menu item's previous image to its current one."""
+    deltas = Counter()
+    if previous:
+        deltas[previous] -= 1
+    if current:
+        deltas[current] += 1
+    record_references(deltas)
+
+
+def recount_references():
+    """Recompute every blob's reference count from the menu table."""
+    counts = dict(
+        Menu.objects.exclude(image='').exclude(image__isnull=True)
+        .values_list('image').annotate(count=Count('id')).order_by()
+    )
+    with transaction.atomic():
+        ImageBlob.objects.all().delete()
+        ImageBlob.objects.bulk_create(
+            ImageBlob(name=name, ref_count=count) for name, count in counts.items() if is_blob(name)
+        )
+
+
+def collect_garbage(grace=None):
+    """
+    Delete blob files no menu item references, except those written within
+    the grace period, and drop their reference count rows.
+    Returns the number of files and bytes reclaimed.
+
+    Reference counts can drift, and a deduplicated file may still be used by
+    another item, so names still stored on a menu row are kept whatever
+    their count says.
+    """
+    if grace is None:
+        grace = timedelta(hours=settings.MEDIA_BLOB_GC_GRACE_HOURS)
+    cutoff = timezone.now() - grace
+    storage = image_storage()
+    in_use = set(Menu.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True))
+    referenced = in_use | set(ImageBlob.objects.filter(ref_count__gt=0).values_list('name', flat=True))
+
+    files = reclaimed = 0
+    for name in storage.iter_blobs():
+        if name in referenced or storage.get_modified_time(name) >= cutoff:
+            continue
+        reclaimed += storage.size(name)
+        storage.delete(name)
+        files += 1
+
+    ImageBlob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff).exclude(name__in=in_use).delete()
+    return files, reclaimed
@@ -0,0 +1,182 @@
+# menu/bulk.py
+import csv
+import io
+import json
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import catalog, fuzzy
+from .cache import bump_version
+from .models import Menu
+from .search import get_search_backend
+from .serializers import MenuBulkRowSerializer
+
+# Rows accepted in one upload
+MAX_BULK_ROWS = 1000
+
+BULK_FORMATS = ('csv', 'json')
+
+# Upload content types that name a bulk format
+BULK_CONTENT_TYPES = {'text/csv': 'csv', 'application/json': 'json'}
+
+
+class BulkFormatError(ValueError):
+    """The uploaded document could not be read as rows."""
+
+
+def read_rows(content, file_format):
+    """
+    Parse a CSV (with a header line) or JSON (a list, or an object with an
+    ``items`` list) document into a list of row dicts.
+    """
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise BulkFormatError("The file must be UTF-8 encoded.")
+
+    if file_format == 'csv':
+        # Empty cells mean "not given"
+        return [
+            {key.strip(): value for key, value in row.items() if key and value not in ('', None)}
+            for row in csv.DictReader(io.StringIO(content))
+        ]
+    if file_format == 'json':
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as exc:
+            raise BulkFormatError(f"Invalid JSON: {exc}")
+        return rows_from_data(data)
+    raise BulkFormatError(f"Unsupported format. Use one of: {', '.join(BULK_FORMATS)}.")
+
+
+def rows_from_data(data):
+    """Accept either a list of rows or ``{"items": [...]}``."""
+    if isinstance(data, dict):
+        data = data.get('items')
+    if not isinstance(data, list):
+        raise BulkFormatError("Expected a list of items or an object with an 'items' list.")
+    return data
+
+
+def _menus_named(names):
+    """Return the menu items with any of the names, by name, with one query."""
+    return {menu.name: menu for menu in Menu.objects.filter(name__in=list(names))}
+
+
+def sync_bulk_write(ids):
+    """
+    Bring the search indexes, catalog snapshot and response caches up to date
+    after menu rows were written without model signals (bulk_create,
+    bulk_update or update()).
+    """
+    menus = list(Menu.objects.filter(pk__in=ids).select_related('vendor'))
+    get_search_backend().index(menus)
+    transaction.on_commit(bump_version)
+    fuzzy.record_menus_changed(menus)
+    catalog.record_menus_changed()
+
+
+def upsert_menus(vendor_id, rows, dry_run=False):
+    """
+    Create or update a vendor's menu items from row dicts, keyed by name.
+
+    Every row is validated first, then all names are checked against the
+    menu with one query. If any row fails nothing is written; otherwise new
+    items are bulk-created and existing ones bulk-updated in one
+    transaction. Returns ``{'created', 'updated', 'errors'}`` where each
+    error names its 1-based row.
+    """
+    if len(rows) > MAX_BULK_ROWS:
+        return {'created': 0, 'updated': 0, 'errors': [
+            {'row': None, 'errors': {'non_field_errors': [f"At most {MAX_BULK_ROWS} rows per upload."]}}
+        ]}
+
+    errors = []
+    valid = {}
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({'row': index, 'errors': {'non_field_errors': ["Expected an object."]}})
+            continue
+        serializer = MenuBulkRowSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append({'row': index, 'name': row.get('name'), 'errors': serializer.errors})
+            continue
+        data = dict(serializer.validated_data)
+        name = data['name']
+        if name in valid:
+            errors.append({'row': index, 'name': name, 'errors': {
+                'name': [f"Duplicate of row {valid[name][0]} in this upload."]
+            }})
+            continue
+        valid[name] = (index, data)
+
+    # One query for every name in the upload
+    existing = _menus_named(valid)
+
+    to_create, to_update, update_fields = [], [], set()
+    for name, (index, data) in valid.items():
+        menu = existing.get(name)
+        if menu is None:
+            if 'price' not in data:
+                errors.append({'row': index, 'name': name, 'errors': {
+                    'price': ["This field is required for new items."]
+                }})
+                continue
+            to_create.append(Menu(vendor_id=vendor_id, **data))
+        elif menu.vendor_id != vendor_id:
+            errors.append({'row': index, 'name': name, 'errors': {
+                'name': ["A menu item with this name already exists."]
+            }})
+        else:
+            for field, value in data.items():
+                setattr(menu, field, value)
+            update_fields.update(data)
+            to_update.append(menu)
+
+    errors.sort(key=lambda error: error['row'] or 0)
+    result = {'created': len(to_create), 'updated': len(to_update), 'errors': errors}
+    if errors:
+        result['created'] = result['updated'] = 0
+        return result
+    if dry_run:
+        return result
+
+    try:
+        with transaction.atomic():
+            created = Menu.objects.bulk_create(to_create)
+            if to_update:
+                # bulk_update() skips auto_now
+                now = timezone.now()
+                for menu in to_update:
+                    menu.updated_at = now
+                update_fields.discard('name')
+                Menu.objects.bulk_update(to_update, sorted(update_fields | {'updated_at'}), batch_size=500)
+            sync_bulk_write([menu.pk for menu in created + to_update])
+    except IntegrityError:
+        # Another upload or request created some of the new names after they were checked
+        taken = _menus_named(menu.name for menu in to_create)
+        if not taken:
+            raise
+        result['errors'] = [
+            {'row': valid[name][0], 'name': name, 'errors': {
+                'name': ["A menu item with this name was created while this upload was processed."]
+            }}
+            for name in sorted(taken, key=lambda name: valid[name][0])
+        ]
+        result['created'] = result['updated'] = 0
+    return result
+
+
+def set_availability(queryset, available):
+    """
+    Switch every item of a menu queryset on or off with one UPDATE, leaving
+    rows that already match untouched. Returns the ids of the items changed.
+    """
+    with transaction.atomic():
+        ids = list(queryset.exclude(available=available).values_list('pk', flat=True))
+        if ids:
+            Menu.objects.filter(pk__in=ids).update(available=available, updated_at=timezone.now())
+            sync_bulk_write(ids)
+    return ids
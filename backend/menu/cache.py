@@ -0,0 +1,129 @@
+# menu/cache.py
+import hashlib
+import random
+from functools import wraps
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework import status
+from rest_framework.response import Response
+
+from orders.eta import estimate_wait_minutes
+
+# Shared counter bumped after every committed menu change. It is part of every
+# cached response key, so a bump retires all cached menu responses at once.
+VERSION_KEY = 'menu:version'
+HITS_KEY = 'menu:response-cache:hits'
+MISSES_KEY = 'menu:response-cache:misses'
+
+
+def cache_is_shared():
+    """
+    Whether every worker process reads the same cache. A local-memory cache
+    is private to its process, so with several workers each one would keep
+    its own menu version and never see the others' bumps.
+    """
+    return settings.WEB_CONCURRENCY <= 1 or not isinstance(caches['default'], LocMemCache)
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from a random value so a fresh cache never matches an old version
+        cache.add(VERSION_KEY, random.getrandbits(48), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    """
+    Advance the menu version and return the new one. A version evicted from
+    the cache is replaced by a fresh random one, which retires the cached
+    responses just the same.
+    """
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        version = random.getrandbits(48)
+        cache.set(VERSION_KEY, version, None)
+        return version
+
+
+def _count(key):
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def cache_stats():
+    """Return the response cache hit and miss counts."""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / total, 4) if total else None}
+
+
+def response_key(view_name, request, kwargs):
+    """
+    Build the cache key of a menu read: the view, its URL arguments and the
+    query parameters with their order normalized, under the current version.
+    """
+    params = sorted((name, sorted(request.GET.getlist(name))) for name in request.GET)
+    raw = repr((sorted(kwargs.items()), params)).encode()
+    return f'menu:response:{get_version()}:{view_name}:{hashlib.sha256(raw).hexdigest()}'
+
+
+def refresh_wait_estimates(data):
+    """
+    Recompute the live wait of every item in a cached payload from the vendor
+    queue states in the cache, without queries. A vendor whose state has
+    expired keeps the estimate the payload was cached with until an order
+    event or an uncached read rebuilds the state.
+    """
+    rows = data.get('results') if isinstance(data, dict) and 'results' in data else [data]
+    states = {}
+    for row in rows:
+        if 'estimated_wait_minutes' in row:
+            item = SimpleNamespace(
+                id=row['id'], vendor_id=row['vendor_id'],
+                wait_time_low=row['wait_time_low'], wait_time_high=row['wait_time_high'],
+            )
+            minutes = estimate_wait_minutes(item, states, cached_only=True)
+            if minutes is not None:
+                row['estimated_wait_minutes'] = minutes
+    return data
+
+
+def cached_menu_response(get):
+    """
+    Cache successful responses of a menu read view's ``get`` until the menu
+    changes. Responses carry ``X-Cache: HIT`` or ``MISS``, or ``BYPASS``
+    when the cache is not shared by all workers.
+    """
+    @wraps(get)
+    def wrapper(self, request, *args, **kwargs):
+        if not cache_is_shared():
+            response = get(self, request, *args, **kwargs)
+            response['X-Cache'] = 'BYPASS'
+            return response
+
+        key = response_key(type(self).__name__, request, kwargs)
+        data = cache.get(key)
+        if data is not None:
+            _count(HITS_KEY)
+            response = Response(refresh_wait_estimates(data))
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _count(MISSES_KEY)
+        response = get(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.MENU_RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    return wrapper
@@ -0,0 +1,95 @@
+# menu/catalog.py
+import hashlib
+import json
+import threading
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .cache import cache_is_shared, get_version
+
+CATALOG_KEY = 'menu:catalog'
+
+# The latest publish scheduled on this thread's connection
+_scheduled = threading.local()
+
+
+def build_catalog():
+    """
+    Render every available item, grouped by vendor, as a compact JSON
+    document. Returns ``(body, etag)`` where the ETag is a hash of the body.
+    """
+    from .models import Menu
+
+    vendors = {}
+    items = (
+        Menu.objects.filter(available=True)
+        .select_related('vendor')
+        .order_by('vendor_id', 'name')
+    )
+    for item in items:
+        vendor = vendors.setdefault(item.vendor_id, {
+            'id': item.vendor_id,
+            'name': item.vendor.vendor_name,
+            'items': [],
+        })
+        vendor['items'].append({
+            'id': item.id,
+            'name': item.name,
+            'description': item.description,
+            'price': item.price,
+            'image': item.image.url if item.image else None,
+            'wait_time_low': item.wait_time_low,
+            'wait_time_high': item.wait_time_high,
+        })
+
+    body = json.dumps(
+        {'vendors': list(vendors.values())}, cls=DjangoJSONEncoder, separators=(',', ':')
+    ).encode()
+    return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def publish_catalog():
+    """
+    Regenerate the snapshot and store it for every process to serve, tagged
+    with the menu version it was built from. The version is read before
+    building, so a slow build that raced with a newer change stores an older
+    version than the current one and is rebuilt by get_catalog().
+    """
+    version = get_version()
+    body, etag = build_catalog()
+    cache.set(CATALOG_KEY, {'body': body, 'etag': etag, 'version': version}, None)
+    return body, etag
+
+
+def get_catalog():
+    """
+    Return the current ``(body, etag)``, publishing a snapshot if there is
+    none or it predates the current menu version.
+
+    The snapshot and the version live in the shared cache. When the cache is
+    private to each of several workers, neither would see another worker's
+    menu changes, so the catalog is built from the database every time.
+    """
+    if not cache_is_shared():
+        return build_catalog()
+    snapshot = cache.get(CATALOG_KEY)
+    if snapshot is None or snapshot.get('version') != get_version():
+        return publish_catalog()
+    return snapshot['body'], snapshot['etag']
+
+
+def record_menus_changed():
+    """
+    Republish the snapshot once the current transaction commits. Only the
+    last publish scheduled in a transaction runs, so saving many items
+    rebuilds the catalog once. Should that one be rolled back with its
+    savepoint, get_catalog() still notices the version change on next read.
+    """
+    def publish():
+        if _scheduled.publish is publish and cache_is_shared():
+            publish_catalog()
+
+    _scheduled.publish = publish
+    transaction.on_commit(publish)
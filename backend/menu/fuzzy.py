@@ -0,0 +1,206 @@
+# menu/fuzzy.py
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, FloatField, Value, When
+
+from .cache import get_version
+from .search import RANK_FIELD, no_results, tokenize
+
+# Word similarity a query word needs with some word of an item to match it
+MIN_SIMILARITY = 0.4
+MAX_FUZZY_RESULTS = 50
+
+
+def trigrams(word):
+    """Return the trigrams of a word padded like pg_trgm, so prefixes weigh more."""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(left, right):
+    """Dice similarity of two trigram sets, which is kinder to short words than Jaccard."""
+    if not left or not right:
+        return 0.0
+    return 2 * len(left & right) / (len(left) + len(right))
+
+
+class MenuNameIndex:
+    """
+    In-memory index over menu item and vendor names.
+
+    A trigram posting list finds candidates for misspelled queries, and a
+    sorted list of word-boundary suffixes of every item name ("spicy jollof
+    rice", "jollof rice", "rice") answers prefix lookups with a binary
+    search. Items are added, replaced and removed one at a time as menu
+    rows change.
+    """
+
+    def __init__(self, generation=None):
+        self.generation = generation
+        self._lock = threading.Lock()
+        # id -> (name, vendor_name, available, [(word, trigrams)])
+        self._entries = {}
+        self._postings = defaultdict(set)
+        # Sorted (phrase, word position, id) tuples
+        self._phrases = []
+
+    def _words(self, entry_id):
+        return self._entries[entry_id][3]
+
+    def _unlink(self, entry_id):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for _, grams in entry[3]:
+            for gram in grams:
+                self._postings[gram].discard(entry_id)
+        words = tokenize(entry[0])
+        for position in range(len(words)):
+            phrase = (' '.join(words[position:]), position, entry_id)
+            index = bisect_left(self._phrases, phrase)
+            if index < len(self._phrases) and self._phrases[index] == phrase:
+                del self._phrases[index]
+
+    def _link(self, entry_id, name, vendor_name, available):
+        words = tokenize(name) + tokenize(vendor_name or '')
+        indexed_words = [(word, trigrams(word)) for word in dict.fromkeys(words)]
+        self._entries[entry_id] = (name, vendor_name, available, indexed_words)
+        for _, grams in indexed_words:
+            for gram in grams:
+                self._postings[gram].add(entry_id)
+        name_words = tokenize(name)
+        for position in range(len(name_words)):
+            insort(self._phrases, (' '.join(name_words[position:]), position, entry_id))
+
+    def update(self, rows):
+        """Add or replace items from ``(id, name, vendor_name, available)`` rows."""
+        with self._lock:
+            for entry_id, name, vendor_name, available in rows:
+                self._unlink(entry_id)
+                self._link(entry_id, name, vendor_name, available)
+
+    def remove(self, ids):
+        with self._lock:
+            for entry_id in ids:
+                self._unlink(entry_id)
+
+    def autocomplete(self, prefix, limit):
+        """
+        Return up to ``limit`` available items whose name has a word sequence
+        starting with ``prefix``, those starting with it first.
+        """
+        prefix = ' '.join(tokenize(prefix))
+        if not prefix:
+            return []
+        best = {}
+        with self._lock:
+            index = bisect_left(self._phrases, (prefix,))
+            while index < len(self._phrases) and self._phrases[index][0].startswith(prefix):
+                _, position, entry_id = self._phrases[index]
+                if self._entries[entry_id][2] and position < best.get(entry_id, len(self._phrases)):
+                    best[entry_id] = position
+                index += 1
+            ranked = sorted(best, key=lambda entry_id: (best[entry_id], self._entries[entry_id][0]))
+            return [
+                {'id': entry_id, 'name': self._entries[entry_id][0], 'vendor_name': self._entries[entry_id][1]}
+                for entry_id in ranked[:limit]
+            ]
+
+    def fuzzy(self, query, limit=MAX_FUZZY_RESULTS):
+        """
+        Return ``(id, score)`` pairs for items whose name or vendor name
+        resembles every word of ``query``, best first. A word's score is its
+        best trigram similarity with any word of the item.
+        """
+        query_words = [trigrams(word) for word in tokenize(query)]
+        if not query_words:
+            return []
+        scored = []
+        with self._lock:
+            candidates = set()
+            for grams in query_words:
+                for gram in grams:
+                    candidates |= self._postings.get(gram, set())
+            for entry_id in candidates:
+                words = self._words(entry_id)
+                scores = [max(similarity(grams, word_grams) for _, word_grams in words) for grams in query_words]
+                if min(scores) >= MIN_SIMILARITY:
+                    scored.append((entry_id, sum(scores) / len(scores)))
+        scored.sort(key=lambda pair: (-pair[1], pair[0]))
+        return scored[:limit]
+
+
+_index = MenuNameIndex()
+
+
+def _menu_rows(queryset):
+    return queryset.values_list('id', 'name', 'vendor__vendor_name', 'available')
+
+
+def get_index():
+    """
+    Return this process' name index, rebuilt from the menu table when the
+    shared menu version shows another process changed the menu since it
+    was built.
+    """
+    global _index
+    generation = get_version()
+    if _index.generation != generation:
+        from .models import Menu
+
+        index = MenuNameIndex(generation)
+        index.update(_menu_rows(Menu.objects.all()))
+        _index = index
+    return _index
+
+
+def _publish(apply):
+    """
+    Once the transaction commits, apply a change to this process' index.
+    menu.receivers bumps the shared menu version for the same change just
+    before, so the index adopts the new version if that bump is the only
+    change since it was built; otherwise it is rebuilt on next use.
+    """
+    def on_commit():
+        index = _index
+        apply(index)
+        generation = get_version()
+        if index.generation is None or generation != index.generation + 1:
+            index.generation = None
+        else:
+            index.generation = generation
+
+    transaction.on_commit(on_commit)
+
+
+def record_menus_changed(menus):
+    """Refresh the index entries of saved menu items."""
+    rows = [(menu.pk, menu.name, menu.vendor.vendor_name, menu.available) for menu in menus]
+    _publish(lambda index: index.update(rows))
+
+
+def record_menus_deleted(ids):
+    ids = list(ids)
+    _publish(lambda index: index.remove(ids))
+
+
+def autocomplete(prefix, limit):
+    return get_index().autocomplete(prefix, limit)
+
+
+def fuzzy_search(queryset, query):
+    """
+    Restrict a menu queryset to items resembling ``query`` and annotate each
+    with its relevance as ``search_rank`` (lower is more relevant), like
+    menu.search.search_menus.
+    """
+    matches = get_index().fuzzy(query)
+    if not matches:
+        return no_results(queryset)
+    return queryset.filter(id__in=[entry_id for entry_id, _ in matches]).annotate(**{RANK_FIELD: Case(
+        *[When(id=entry_id, then=Value(-score)) for entry_id, score in matches],
+        output_field=FloatField(),
+    )})
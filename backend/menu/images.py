@@ -0,0 +1,166 @@
+# menu/images.py
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Format of the plain variants by whether the source has transparency; every
+# width is also written as WebP
+PLAIN_FORMATS = {False: ('jpeg', 'jpg'), True: ('png', 'png')}
+SAVE_OPTIONS = {
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+    'png': {'optimize': True},
+    'webp': {'quality': 80, 'method': 4},
+}
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def _encode(image, image_format):
+    if image_format == 'jpeg' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format.upper(), **SAVE_OPTIONS[image_format])
+    return buffer.getvalue()
+
+
+def render_variants(source, widths):
+    """
+    Resize an open image file to each width, never upscaling, and encode
+    each size in the plain format and as WebP.
+
+    Returns ``{format: {width: (extension, bytes)}}``.
+    """
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+
+    plain_format, plain_extension = PLAIN_FORMATS[_has_alpha(image)]
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if _has_alpha(image) else 'RGB')
+
+    # Widths at or above the original collapse into one copy at full width
+    sizes = sorted({min(width, image.width) for width in widths})
+    rendered = {plain_format: {}, 'webp': {}}
+    for width in sizes:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+        rendered[plain_format][width] = (plain_extension, _encode(resized, plain_format))
+        rendered['webp'][width] = ('webp', _encode(resized, 'webp'))
+    return rendered
+
+
+def _delete_files(variants):
+    for sizes in variants.get('formats', {}).values():
+        for name in sizes.values():
+            default_storage.delete(name)
+
+
+def generate_variants(menu_id):
+    """
+    Write the resized copies of a menu item's current image and record them
+    on the item. Variants of a previous image are deleted. Returns the new
+    variants, or None when the item or its image is gone.
+    """
+    from .models import Menu
+
+    menu = Menu.objects.filter(pk=menu_id).first()
+    if menu is None or not menu.image:
+        return None
+    source = menu.image.name
+
+    with menu.image.storage.open(source) as file:
+        rendered = render_variants(file, settings.MENU_IMAGE_WIDTHS)
+
+    stem = os.path.splitext(os.path.basename(source))[0]
+    variants = {'source': source, 'formats': {}}
+    for image_format, sizes in rendered.items():
+        names = variants['formats'][image_format] = {}
+        for width, (extension, content) in sizes.items():
+            path = f'variants/menu/{menu_id}/{stem}-{width}w.{extension}'
+            names[str(width)] = default_storage.save(path, ContentFile(content))
+
+    with transaction.atomic():
+        current = Menu.objects.select_for_update().filter(pk=menu_id).first()
+        if current is None or current.image.name != source:
+            # The image changed again while this one was being resized
+            stale, variants = variants, None
+        else:
+            stale, current.image_variants = current.image_variants, variants
+            # A regular save keeps the search index and response caches in step
+            current.save(update_fields=['image_variants', 'updated_at'])
+    _delete_files(stale or {})
+    return variants
+
+
+def discard_variants(menu):
+    """Delete a deleted menu item's variant files once the deletion commits."""
+    variants = menu.image_variants or {}
+    if variants.get('formats'):
+        transaction.on_commit(lambda: _delete_files(variants))
+
+
+def variant_urls(menu):
+    """
+    Return ``{format: {'<width>w': url}}`` for a menu item's current image,
+    ready to be joined into a ``srcset``. Empty until the variants exist.
+    """
+    variants = menu.image_variants or {}
+    if not menu.image or variants.get('source') != menu.image.name:
+        return {}
+    return {
+        image_format: {f'{width}w': default_storage.url(name) for width, name in sizes.items()}
+        for image_format, sizes in variants['formats'].items()
+    }
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.MENU_IMAGE_WORKERS, thread_name_prefix='menu-images'
+            )
+        return _executor
+
+
+def _run(menu_id):
+    close_old_connections()
+    try:
+        generate_variants(menu_id)
+    except Exception:
+        logger.exception("Could not generate image variants for menu item %s", menu_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(menu):
+    """
+    Generate a menu item's image variants in a background worker once the
+    current transaction commits. With ``MENU_IMAGE_WORKERS = 0`` they are
+    generated inline instead.
+    """
+    menu_id = menu.pk
+
+    def submit():
+        if settings.MENU_IMAGE_WORKERS > 0:
+            _get_executor().submit(_run, menu_id)
+        else:
+            generate_variants(menu_id)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from menu.blobs import collect_garbage, recount_references
+
+
+class Command(BaseCommand):
+    help = "Delete content-addressed image files that no menu item references any more."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=int,
+            help="Keep unreferenced files younger than this. Defaults to MEDIA_BLOB_GC_GRACE_HOURS.",
+        )
+        parser.add_argument(
+            '--recount', action='store_true',
+            help="Recompute reference counts from the menu table first.",
+        )
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            recount_references()
+        grace = timedelta(hours=options['grace_hours']) if options['grace_hours'] is not None else None
+        files, reclaimed = collect_garbage(grace)
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {files} unreferenced blobs, reclaiming {reclaimed / 1024:.1f} KiB."
+        ))
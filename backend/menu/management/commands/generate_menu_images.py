@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from menu.images import generate_variants
+from menu.models import Menu
+
+
+class Command(BaseCommand):
+    help = "Generate resized image variants for menu items, e.g. after changing MENU_IMAGE_WIDTHS."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--missing-only', action='store_true',
+            help="Only process items whose current image has no variants yet.",
+        )
+
+    def handle(self, *args, **options):
+        generated = 0
+        for menu in Menu.objects.exclude(image='').exclude(image__isnull=True).only('id', 'image', 'image_variants'):
+            if options['missing_only'] and (menu.image_variants or {}).get('source') == menu.image.name:
+                continue
+            if generate_variants(menu.id):
+                generated += 1
+        self.stdout.write(self.style.SUCCESS(f"Generated image variants for {generated} menu items."))
@@ -0,0 +1,50 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auth.models import UserProfile
+from menu.bulk import BULK_FORMATS, BulkFormatError, read_rows, upsert_menus
+
+
+class Command(BaseCommand):
+    help = "Create or update a vendor's menu items from a CSV or JSON file, matched by name."
+
+    def add_arguments(self, parser):
+        parser.add_argument('vendor', help="Username of the vendor the items belong to.")
+        parser.add_argument('path', help="CSV file with a header line, or JSON list of items.")
+        parser.add_argument(
+            '--format', choices=BULK_FORMATS,
+            help="File format. Defaults to the file extension.",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Validate without writing anything.")
+
+    def handle(self, *args, **options):
+        vendor = UserProfile.objects.filter(username=options['vendor'], role='vendor').first()
+        if vendor is None:
+            raise CommandError(f"No vendor named {options['vendor']!r}.")
+
+        file_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        try:
+            with open(options['path'], 'rb') as file:
+                rows = read_rows(file.read(), file_format)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+        except BulkFormatError as exc:
+            raise CommandError(str(exc))
+
+        result = upsert_menus(vendor.id, rows, dry_run=options['dry_run'])
+        if result['errors']:
+            for error in result['errors']:
+                row = error['row'] if error['row'] is not None else '-'
+                details = '; '.join(
+                    f"{field}: {' '.join(str(message) for message in messages)}"
+                    for field, messages in error['errors'].items()
+                )
+                self.stderr.write(f"Row {row}: {details}")
+            raise CommandError(f"{len(result['errors'])} rows failed validation; nothing was imported.")
+
+        action = "Would create" if options['dry_run'] else "Created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {result['created']} and {'would update' if options['dry_run'] else 'updated'} "
+            f"{result['updated']} menu items."
+        ))
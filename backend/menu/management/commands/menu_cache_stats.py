@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from menu.cache import cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show hit and miss counts of the menu response cache."
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        ratio = 'n/a' if stats['hit_ratio'] is None else f"{stats['hit_ratio']:.1%}"
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['hits']} hits, {stats['misses']} misses, hit ratio {ratio}."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from menu.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the menu search index from the menu table."
+
+    def handle(self, *args, **options):
+        indexed = get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} menu items."))
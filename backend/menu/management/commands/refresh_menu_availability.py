@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from menu.availability import refresh_availability
+
+
+class Command(BaseCommand):
+    help = ("Switch scheduled menu items on and off as their availability windows open and close. "
+            "Run it every minute from cron, or keep it running with --every.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--every', type=int, metavar='SECONDS',
+            help="Keep running and refresh every SECONDS seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            counts = refresh_availability()
+            self.stdout.write(self.style.SUCCESS(
+                f"Opened {counts['opened']}, closed {counts['closed']} and cleared {counts['cleared']} scheduled menu items."
+            ))
+            if not options['every']:
+                return
+            close_old_connections()
+            time.sleep(options['every'])
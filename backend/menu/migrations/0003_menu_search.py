@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create the FTS5 table used by menu.search.SQLiteFTSBackend and fill it
+    from the existing menu. Other databases use a different backend.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Menu = apps.get_model('menu', 'Menu')
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS menu_search USING fts5("
+        "name, description, vendor_name, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO menu_search (rowid, name, description, vendor_name) VALUES (%s, %s, %s, %s)",
+            [
+                (menu.pk, menu.name, menu.description or '', menu.vendor.vendor_name or '')
+                for menu in Menu.objects.select_related('vendor')
+            ],
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS menu_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('menu', '0002_alter_menu_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
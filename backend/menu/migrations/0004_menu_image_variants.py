@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0003_menu_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menu',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized copies of the image, written by menu.images'),
+        ),
+    ]
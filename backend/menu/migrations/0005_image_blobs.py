@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:22
+
+import menu.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0004_menu_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Image blobs',
+            },
+        ),
+        migrations.AlterField(
+            model_name='menu',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=menu.models.image_storage, upload_to=''),
+        ),
+    ]
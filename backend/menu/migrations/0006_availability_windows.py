@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0005_image_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menu',
+            name='schedule_open',
+            field=models.BooleanField(editable=False, help_text="Whether one of the item's availability windows is open now, empty without a schedule. Kept current by menu.availability", null=True),
+        ),
+        migrations.CreateModel(
+            name='MenuAvailabilityWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(blank=True, choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')], help_text='Day the window opens; empty for every day', null=True)),
+                ('opens_at', models.TimeField()),
+                ('closes_at', models.TimeField(help_text='A time before opens_at closes the window the next day')),
+                ('menu', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_windows', to='menu.menu')),
+            ],
+            options={
+                'verbose_name_plural': 'Menu availability windows',
+                'ordering': ['menu', 'weekday', 'opens_at'],
+            },
+        ),
+    ]
@@ -1,7 +1,24 @@
-from django.db import models
+from django.core.files.storage import storages
+from django.db import models, transaction
 
 from auth.models import UserProfile
 
+class MenuQuerySet(models.QuerySet):
+    """
+    Row-level scopes for menu items, applied in the WHERE clause.
+    """
+
+    def editable_by(self, user):
+        """Menu items a user may change: only a vendor's own items."""
+        if not user.is_authenticated or getattr(user, 'role', None) != 'vendor':
+            return self.none()
+        return self.filter(vendor=user)
+
+
+def image_storage():
+    return storages['menu_images']
+
+
 # Create your models here.
 class Menu(models.Model):
     """
@@ -10,17 +27,77 @@ class Menu(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True, null=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
-    image = models.ImageField( blank=True, null=True)
+    image = models.ImageField( blank=True, null=True, storage=image_storage)
+    image_variants = models.JSONField(
+        default=dict, blank=True, help_text="Resized copies of the image, written by menu.images"
+    )
     available = models.BooleanField(default=True)
+    schedule_open = models.BooleanField(
+        null=True, editable=False,
+        help_text="Whether one of the item's availability windows is open now, empty without a schedule. "
+                  "Kept current by menu.availability"
+    )
     wait_time_low = models.PositiveIntegerField(default=0, help_text="Waiting time in minutes")
     wait_time_high = models.PositiveIntegerField(default=0, help_text="Maximum waiting time in minutes")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     vendor = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='menus')
 
+    objects = MenuQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Image reference counts are updated by signal receivers (see
+        # menu/receivers.py); keep them in one transaction with the row write
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name_plural = "Menus"
-        ordering = ['name']
\ No newline at end of file
+        ordering = ['name']
+
+
+class ImageBlob(models.Model):
+    """
+    Reference count of one content-addressed image file, by the menu items
+    using it. Files of blobs nobody references are reclaimed by
+    `manage.py gc_media_blobs`.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
+
+    class Meta:
+        verbose_name_plural = "Image blobs"
+
+
+class MenuAvailabilityWindow(models.Model):
+    """
+    A time a menu item is served, e.g. breakfast from 07:00 to 11:00, in
+    the server's time zone. Items with windows are switched on and off as
+    their windows open and close by `manage.py refresh_menu_availability`.
+    """
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'),
+        (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday'),
+    ]
+
+    menu = models.ForeignKey(Menu, on_delete=models.CASCADE, related_name='availability_windows')
+    weekday = models.PositiveSmallIntegerField(
+        choices=WEEKDAY_CHOICES, blank=True, null=True, help_text="Day the window opens; empty for every day"
+    )
+    opens_at = models.TimeField()
+    closes_at = models.TimeField(help_text="A time before opens_at closes the window the next day")
+
+    def __str__(self):
+        day = self.get_weekday_display() if self.weekday is not None else "Daily"
+        return f"{self.menu}: {day} {self.opens_at:%H:%M}-{self.closes_at:%H:%M}"
+
+    class Meta:
+        verbose_name_plural = "Menu availability windows"
+        ordering = ['menu', 'weekday', 'opens_at']
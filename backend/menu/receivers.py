@@ -0,0 +1,93 @@
+# menu/receivers.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from auth.models import UserProfile
+from . import blobs, catalog, fuzzy, images
+from .cache import bump_version
+from .models import Menu
+from .search import get_search_backend
+
+# Menu writes update the full-text index in the same transaction. On commit
+# they bump the menu version, which retires every cached menu response (see
+# menu/cache.py), and the fuzzy index and catalog snapshot follow. The bump
+# receivers are connected first so the fuzzy index sees the version they set.
+
+@receiver(pre_save, sender=Menu)
+def remember_previous_image(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    if instance._state.adding:
+        instance._previous_image = None
+    else:
+        # Locking the row makes concurrent image replacements take turns, so
+        # each one releases the image the previous one stored
+        instance._previous_image = (
+            Menu.objects.select_for_update().filter(pk=instance.pk).values_list('image', flat=True).first() or None
+        )
+
+
+@receiver(post_save, sender=Menu)
+def count_image_references(sender, instance, **kwargs):
+    if not hasattr(instance, '_previous_image'):
+        return
+    current = instance.image.name or None
+    blobs.record_image_replaced(instance._previous_image, current)
+    del instance._previous_image
+
+
+@receiver(post_save, sender=Menu)
+@receiver(post_delete, sender=Menu)
+def bump_version_on_menu_change(sender, **kwargs):
+    transaction.on_commit(bump_version)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def bump_version_on_vendor_change(sender, instance, update_fields=None, **kwargs):
+    # Menu responses carry vendor names; new vendors have no items yet
+    if kwargs.get('created') or instance.role != 'vendor':
+        return
+    if update_fields is not None and 'vendor_name' not in update_fields:
+        return
+    transaction.on_commit(bump_version)
+
+
+@receiver(post_save, sender=Menu)
+def index_menu_on_save(sender, instance, **kwargs):
+    get_search_backend().index([instance])
+    fuzzy.record_menus_changed([instance])
+    catalog.record_menus_changed()
+
+
+@receiver(post_delete, sender=Menu)
+def release_image_on_delete(sender, instance, **kwargs):
+    blobs.record_image_replaced(instance.image.name or None, None)
+
+
+@receiver(post_delete, sender=Menu)
+def delete_image_variants(sender, instance, **kwargs):
+    # Variants are per item, unlike the shared image blobs
+    images.discard_variants(instance)
+
+
+@receiver(post_delete, sender=Menu)
+def remove_menu_from_index(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+    fuzzy.record_menus_deleted([instance.pk])
+    catalog.record_menus_changed()
+
+
+@receiver(post_save, sender=UserProfile)
+def reindex_vendor_menus(sender, instance, created, update_fields=None, **kwargs):
+    # Vendor names are indexed with every item, so renames reindex the vendor's menu
+    if created or instance.role != 'vendor':
+        return
+    if update_fields is not None and 'vendor_name' not in update_fields:
+        return
+    menus = list(instance.menus.select_related('vendor'))
+    get_search_backend().index(menus)
+    fuzzy.record_menus_changed(menus)
+    if menus:
+        catalog.record_menus_changed()
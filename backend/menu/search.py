@@ -0,0 +1,156 @@
+# menu/search.py
+import re
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+# Annotation holding a search hit's relevance; lower ranks first
+RANK_FIELD = 'search_rank'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Split a search query into lower-cased word tokens."""
+    return _TOKEN_RE.findall(query.lower())
+
+
+def no_results(queryset):
+    """An empty search result that can still be ordered by rank."""
+    return queryset.none().annotate(**{RANK_FIELD: Value(0.0, output_field=FloatField())})
+
+
+class DatabaseBackend:
+    """
+    Portable fallback that searches with ``icontains`` across the indexed
+    columns. Name matches rank before description and vendor matches.
+    Keeps no index, so writes are no-ops.
+    """
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return no_results(queryset)
+        for token in tokens:
+            queryset = queryset.filter(
+                Q(name__icontains=token) |
+                Q(description__icontains=token) |
+                Q(vendor__vendor_name__icontains=token)
+            )
+        name_match = Q()
+        for token in tokens:
+            name_match &= Q(name__icontains=token)
+        return queryset.annotate(**{RANK_FIELD: Case(
+            When(name_match, then=Value(0.0)),
+            default=Value(1.0),
+            output_field=FloatField(),
+        )})
+
+    def index(self, menus):
+        pass
+
+    def remove(self, ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+
+class SQLiteFTSBackend:
+    """
+    Full-text search on an SQLite FTS5 table keyed by menu id (created by
+    menu migration 0003). Every token is matched as a prefix, so results
+    narrow as the user types, and hits are ranked with BM25, weighting the
+    item name above the vendor name above the description.
+    """
+    table = 'menu_search'
+    # BM25 column weights for name, description and vendor_name
+    weights = (10.0, 1.0, 3.0)
+
+    def _match_expression(self, tokens):
+        # Quoting every token keeps FTS5 query syntax out of user input
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return no_results(queryset)
+        match = self._match_expression(tokens)
+        table = connection.ops.quote_name(self.table)
+        menu_table = connection.ops.quote_name(queryset.model._meta.db_table)
+        weights = ', '.join(str(weight) for weight in self.weights)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match])
+        ).annotate(**{RANK_FIELD: RawSQL(
+            f"SELECT bm25({table}, {weights}) FROM {table} "
+            f"WHERE {table} MATCH %s AND rowid = {menu_table}.id",
+            [match],
+            output_field=FloatField(),
+        )})
+
+    def index(self, menus):
+        """Add or refresh the index rows of saved menu items."""
+        menus = list(menus)
+        if not menus:
+            return
+        table = connection.ops.quote_name(self.table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE rowid IN ({', '.join(['%s'] * len(menus))})",
+                [menu.pk for menu in menus],
+            )
+            cursor.executemany(
+                f"INSERT INTO {table} (rowid, name, description, vendor_name) VALUES (%s, %s, %s, %s)",
+                [(menu.pk, menu.name, menu.description or '', menu.vendor.vendor_name or '') for menu in menus],
+            )
+
+    def remove(self, ids):
+        """Drop the index rows of deleted menu items."""
+        ids = list(ids)
+        if not ids:
+            return
+        table = connection.ops.quote_name(self.table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid IN ({', '.join(['%s'] * len(ids))})", ids)
+
+    def rebuild(self):
+        """Repopulate the whole index from the menu table. Returns the number of items indexed."""
+        from .models import Menu
+
+        table = connection.ops.quote_name(self.table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table}")
+        menus = list(Menu.objects.select_related('vendor'))
+        self.index(menus)
+        return len(menus)
+
+
+_backend = None
+
+
+def get_search_backend():
+    """Return the configured search backend, created on first use."""
+    global _backend
+    if _backend is None:
+        _backend = import_string(getattr(settings, 'MENU_SEARCH_BACKEND', 'menu.search.DatabaseBackend'))()
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    global _backend
+    if setting == 'MENU_SEARCH_BACKEND':
+        _backend = None
+
+
+def search_menus(queryset, query):
+    """
+    Restrict a menu queryset to items matching ``query`` and annotate each
+    with its relevance as ``search_rank`` (lower is more relevant).
+    """
+    return get_search_backend().search(queryset, query)
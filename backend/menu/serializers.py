@@ -1,7 +1,19 @@
 # menu/serializers.py
 from rest_framework import serializers
-from .models import Menu
+from .models import Menu, MenuAvailabilityWindow
 from auth.models import UserProfile
+from orders.eta import estimate_wait_minutes
+from .images import variant_urls
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Resized image URLs of a menu item by format and width, e.g.
+    ``{'webp': {'160w': url, '320w': url}, 'jpeg': {...}}``.
+    """
+
+    def to_representation(self, menu):
+        return variant_urls(menu)
 
 
 class MenuSerializer(serializers.ModelSerializer):
@@ -10,15 +22,16 @@ class MenuSerializer(serializers.ModelSerializer):
     """
     vendor_name = serializers.CharField(source='vendor.vendor_name', read_only=True)
     vendor_id = serializers.IntegerField(source='vendor.id', read_only=True)
+    image_variants = ImageVariantsField(source='*')
     
     class Meta:
         model = Menu
         fields = [
-            'id', 'name', 'description', 'price', 'image', 
-            'available', 'created_at', 'wait_time_low', 'wait_time_high',
+            'id', 'name', 'description', 'price', 'image', 'image_variants',
+            'available', 'schedule_open', 'created_at', 'wait_time_low', 'wait_time_high',
             'updated_at', 'vendor', 'vendor_name', 'vendor_id'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'vendor']
+        read_only_fields = ['id', 'schedule_open', 'created_at', 'updated_at', 'vendor']
     
     def validate_price(self, value):
         """
@@ -55,13 +68,22 @@ class MenuListSerializer(serializers.ModelSerializer):
     Simplified serializer for menu list views.
     """
     vendor_name = serializers.CharField(source='vendor.vendor_name', read_only=True)
+    image_variants = ImageVariantsField(source='*')
+    estimated_wait_minutes = serializers.SerializerMethodField()
     
     class Meta:
         model = Menu
         fields = [
-            'id', 'name', 'price', 'image', 'available',
-            'vendor_name', 'wait_time_low', 'wait_time_high'
+            'id', 'name', 'price', 'image', 'image_variants', 'available',
+            'vendor_id', 'vendor_name', 'wait_time_low', 'wait_time_high',
+            'estimated_wait_minutes'
         ]
+    
+    def get_estimated_wait_minutes(self, obj):
+        """
+        Live wait from the vendor's cached queue state, shared across the page.
+        """
+        return estimate_wait_minutes(obj, self.context.setdefault('vendor_eta_states', {}))
 
 
 class MenuCreateUpdateSerializer(serializers.ModelSerializer):
@@ -81,4 +103,57 @@ class MenuCreateUpdateSerializer(serializers.ModelSerializer):
         """
         if value <= 0:
             raise serializers.ValidationError("Price must be greater than 0.")
-        return value
\ No newline at end of file
+        return value
+
+class MenuBulkRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk menu upload. Rows are matched to existing items by
+    name; fields left out keep their current value. Validates without
+    touching the database, so a whole upload is checked in one pass.
+    """
+    name = serializers.CharField(max_length=100)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    available = serializers.BooleanField(required=False)
+    wait_time_low = serializers.IntegerField(min_value=0, required=False)
+    wait_time_high = serializers.IntegerField(min_value=0, required=False)
+    
+    def validate_price(self, value):
+        """
+        Validate that price is positive.
+        """
+        if value <= 0:
+            raise serializers.ValidationError("Price must be greater than 0.")
+        return value
+
+
+class MenuBulkAvailabilitySerializer(serializers.Serializer):
+    """
+    Switch many of a vendor's menu items on or off at once: all of them,
+    the listed ids, or those whose name contains ``name``.
+    """
+    available = serializers.BooleanField()
+    all = serializers.BooleanField(required=False, default=False)
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False)
+    name = serializers.CharField(required=False, max_length=100)
+
+    def validate(self, attrs):
+        selectors = [key for key in ('ids', 'name') if key in attrs] + (['all'] if attrs['all'] else [])
+        if len(selectors) != 1:
+            raise serializers.ValidationError("Choose the items with exactly one of 'all', 'ids' or 'name'.")
+        return attrs
+
+
+class MenuAvailabilityWindowSerializer(serializers.ModelSerializer):
+    """
+    A time a menu item is served. A closing time before the opening time
+    ends the window on the next day.
+    """
+    class Meta:
+        model = MenuAvailabilityWindow
+        fields = ['weekday', 'opens_at', 'closes_at']
+
+    def validate(self, attrs):
+        if attrs['opens_at'] == attrs['closes_at']:
+            raise serializers.ValidationError("A window must close at a different time than it opens.")
+        return attrs
@@ -1,13 +1,36 @@
+import base64
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from PIL import Image
 from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
 from auth.models import UserProfile
-from menu.models import Menu
+from menu.availability import refresh_availability
+from menu.cache import VERSION_KEY, bump_version, cache_is_shared, cache_stats, get_version
+from menu.catalog import CATALOG_KEY, build_catalog
+from menu.models import ImageBlob, Menu
+from menu.serializers import MenuSerializer
+from turbocafe.storage import serve_media
 
 
 class MenuAPITests(APITestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
 
         # Users
@@ -143,3 +166,455 @@ class MenuAPITests(APITestCase):
         self.assertIn("total_items", response.data)
 
 
+    def test_menu_list_cursor_pagination(self):
+        url = reverse("menu:menu-list")
+        for name in ["Amala", "Eba", "Jollof", "Moi Moi"]:
+            Menu.objects.create(name=name, price=3.00, vendor=self.vendor)
+
+        self.authenticate(self.student)
+        response = self.client.get(url + "?page_size=2&count=true")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 5)
+        self.assertFalse(response.data["has_previous"])
+
+        # walk forward through every page
+        names = [item["name"] for item in response.data["results"]]
+        while response.data["has_next"]:
+            response = self.client.get(url, {"page_size": 2, "cursor": response.data["next_cursor"]})
+            self.assertNotIn("count", response.data)
+            names.extend(item["name"] for item in response.data["results"])
+        self.assertEqual(names, ["Amala", "Burger", "Eba", "Jollof", "Moi Moi"])
+
+        # and back one page
+        response = self.client.get(url, {"page_size": 2, "cursor": response.data["previous_cursor"]})
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Eba", "Jollof"])
+        self.assertTrue(response.data["has_next"])
+
+        # page size is capped and bad cursors are rejected
+        response = self.client.get(url + "?page_size=100000")
+        self.assertEqual(response.data["page_size"], 100)
+        response = self.client.get(url + "?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        for ordering in ["price", "-created_at"]:
+            cursor = base64.urlsafe_b64encode(json.dumps({"v": "x", "pk": 1}).encode()).decode()
+            response = self.client.get(url, {"ordering": ordering, "cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("cursor", response.data)
+
+
+    def test_search_ranks_full_text_matches_and_matches_prefixes(self):
+        Menu.objects.create(name="Veggie Wrap", description="Burger sauce on the side", price=7.00, vendor=self.vendor)
+        Menu.objects.create(name="Cheeseburger", description="Double patty", price=9.00, vendor=self.vendor)
+        self.authenticate(self.student)
+        url = reverse("menu:menu-search")
+
+        # a partly typed word matches as a prefix, name hits rank above description hits
+        response = self.client.get(url, {"q": "burg"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Burger", "Veggie Wrap"])
+
+        # the index follows updates, deletes and vendor renames
+        self.menu1.name = "Hot Dog"
+        self.menu1.save()
+        response = self.client.get(url, {"q": "dog"})
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Hot Dog"])
+        self.vendor.vendor_name = "Grill House"
+        self.vendor.save()
+        response = self.client.get(reverse("menu:menu-list"), {"search": "grill", "page_size": 2})
+        first_page = [item["id"] for item in response.data["results"]]
+        response = self.client.get(reverse("menu:menu-list"), {"search": "grill", "cursor": response.data["next_cursor"]})
+        second_page = [item["id"] for item in response.data["results"]]
+        # relevance-ordered pages do not overlap; the unavailable item stays hidden
+        self.assertEqual((len(first_page), len(second_page)), (2, 1))
+        self.assertFalse(set(first_page) & set(second_page))
+        Menu.objects.filter(name="Veggie Wrap").delete()
+        response = self.client.get(url, {"q": "sauce"})
+        self.assertEqual(response.data["results"], [])
+
+        # query syntax is treated as plain words
+        response = self.client.get(url, {"q": 'hot" OR NEAR(*'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_search_tolerates_typos_and_autocomplete_needs_no_queries(self):
+        Menu.objects.create(name="Spicy Jollof Rice", price=8.00, vendor=self.vendor)
+        self.authenticate(self.student)
+
+        response = self.client.get(reverse("menu:menu-search"), {"q": "burgr"})
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Burger"])
+        response = self.client.get(reverse("menu:menu-search"), {"q": "jollof rce"})
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Spicy Jollof Rice"])
+
+        # typo-tolerant results page with their own cursor
+        with self.captureOnCommitCallbacks(execute=True):
+            extra = Menu.objects.create(name="Cheese Burger", price=9.00, vendor=self.vendor)
+        response = self.client.get(reverse("menu:menu-search"), {"q": "burgr", "page_size": 1})
+        self.assertEqual(len(response.data["results"]), 1)
+        first = response.data["results"][0]["name"]
+        response = self.client.get(reverse("menu:menu-search"), {"q": "burgr", "cursor": response.data["next_cursor"]})
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertNotEqual(response.data["results"][0]["name"], first)
+        # a full-text cursor never falls back to fuzzy results
+        cursor = base64.urlsafe_b64encode(json.dumps({"v": -100.0, "pk": 0}).encode()).decode()
+        response = self.client.get(reverse("menu:menu-search"), {"q": "burgr", "cursor": cursor})
+        self.assertEqual(response.data["results"], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            extra.delete()
+
+        url = reverse("menu:menu-autocomplete")
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"q": "jollof ri"})
+        self.assertEqual(response.data["results"][0]["name"], "Spicy Jollof Rice")
+
+        # saved items are folded into the in-process index once committed
+        with self.captureOnCommitCallbacks(execute=True):
+            Menu.objects.create(name="Burrito", price=7.00, vendor=self.vendor)
+            self.menu2.available = True
+            self.menu2.save()
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"q": "bur"})
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Burger", "Burrito"])
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"q": "fr"})
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Fries"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.menu1.delete()
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"q": "bur"})
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Burrito"])
+
+    def test_menu_reads_are_cached_until_the_menu_changes(self):
+        self.authenticate(self.student)
+        url = reverse("menu:menu-list")
+
+        response = self.client.get(url, {"ordering": "price", "page_size": 5})
+        self.assertEqual(response["X-Cache"], "MISS")
+        # parameter order does not matter, and a repeat read skips the database
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"page_size": 5, "ordering": "price"})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Burger"])
+
+        self.authenticate(self.vendor)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse("menu:menu-toggle-availability", args=[self.menu2.id]))
+        self.authenticate(self.student)
+        response = self.client.get(url, {"ordering": "price", "page_size": 5})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Fries", "Burger"])
+
+        response = self.client.get(reverse("menu:menu-detail", args=[self.menu1.id]))
+        response = self.client.get(reverse("menu:menu-detail", args=[self.menu1.id]))
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(cache_stats(), {"hits": 2, "misses": 3, "hit_ratio": 0.4})
+
+        # deleting a vendor retires the responses showing its items
+        other = UserProfile.objects.create_user(
+            username="vendor3", password="pass1234", role="vendor", vendor_name="Vendor Three"
+        )
+        self.client.get(url, {"ordering": "price", "page_size": 5})
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(self.client.get(url, {"ordering": "price", "page_size": 5})["X-Cache"], "MISS")
+
+        # an evicted version is replaced rather than reused
+        version = get_version()
+        cache.delete(VERSION_KEY)
+        self.assertNotEqual(bump_version(), version)
+
+    def test_menu_version_is_read_from_the_configured_cache(self):
+        self.authenticate(self.student)
+        url = reverse("menu:menu-list")
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+        # a bump by another worker, seen only through the cache, retires the response here too
+        cache.incr(VERSION_KEY)
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+
+        # no module state: another cache holds another version
+        shared = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "shared"}}
+        with override_settings(CACHES=shared):
+            caches["default"].set(VERSION_KEY, 42, None)
+            self.assertEqual(get_version(), 42)
+
+        # several workers with per-process caches would serve stale responses, so none are cached
+        with override_settings(WEB_CONCURRENCY=4):
+            self.assertFalse(cache_is_shared())
+            self.assertEqual(self.client.get(url)["X-Cache"], "BYPASS")
+            self.assertEqual(self.client.get(url)["X-Cache"], "BYPASS")
+
+    def test_stateless_menu_reads_refuse_deactivated_users(self):
+        url = reverse("menu:menu-list")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.student)}")
+        self.client.get(url)
+
+        # a cached read with a real token still skips the database
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "HIT")
+
+        self.student.is_active = False
+        self.student.save()
+        for view_name in ["menu:menu-list", "menu:menu-catalog", "menu:menu-autocomplete"]:
+            response = self.client.get(reverse(view_name))
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data["code"], "user_inactive")
+
+        self.student.is_active = True
+        self.student.save(update_fields=["is_active"])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_catalog_snapshot_is_served_with_etag_and_revalidated(self):
+        self.authenticate(self.student)
+        url = reverse("menu:menu-catalog")
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        catalog = json.loads(response.content)
+        self.assertEqual(catalog["vendors"][0]["name"], "Vendor One")
+        self.assertEqual([item["name"] for item in catalog["vendors"][0]["items"]], ["Burger"])
+        etag = response["ETag"]
+
+        # an unchanged catalog revalidates without touching the database
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+        # a menu change republishes the snapshot under a new ETag
+        with self.captureOnCommitCallbacks(execute=True):
+            self.menu2.available = True
+            self.menu2.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(json.loads(response.content)["vendors"][0]["items"]), 2)
+
+        # saving many items in one transaction rebuilds the catalog once
+        with mock.patch("menu.catalog.build_catalog", wraps=build_catalog) as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for menu in Menu.objects.all():
+                        menu.save()
+        self.assertEqual(build.call_count, 1)
+
+        # a snapshot built from an older menu version is not served
+        etag = response["ETag"]
+        cache.set(CATALOG_KEY, {"body": b"{}", "etag": '"stale"', "version": get_version() - 1}, None)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["ETag"], etag)
+
+        # a change by another worker is only seen through the shared version
+        Menu.objects.filter(pk=self.menu2.pk).update(available=False)
+        self.assertEqual(self.client.get(url)["ETag"], etag)
+        cache.incr(VERSION_KEY)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)["vendors"][0]["items"]), 1)
+
+        # with per-process caches on several workers there is no snapshot to go stale
+        with override_settings(WEB_CONCURRENCY=4):
+            Menu.objects.filter(pk=self.menu2.pk).update(available=True)
+            response = self.client.get(url)
+        self.assertEqual(len(json.loads(response.content)["vendors"][0]["items"]), 2)
+
+    def test_uploaded_images_get_resized_variants(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        buffer = BytesIO()
+        Image.new("RGB", (1200, 800), "orange").save(buffer, format="PNG")
+        upload = SimpleUploadedFile("pizza.png", buffer.getvalue(), content_type="image/png")
+
+        self.authenticate(self.vendor)
+        with override_settings(MEDIA_ROOT=media_root, MENU_IMAGE_WORKERS=0, MENU_IMAGE_WIDTHS=[160, 640]):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse("menu:menu-create"), {
+                    "name": "Pizza", "price": "12.00", "image": upload,
+                }, format="multipart")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            menu = Menu.objects.get(name="Pizza")
+
+            self.authenticate(self.student)
+            variants = self.client.get(reverse("menu:menu-detail", args=[menu.id])).data["image_variants"]
+            self.assertEqual(set(variants), {"jpeg", "webp"})
+            self.assertEqual(set(variants["webp"]), {"160w", "640w"})
+
+            thumbnail = os.path.join(media_root, menu.image_variants["formats"]["webp"]["160"])
+            with Image.open(thumbnail) as image:
+                self.assertEqual((image.format, image.size), ("WEBP", (160, 107)))
+            self.assertLess(os.path.getsize(thumbnail), len(buffer.getvalue()))
+
+            # variants of a replaced image are not served
+            Menu.objects.filter(pk=menu.pk).update(image="other.png")
+            menu.refresh_from_db()
+            self.assertEqual(MenuSerializer(menu).data["image_variants"], {})
+
+            # deleting the item deletes its variant files
+            with self.captureOnCommitCallbacks(execute=True):
+                menu.delete()
+            self.assertFalse(os.path.exists(thumbnail))
+
+    def test_identical_uploads_share_one_reference_counted_blob(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+
+        def photo(name, color):
+            buffer = BytesIO()
+            Image.new("RGB", (40, 40), color).save(buffer, format="PNG")
+            return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+        with override_settings(MEDIA_ROOT=media_root):
+            pizza = Menu.objects.create(name="Pizza", price=12, vendor=self.vendor, image=photo("pizza.png", "red"))
+            pasta = Menu.objects.create(name="Pasta", price=9, vendor=self.vendor, image=photo("IMG_1.PNG", "red"))
+            self.assertEqual(pizza.image.name, pasta.image.name)
+            self.assertTrue(pizza.image.name.startswith("blobs/"))
+            self.assertEqual(ImageBlob.objects.get(name=pizza.image.name).ref_count, 2)
+
+            # blob URLs name their content and are cacheable forever
+            response = serve_media(RequestFactory().get("/"), pizza.image.name, document_root=media_root)
+            self.assertIn("immutable", response["Cache-Control"])
+
+            shared = pizza.image.name
+            pasta = Menu.objects.get(pk=pasta.pk)
+            pasta.image = photo("pasta.png", "yellow")
+            pasta.save()
+            pizza.delete()
+            self.assertEqual(ImageBlob.objects.get(name=shared).ref_count, 0)
+            self.assertEqual(ImageBlob.objects.get(name=pasta.image.name).ref_count, 1)
+
+            # only the orphan is reclaimed
+            call_command("gc_media_blobs", "--grace-hours=0", stdout=StringIO())
+            self.assertFalse(os.path.exists(os.path.join(media_root, shared)))
+            self.assertTrue(os.path.exists(os.path.join(media_root, pasta.image.name)))
+            self.assertFalse(ImageBlob.objects.filter(name=shared).exists())
+
+            # a drifted count never reclaims an image a menu item still uses
+            ImageBlob.objects.filter(name=pasta.image.name).update(ref_count=0)
+            call_command("gc_media_blobs", "--grace-hours=0", stdout=StringIO())
+            self.assertTrue(os.path.exists(os.path.join(media_root, pasta.image.name)))
+
+    def test_vendor_bulk_upsert_validates_everything_before_writing(self):
+        other_vendor = UserProfile.objects.create_user(
+            username="vendor2", password="pass1234", role="vendor", vendor_name="Vendor Two"
+        )
+        Menu.objects.create(name="Salad", price=6.00, vendor=other_vendor)
+        url = reverse("menu:vendor-menu-bulk-upsert")
+        self.authenticate(self.vendor)
+
+        # one bad row rejects the whole upload, with errors per row
+        items = [
+            {"name": "Burger", "price": "11.00"},
+            {"name": "Salad", "price": "5.00"},
+            {"name": "Pizza"},
+            {"name": "Pizza", "price": "-1"},
+        ]
+        response = self.client.post(url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3, 4])
+        self.assertIn("name", response.data["errors"][0]["errors"])
+        self.assertEqual(Menu.objects.get(pk=self.menu1.pk).price, 10.50)
+
+        # a valid upload of any size runs a fixed number of queries
+        items = [{"name": "Burger", "price": "11.00", "available": False}] + [
+            {"name": f"Dish {number}", "price": "5.00"} for number in range(40)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(8):
+                response = self.client.post(url, {"items": items}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["created"], response.data["updated"]), (40, 1))
+        self.menu1.refresh_from_db()
+        self.assertEqual((self.menu1.price, self.menu1.available), (11, False))
+
+        # the new items are searchable right away
+        self.authenticate(self.student)
+        response = self.client.get(reverse("menu:menu-search"), {"q": "dish 39"})
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Dish 39"])
+
+        # CSV upload, through the management command as well
+        self.authenticate(self.vendor)
+        upload = SimpleUploadedFile("menu.csv", b"name,price,description\nDish 1,7.50,\nWrap,4.00,Chicken wrap\n")
+        response = self.client.post(url + "?dry_run=true", {"file": upload}, format="multipart")
+        self.assertEqual((response.data["created"], response.data["updated"], response.data["dry_run"]), (1, 1, True))
+        self.assertFalse(Menu.objects.filter(name="Wrap").exists())
+
+        # an upload named without an extension gives its format as ?file_format=
+        upload = SimpleUploadedFile("menu", b"name,price\nWrap,4.00\n", content_type="application/octet-stream")
+        response = self.client.post(url + "?dry_run=true&file_format=csv", {"file": upload}, format="multipart")
+        self.assertEqual((response.status_code, response.data["created"]), (status.HTTP_200_OK, 1))
+
+        # a name taken by a concurrent upload after the check is a row error, not a server error
+        with mock.patch("menu.bulk._menus_named", side_effect=[{}, {"Burger": self.menu1}]):
+            response = self.client.post(url, [{"name": "Burger", "price": "9.00"}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([(error["row"], error["name"]) for error in response.data["errors"]], [(1, "Burger")])
+
+        path = os.path.join(tempfile.mkdtemp(), "menu.json")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, "w") as file:
+            json.dump([{"name": "Wrap", "price": 4}], file)
+        call_command("import_menu", "vendor1", path, stdout=StringIO())
+        self.assertEqual(Menu.objects.get(name="Wrap").vendor_id, self.vendor.id)
+
+    def test_bulk_availability_and_scheduled_windows(self):
+        other_vendor = UserProfile.objects.create_user(
+            username="vendor2", password="pass1234", role="vendor", vendor_name="Vendor Two"
+        )
+        other_menu = Menu.objects.create(name="Salad", price=6.00, vendor=other_vendor)
+        Menu.objects.create(name="Cheese Burger", price=12.00, vendor=self.vendor)
+        url = reverse("menu:vendor-menu-bulk-availability")
+        self.authenticate(self.vendor)
+
+        # exactly one way of choosing the items
+        response = self.client.patch(url, {"available": False, "all": True, "name": "burger"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # by name, as one update of the rows that change
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {"available": False, "name": "burger"}, format="json")
+        self.assertEqual(response.data["updated"], 2)
+        self.assertFalse(Menu.objects.filter(vendor=self.vendor, available=True).exists())
+
+        # closing time switches off only the vendor's own items, and reads see it
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {"available": True, "all": True}, format="json")
+        self.assertEqual(response.data["updated"], 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {"available": False, "ids": [self.menu2.id, other_menu.id]}, format="json")
+        self.assertEqual(response.data["ids"], [self.menu2.id])
+        self.assertTrue(Menu.objects.get(pk=other_menu.pk).available)
+        self.authenticate(self.student)
+        response = self.client.get(reverse("menu:menu-list"))
+        self.assertEqual([item["name"] for item in response.data["results"]], ["Burger", "Cheese Burger", "Salad"])
+
+        # a breakfast window applies at once and then follows the clock
+        self.authenticate(self.vendor)
+        url = reverse("menu:menu-availability-windows", args=[self.menu1.id])
+        response = self.client.put(url, [{"opens_at": "07:00", "closes_at": "07:00"}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(url, [{"opens_at": "07:00", "closes_at": "11:00"}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["windows"], [{"weekday": None, "opens_at": "07:00:00", "closes_at": "11:00:00"}])
+
+        breakfast = timezone.make_aware(datetime(2026, 10, 16, 8, 0))
+        lunch = timezone.make_aware(datetime(2026, 10, 16, 12, 0))
+        refresh_availability(breakfast)
+        self.assertEqual(refresh_availability(breakfast), {"opened": 0, "closed": 0, "cleared": 0})
+        self.menu1.refresh_from_db()
+        self.assertEqual((self.menu1.available, self.menu1.schedule_open), (True, True))
+        self.assertEqual(refresh_availability(lunch), {"opened": 0, "closed": 1, "cleared": 0})
+        self.assertFalse(Menu.objects.get(pk=self.menu1.pk).available)
+
+        # a manual toggle stands until the next transition
+        self.client.patch(reverse("menu:menu-toggle-availability", args=[self.menu1.id]))
+        self.assertEqual(refresh_availability(lunch), {"opened": 0, "closed": 0, "cleared": 0})
+        self.assertTrue(Menu.objects.get(pk=self.menu1.pk).available)
+
+        # removing the schedule hands the item back to the vendor
+        response = self.client.put(url, [], format="json")
+        self.assertIsNone(response.data["schedule_open"])
+        self.assertTrue(response.data["available"])
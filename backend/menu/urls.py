@@ -8,7 +8,9 @@ urlpatterns = [
     # Public menu endpoints (all authenticated users)
     path('', views.MenuListView.as_view(), name='menu-list'),
     path('<int:pk>/', views.MenuDetailView.as_view(), name='menu-detail'),
+    path('catalog/', views.MenuCatalogView.as_view(), name='menu-catalog'),
     path('search/', views.SearchMenuView.as_view(), name='menu-search'),
+    path('autocomplete/', views.MenuAutocompleteView.as_view(), name='menu-autocomplete'),
     path('stats/', views.MenuStatsView.as_view(), name='menu-stats'),
 
     # Menu management endpoints (vendors only)
@@ -16,8 +18,11 @@ urlpatterns = [
     path('<int:pk>/update', views.MenuUpdateView.as_view(), name='menu-update'),
     path('<int:pk>/delete', views.MenuDeleteView.as_view(), name='menu-delete'),
     path('<int:pk>/toggle-availability', views.ToggleMenuAvailabilityView.as_view(), name='menu-toggle-availability'),
+    path('<int:pk>/availability-windows', views.MenuAvailabilityWindowsView.as_view(), name='menu-availability-windows'),
     
     # Vendor-specific endpoints
     path('vendor/my-menus/', views.VendorMenuListView.as_view(), name='vendor-menu-list'),
     path('vendor/create', views.VendorMenuCreateView.as_view(), name='vendor-menu-create'),
+    path('vendor/bulk-upsert', views.VendorMenuBulkUpsertView.as_view(), name='vendor-menu-bulk-upsert'),
+    path('vendor/availability', views.VendorMenuBulkAvailabilityView.as_view(), name='vendor-menu-bulk-availability'),
 ]
\ No newline at end of file
@@ -3,20 +3,37 @@ from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import permissions, status
-from django.db.models import Q, Avg
+from django.db.models import Avg
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
-from django.core.paginator import Paginator
+from django.utils.http import parse_etags
 from django.core.exceptions import ValidationError
 from drf_spectacular.utils import extend_schema, OpenApiResponse
+from turbocafe.authentication import ActiveUserStatelessAuthentication
+from turbocafe.pagination import paginate
 from auth.models import UserProfile
 from .models import Menu
+from .availability import replace_windows
+from .bulk import (
+    BULK_CONTENT_TYPES, BULK_FORMATS, BulkFormatError, read_rows, rows_from_data, set_availability, upsert_menus
+)
+from .cache import cached_menu_response
+from .catalog import get_catalog
+from .images import schedule_variants
+from .fuzzy import autocomplete, fuzzy_search
+from .search import RANK_FIELD, search_menus
 from .serializers import (
     MenuSerializer, 
     MenuListSerializer, 
-    MenuCreateUpdateSerializer
+    MenuCreateUpdateSerializer,
+    MenuBulkAvailabilitySerializer,
+    MenuAvailabilityWindowSerializer
 )
 from .permissions import IsVendorOrReadOnly, IsOwnerOrReadOnly, IsVendorOnly
 
+# Marks search cursors that page typo-tolerant results
+FUZZY_CURSOR_PREFIX = 'fuzzy:'
+
 
 @extend_schema(
     description="List all available menu items from all vendors",
@@ -31,8 +48,12 @@ class MenuListView(APIView):
     List all available menu items from all vendors.
     Supports filtering, searching, and ordering.
     """
+    # Menu reads trust the token's claims instead of loading the user, so a
+    # cached response is served without touching the database
+    authentication_classes = [ActiveUserStatelessAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     
+    @cached_menu_response
     def get(self, request):
         queryset = Menu.objects.select_related('vendor').all()
         
@@ -43,29 +64,14 @@ class MenuListView(APIView):
         queryset = self._apply_search(queryset, request)
         
         # Apply ordering
-        queryset = self._apply_ordering(queryset, request)
+        ordering = self._get_ordering(request)
         
         # Paginate results
-        page_size = int(request.GET.get('page_size', 20))
-        page = int(request.GET.get('page', 1))
-        
-        paginator = Paginator(queryset, page_size)
-        page_obj = paginator.get_page(page)
-        
-        serializer = MenuListSerializer(page_obj, many=True)
-        
-        return Response({
-            'count': paginator.count,
-            'num_pages': paginator.num_pages,
-            'current_page': page,
-            'has_next': page_obj.has_next(),
-            'has_previous': page_obj.has_previous(),
-            'results': serializer.data
-        })
+        return Response(paginate(queryset, request, ordering, MenuListSerializer))
     
     def _apply_filters(self, queryset, request):
         """Apply filtering based on query parameters."""
-        # Filter by availability
+        # Filter by availability (scheduled items are kept current by menu.availability)
         available = request.GET.get('available')
         if available is not None:
             if available.lower() == 'true':
@@ -112,24 +118,51 @@ class MenuListView(APIView):
         """Apply search based on query parameters."""
         search = request.GET.get('search', '').strip()
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | 
-                Q(description__icontains=search) |
-                Q(vendor__vendor_name__icontains=search)
-            )
+            queryset = search_menus(queryset, search)
         return queryset
     
-    def _apply_ordering(self, queryset, request):
-        """Apply ordering based on query parameters."""
-        ordering = request.GET.get('ordering', 'name')
+    def _get_ordering(self, request):
+        """Return the ordering requested in the query parameters."""
+        # Searches are ordered by relevance unless another ordering is asked for
+        default = RANK_FIELD if request.GET.get('search', '').strip() else 'name'
+        ordering = request.GET.get('ordering', default)
         valid_orderings = ['name', '-name', 'price', '-price', 'created_at', '-created_at']
         
-        if ordering in valid_orderings:
-            queryset = queryset.order_by(ordering)
+        if ordering not in valid_orderings:
+            ordering = default
+        
+        return ordering
+
+
+@extend_schema(
+    description="Every available menu item grouped by vendor, as one precomputed JSON document. "
+                "Send the ETag back in If-None-Match to get a 304 while the menu is unchanged.",
+    summary="Menu catalog snapshot",
+    responses={
+        200: OpenApiResponse(description="Catalog grouped by vendor"),
+        304: OpenApiResponse(description="Catalog unchanged")
+    }
+)
+class MenuCatalogView(APIView):
+    """
+    Serve the published catalog snapshot with a strong ETag.
+    """
+    authentication_classes = [ActiveUserStatelessAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        body, etag = get_catalog()
+        
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
         else:
-            queryset = queryset.order_by('name')
+            response = HttpResponse(body, content_type='application/json')
         
-        return queryset
+        # Clients may keep the document but must revalidate it on every use
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
 
 @extend_schema(
@@ -144,8 +177,10 @@ class MenuDetailView(APIView):
     """
     Retrieve a specific menu item.
     """
+    authentication_classes = [ActiveUserStatelessAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     
+    @cached_menu_response
     def get(self, request, pk):
         menu = get_object_or_404(Menu.objects.select_related('vendor'), pk=pk)
         serializer = MenuSerializer(menu)
@@ -170,7 +205,9 @@ class MenuCreateView(APIView):
         serializer = MenuCreateUpdateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             userprofile = UserProfile.objects.get(id=request.user.id)
-            serializer.save(vendor=userprofile)
+            menu = serializer.save(vendor=userprofile)
+            if menu.image:
+                schedule_variants(menu)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -191,14 +228,7 @@ class MenuUpdateView(APIView):
     permission_classes = [IsOwnerOrReadOnly]
     
     def get_object(self, pk, user):
-        try:
-            menu = Menu.objects.get(pk=pk)
-            print(menu)
-            if menu.vendor.id != user.id:
-                return None
-            return menu
-        except Menu.DoesNotExist:
-            return None
+        return Menu.objects.editable_by(user).filter(pk=pk).first()
     
     def put(self, request, pk):
         menu = self.get_object(pk, request.user)
@@ -208,9 +238,12 @@ class MenuUpdateView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        previous_image = menu.image.name
         serializer = MenuCreateUpdateSerializer(menu, data=request.data, context={'request': request})
         if serializer.is_valid():
-            serializer.save()
+            menu = serializer.save()
+            if menu.image and menu.image.name != previous_image:
+                schedule_variants(menu)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -222,9 +255,12 @@ class MenuUpdateView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        previous_image = menu.image.name
         serializer = MenuCreateUpdateSerializer(menu, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
-            serializer.save()
+            menu = serializer.save()
+            if menu.image and menu.image.name != previous_image:
+                schedule_variants(menu)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -243,13 +279,7 @@ class MenuDeleteView(APIView):
     permission_classes = [IsOwnerOrReadOnly]
     
     def get_object(self, pk, user):
-        try:
-            menu = Menu.objects.get(pk=pk)
-            if menu.vendor != user:
-                return None
-            return menu
-        except Menu.DoesNotExist:
-            return None
+        return Menu.objects.editable_by(user).filter(pk=pk).first()
     
     def delete(self, request, pk):
         menu = self.get_object(pk, request.user)
@@ -277,42 +307,23 @@ class VendorMenuListView(APIView):
     permission_classes = [IsVendorOnly]
     
     def get(self, request):
-        queryset = Menu.objects.filter(vendor=request.user)
+        queryset = Menu.objects.editable_by(request.user)
         
         # Apply search
         search = request.GET.get('search', '').strip()
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | 
-                Q(description__icontains=search)
-            )
+            queryset = search_menus(queryset, search)
         
-        # Apply ordering
-        ordering = request.GET.get('ordering', 'name')
+        # Apply ordering, by relevance for searches unless another ordering is asked for
+        default = RANK_FIELD if search else 'name'
+        ordering = request.GET.get('ordering', default)
         valid_orderings = ['name', '-name', 'price', '-price', 'created_at', '-created_at', 'available', '-available']
         
-        if ordering in valid_orderings:
-            queryset = queryset.order_by(ordering)
-        else:
-            queryset = queryset.order_by('name')
+        if ordering not in valid_orderings:
+            ordering = default
         
         # Paginate results
-        page_size = int(request.GET.get('page_size', 20))
-        page = int(request.GET.get('page', 1))
-        
-        paginator = Paginator(queryset, page_size)
-        page_obj = paginator.get_page(page)
-        
-        serializer = MenuSerializer(page_obj, many=True)
-        
-        return Response({
-            'count': paginator.count,
-            'num_pages': paginator.num_pages,
-            'current_page': page,
-            'has_next': page_obj.has_next(),
-            'has_previous': page_obj.has_previous(),
-            'results': serializer.data
-        })
+        return Response(paginate(queryset, request, ordering, MenuSerializer))
 
 @extend_schema(
     description="Create a new menu item for the authenticated vendor.",
@@ -333,10 +344,54 @@ class VendorMenuCreateView(APIView):
         serializer = MenuCreateUpdateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             userprofile = UserProfile.objects.get(id=request.user.id)
-            serializer.save(vendor=userprofile)
+            menu = serializer.save(vendor=userprofile)
+            if menu.image:
+                schedule_variants(menu)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@extend_schema(
+    description="Create or update many of the vendor's menu items at once, matched by name. "
+                "Send a JSON list (or {\"items\": [...]}) or upload a CSV/JSON `file`; its format comes from "
+                "?file_format=, else the upload's content type, else its extension. "
+                "Nothing is written unless every row is valid; ?dry_run=true only validates.",
+    summary="Bulk upsert vendor's menu items",
+    responses={
+        200: OpenApiResponse(description="Counts of created and updated items"),
+        400: OpenApiResponse(description="Per-row validation errors")
+    }
+)
+class VendorMenuBulkUpsertView(APIView):
+    """
+    Bulk create and update the authenticated vendor's menu items.
+    """
+    permission_classes = [IsVendorOnly]
+    
+    def post(self, request):
+        try:
+            upload = request.FILES.get('file')
+            if upload is not None:
+                # Not ?format=, which DRF reserves for picking a renderer
+                file_format = (
+                    request.GET.get('file_format')
+                    or BULK_CONTENT_TYPES.get(upload.content_type)
+                    or upload.name.rsplit('.', 1)[-1].lower()
+                )
+                if file_format not in BULK_FORMATS:
+                    raise BulkFormatError(f"Unsupported format. Use one of: {', '.join(BULK_FORMATS)}.")
+                rows = read_rows(upload.read(), file_format)
+            else:
+                rows = rows_from_data(request.data)
+        except BulkFormatError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        dry_run = request.GET.get('dry_run', 'false').lower() == 'true'
+        result = upsert_menus(request.user.id, rows, dry_run=dry_run)
+        result['dry_run'] = dry_run
+        if result['errors']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
+
 @extend_schema(
     description="Toggle the availability status of a menu item.",
     summary="Toggle menu item availability",
@@ -352,20 +407,105 @@ class ToggleMenuAvailabilityView(APIView):
     permission_classes = [IsVendorOnly]
     
     def patch(self, request, pk):
-        try:
-            menu_item = Menu.objects.get(pk=pk, vendor=request.user)
-        except Menu.DoesNotExist:
+        menu_item = Menu.objects.editable_by(request.user).filter(pk=pk).first()
+        if not menu_item:
             return Response(
                 {'error': 'Menu item not found or you do not have permission to modify it.'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
         
         menu_item.available = not menu_item.available
-        menu_item.save()
+        menu_item.save(update_fields=['available', 'updated_at'])
         
         serializer = MenuSerializer(menu_item)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+@extend_schema(
+    description="Make many of the vendor's menu items available or unavailable at once: "
+                "all of them ({\"all\": true}), a list of ids or a name filter. Runs as a single update.",
+    summary="Bulk set vendor's menu item availability",
+    request=MenuBulkAvailabilitySerializer,
+    responses={
+        200: OpenApiResponse(description="Ids of the menu items that changed"),
+        400: OpenApiResponse(description="Validation error")
+    }
+)
+class VendorMenuBulkAvailabilityView(APIView):
+    """
+    Set the availability of many of the authenticated vendor's menu items.
+    """
+    permission_classes = [IsVendorOnly]
+    
+    def patch(self, request):
+        serializer = MenuBulkAvailabilitySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        queryset = Menu.objects.editable_by(request.user)
+        if 'ids' in data:
+            queryset = queryset.filter(pk__in=data['ids'])
+        elif 'name' in data:
+            queryset = queryset.filter(name__icontains=data['name'])
+        
+        ids = set_availability(queryset, data['available'])
+        return Response({'available': data['available'], 'updated': len(ids), 'ids': ids}, status=status.HTTP_200_OK)
+
+@extend_schema(
+    description="Read or replace the times a menu item is served, e.g. breakfast from 07:00 to 11:00. "
+                "Scheduled items are switched on and off as their windows open and close; "
+                "an empty list returns the item to manual control.",
+    summary="Menu item availability windows",
+    request=MenuAvailabilityWindowSerializer(many=True),
+    responses={
+        200: OpenApiResponse(response=MenuAvailabilityWindowSerializer(many=True), description="The item's availability windows"),
+        400: OpenApiResponse(description="Validation error"),
+        404: OpenApiResponse(description="Menu item not found or you do not have permission to modify it")
+    }
+)
+class MenuAvailabilityWindowsView(APIView):
+    """
+    List or replace the availability windows of one of the vendor's menu items.
+    """
+    permission_classes = [IsVendorOnly]
+    
+    def get_object(self, pk, user):
+        return Menu.objects.editable_by(user).filter(pk=pk).first()
+    
+    def _response(self, menu_item):
+        windows = MenuAvailabilityWindowSerializer(menu_item.availability_windows.all(), many=True)
+        return Response({
+            'available': menu_item.available,
+            'schedule_open': menu_item.schedule_open,
+            'windows': windows.data,
+        }, status=status.HTTP_200_OK)
+    
+    def get(self, request, pk):
+        menu_item = self.get_object(pk, request.user)
+        if not menu_item:
+            return Response(
+                {'error': 'Menu item not found or you do not have permission to modify it.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return self._response(menu_item)
+    
+    def put(self, request, pk):
+        menu_item = self.get_object(pk, request.user)
+        if not menu_item:
+            return Response(
+                {'error': 'Menu item not found or you do not have permission to modify it.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        data = request.data.get('windows') if isinstance(request.data, dict) else request.data
+        serializer = MenuAvailabilityWindowSerializer(data=data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        replace_windows(menu_item, serializer.validated_data)
+        menu_item.refresh_from_db()
+        return self._response(menu_item)
+
 @extend_schema(
     description="Advanced search for menu items with multiple filters.",
     summary="Search menu items",
@@ -378,8 +518,11 @@ class SearchMenuView(APIView):
     """
     Advanced search for menu items with multiple filters.
     """
+    authentication_classes = [ActiveUserStatelessAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'search'
     
+    @cached_menu_response
     def get(self, request):
         query = request.GET.get('q', '').strip()
         min_price = request.GET.get('min_price')
@@ -389,14 +532,6 @@ class SearchMenuView(APIView):
         
         queryset = Menu.objects.select_related('vendor').all()
         
-        # Text search
-        if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) | 
-                Q(description__icontains=query) |
-                Q(vendor__vendor_name__icontains=query)
-            )
-        
         # Price range filter
         if min_price:
             try:
@@ -418,26 +553,57 @@ class SearchMenuView(APIView):
         if available_only.lower() == 'true':
             queryset = queryset.filter(available=True)
         
-        # Order by relevance (name match first, then price)
-        queryset = queryset.order_by('name', 'price')
-        
-        # Paginate results
-        page_size = int(request.GET.get('page_size', 20))
-        page = int(request.GET.get('page', 1))
-        
-        paginator = Paginator(queryset, page_size)
-        page_obj = paginator.get_page(page)
+        if not query:
+            # Order by name (names are unique, so this is a stable keyset)
+            return Response(paginate(queryset, request, 'name', MenuListSerializer))
         
-        serializer = MenuListSerializer(page_obj, many=True)
+        cursor = request.GET.get('cursor', '')
+        if cursor.startswith(FUZZY_CURSOR_PREFIX):
+            # Later pages of a typo-tolerant result set
+            return Response(self.fuzzy_page(request, queryset, query, cursor[len(FUZZY_CURSOR_PREFIX):]))
+
+        # Full-text search, every word matched as a prefix, ordered by relevance
+        page = paginate(search_menus(queryset, query), request, RANK_FIELD, MenuListSerializer)
+        if not page['results'] and not cursor:
+            # Nothing matched as typed, retry tolerating typos
+            page = self.fuzzy_page(request, queryset, query, '')
+        return Response(page)
+
+    def fuzzy_page(self, request, queryset, query, cursor):
+        """
+        Page typo-tolerant matches. Their cursors are prefixed so later pages
+        keep paging the fuzzy results rather than the full-text ones.
+        """
+        page = paginate(fuzzy_search(queryset, query), request, RANK_FIELD, MenuListSerializer, cursor=cursor)
+        for key in ('next_cursor', 'previous_cursor'):
+            if page[key]:
+                page[key] = FUZZY_CURSOR_PREFIX + page[key]
+        return page
+
+
+@extend_schema(
+    description="Suggest available menu items whose name has a word starting with the typed prefix. "
+                "Served from an in-process index without database queries.",
+    summary="Autocomplete menu items",
+    responses={
+        200: OpenApiResponse(description="Suggested menu items"),
+        400: OpenApiResponse(description="Bad request")
+    }
+)
+class MenuAutocompleteView(APIView):
+    """
+    Autocomplete suggestions for menu item names.
+    """
+    authentication_classes = [ActiveUserStatelessAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            limit = max(1, min(int(request.GET.get('limit', 8)), 20))
+        except ValueError:
+            return Response({'error': 'Invalid limit.'}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            'count': paginator.count,
-            'num_pages': paginator.num_pages,
-            'current_page': page,
-            'has_next': page_obj.has_next(),
-            'has_previous': page_obj.has_previous(),
-            'results': serializer.data
-        })
+        return Response({'results': autocomplete(request.GET.get('q', ''), limit)})
 
 @extend_schema(
     description="Get menu statistics. Vendors see their own stats, others see general stats.",
@@ -454,9 +620,9 @@ class MenuStatsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        if request.user.is_vendor:
+        if getattr(request.user, 'role', None) == 'vendor':
             # Vendor-specific stats
-            vendor_menus = Menu.objects.filter(vendor=request.user)
+            vendor_menus = Menu.objects.editable_by(request.user)
             stats = {
                 'total_items': vendor_menus.count(),
                 'available_items': vendor_menus.filter(available=True).count(),
@@ -0,0 +1,156 @@
+# order/broker.py
+import asyncio
+import secrets
+import threading
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+# Signing salt of stream tickets, so no other signed value can be used as one
+STREAM_TICKET_SALT = 'orders.events.ticket'
+
+# Cache key marking a ticket as spent, by the ticket's id
+SPENT_TICKET_KEY = 'orders:events:spent-ticket:{}'
+
+
+class Subscription:
+    """
+    A single stream listener. Events are delivered onto an asyncio queue owned
+    by the event loop the subscriber was created on.
+    """
+
+    def __init__(self, channels, loop, max_queue_size):
+        self.channels = frozenset(channels)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop the oldest event rather than block publishers
+            self.queue.get_nowait()
+            self.queue.put_nowait(event)
+
+    def deliver(self, event):
+        """Hand an event to the subscriber's loop. Safe to call from any thread."""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+
+class OrderEventBroker:
+    """
+    In-process publish/subscribe hub for order events.
+
+    Publishers are the synchronous order write paths; subscribers are async
+    streaming responses. Each event is routed to the channels of the order's
+    student, its vendor and the admin channel.
+
+    Events only reach streams held open by the same process, so the stream
+    must be served by a single ASGI worker process (see README).
+    """
+
+    def __init__(self, max_queue_size=100):
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def subscribe(self, channels):
+        """Register a listener on the running event loop for the given channels."""
+        subscription = Subscription(channels, asyncio.get_running_loop(), self.max_queue_size)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                listeners = self._subscriptions.get(channel)
+                if listeners:
+                    listeners.discard(subscription)
+                    if not listeners:
+                        del self._subscriptions[channel]
+
+    def publish(self, channels, event):
+        """Deliver an event to every listener of any of the channels, once each."""
+        with self._lock:
+            targets = set()
+            for channel in channels:
+                targets.update(self._subscriptions.get(channel, ()))
+        for subscription in targets:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # The subscriber's event loop is closed; publishing runs in
+                # commit hooks, which must not fail
+                self.unsubscribe(subscription)
+
+
+broker = OrderEventBroker()
+
+
+def channels_for_user(user):
+    """Return the channels a user may listen to."""
+    role = getattr(user, 'role', None)
+    if role == 'admin' or user.is_superuser:
+        return ['admin']
+    if role == 'vendor':
+        return [f'vendor:{user.id}']
+    return [f'student:{user.id}']
+
+
+def issue_stream_ticket(user):
+    """
+    Return a signed ticket that lets ``user`` open the event stream once
+    within the next ORDER_EVENT_TICKET_MAX_AGE seconds. Browsers' EventSource
+    cannot send headers, so the ticket goes in the URL instead of the access
+    token.
+    """
+    return signing.dumps({'user': user.id, 'jti': secrets.token_urlsafe(16)}, salt=STREAM_TICKET_SALT)
+
+
+def read_stream_ticket(ticket):
+    """
+    Return the user id of a valid, unexpired ticket and spend it, or None.
+    A ticket that leaked through a URL log cannot be replayed.
+    """
+    try:
+        payload = signing.loads(ticket, salt=STREAM_TICKET_SALT, max_age=settings.ORDER_EVENT_TICKET_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    jti = payload.get('jti')
+    # Kept as long as the ticket could still be valid; add() is atomic, so a
+    # ticket raced from two connections only opens one of them
+    if not jti or not cache.add(SPENT_TICKET_KEY.format(jti), True, settings.ORDER_EVENT_TICKET_MAX_AGE):
+        return None
+    return payload.get('user')
+
+
+def channels_for_order(order):
+    """Return the channels an order event is published to."""
+    return [f'student:{order.user_id}', f'vendor:{order.vendor_id}', 'admin']
+
+
+def order_event(event_type, order, previous_status=None):
+    """Build the compact payload pushed to clients for an order event."""
+    return {
+        'type': event_type,
+        'order': {
+            'id': order.id,
+            'status': order.status,
+            'previous_status': previous_status,
+            'user': order.user_id,
+            'vendor': order.vendor_id,
+            'menu_item': order.menu_item_id,
+            'quantity': order.quantity,
+            'total_price': str(order.total_price),
+            'updated_at': order.updated_at.isoformat() if order.updated_at else None,
+        },
+    }
+
+
+def publish_order_events(events):
+    """Publish ``(order, event)`` pairs to the channels of each order."""
+    for order, event in events:
+        broker.publish(channels_for_order(order), event)
@@ -0,0 +1,273 @@
+# order/eta.py
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from menu.models import Menu
+from .models import Order, PrepTimeEstimate
+
+# Orders in these statuses are still in a vendor's queue
+OPEN_STATUSES = ('pending', 'preparing')
+
+# Orders that took longer than this (e.g. placed while the vendor was closed)
+# are not used as prep time samples
+MAX_SAMPLE_SECONDS = 4 * 60 * 60
+
+
+def _smoothing():
+    return getattr(settings, 'PREP_TIME_SMOOTHING', 0.2)
+
+
+def _parallel_orders():
+    return max(1, getattr(settings, 'VENDOR_PARALLEL_ORDERS', 1))
+
+
+def _timeout():
+    return getattr(settings, 'ORDER_ETA_CACHE_TIMEOUT', 300)
+
+
+def _prep_key(vendor_id):
+    return f'orders:eta:prep:{vendor_id}'
+
+
+def _fresh_key(vendor_id):
+    return f'orders:eta:fresh:{vendor_id}'
+
+
+def _queue_key(vendor_id, item_id):
+    return f'orders:eta:queue:{vendor_id}:{item_id}'
+
+
+def _midpoint_seconds(wait_time_low, wait_time_high):
+    return (wait_time_low + wait_time_high) * 30
+
+
+def static_prep_seconds(menu_item):
+    """Midpoint of the vendor-entered wait time, used until an item has samples."""
+    return _midpoint_seconds(menu_item.wait_time_low, menu_item.wait_time_high)
+
+
+def _build_prep(vendor_id):
+    """Return the prep seconds of each of a vendor's menu items."""
+    prep = {}
+    for item in Menu.objects.filter(vendor_id=vendor_id).values(
+        'id', 'wait_time_low', 'wait_time_high', 'prep_time__avg_seconds'
+    ):
+        learned = item['prep_time__avg_seconds']
+        if learned is None:
+            learned = _midpoint_seconds(item['wait_time_low'], item['wait_time_high'])
+        prep[item['id']] = learned
+    return prep
+
+
+def _open_order_counts(vendor_id, item_ids):
+    counts = dict(
+        Order.objects.filter(vendor_id=vendor_id, menu_item_id__in=item_ids, status__in=OPEN_STATUSES)
+        .values('menu_item_id').annotate(count=Count('id')).order_by()
+        .values_list('menu_item_id', 'count')
+    )
+    return {item_id: counts.get(item_id, 0) for item_id in item_ids}
+
+
+def _rebuild_state(vendor_id):
+    """Store a vendor's prep times and queue counters fresh from the database."""
+    prep = _build_prep(vendor_id)
+    queue = _open_order_counts(vendor_id, list(prep))
+    cache.set_many({
+        _prep_key(vendor_id): prep,
+        **{_queue_key(vendor_id, item_id): count for item_id, count in queue.items()},
+    }, None)
+    cache.set(_fresh_key(vendor_id), True, _timeout())
+    return prep, queue
+
+
+def _cached_state(vendor_id):
+    """Return a vendor's cached prep times and queue counts, or None if any are gone."""
+    prep = cache.get(_prep_key(vendor_id))
+    if prep is None:
+        return None
+    keys = {_queue_key(vendor_id, item_id): item_id for item_id in prep}
+    counts = cache.get_many(keys)
+    if len(counts) < len(keys):
+        return None
+    return prep, {keys[key]: max(0, count) for key, count in counts.items()}
+
+
+def get_vendor_state(vendor_id, cached_only=False):
+    """
+    Return a vendor's ETA state: prep seconds and open order count per item
+    and the seconds of work queued ahead of a new order.
+
+    Prep times are cached per vendor and queue depths are per-item cache
+    counters that order events move with atomic incr/decr. Once the
+    vendor's freshness marker expires the next read rebuilds both from the
+    database, which bounds any drift. With ``cached_only`` the last known
+    state is returned even if stale, and None if it was evicted.
+    """
+    state = _cached_state(vendor_id)
+    if not cached_only and (state is None or cache.get(_fresh_key(vendor_id)) is None):
+        state = _rebuild_state(vendor_id)
+    if state is None:
+        return None
+    prep, queue = state
+    work = sum(count * prep[item_id] for item_id, count in queue.items())
+    return {'prep': prep, 'queue': queue, 'backlog': work / _parallel_orders()}
+
+
+def _state_for(vendor_id, states, cached_only=False):
+    if states is None:
+        return get_vendor_state(vendor_id, cached_only)
+    if vendor_id not in states:
+        states[vendor_id] = get_vendor_state(vendor_id, cached_only)
+    return states[vendor_id]
+
+
+def estimate_wait_minutes(menu_item, states=None, cached_only=False):
+    """
+    Return the live wait in minutes for a new order of a menu item: the work
+    already queued at its vendor plus the item's own prep time.
+
+    ``states`` is an optional dict used to share vendor states across the
+    items of one response. With ``cached_only`` no query is made and None is
+    returned if the vendor's state was evicted from the cache.
+    """
+    state = _state_for(menu_item.vendor_id, states, cached_only)
+    if state is None:
+        return None
+    prep = state['prep'].get(menu_item.id)
+    if prep is None:
+        prep = static_prep_seconds(menu_item)
+    return math.ceil((state['backlog'] + prep) / 60)
+
+
+def estimate_order_wait_minutes(order, states=None):
+    """
+    Return the estimated minutes until an open order is ready, or None once
+    it has left the queue.
+    """
+    if order.status not in OPEN_STATUSES:
+        return None
+    state = _state_for(order.vendor_id, states)
+    prep = state['prep'].get(order.menu_item_id)
+    if prep is None:
+        prep = static_prep_seconds(order.menu_item)
+    elapsed = (timezone.now() - order.created_at).total_seconds()
+    return max(0, math.ceil((state['backlog'] + prep - elapsed) / 60))
+
+
+def _rebuild_states(vendor_ids):
+    """
+    Rebuild vendors' cached ETA states now rather than on their next read,
+    so cached menu responses, which never query, keep live estimates.
+    """
+    for vendor_id in vendor_ids:
+        _rebuild_state(vendor_id)
+
+
+def _update_queues(queue_deltas):
+    """Move the queue counters of vendors' items by the given deltas."""
+    stale = set()
+    for vendor_id, deltas in queue_deltas.items():
+        for item_id, delta in deltas.items():
+            if not delta:
+                continue
+            try:
+                if delta > 0:
+                    cache.incr(_queue_key(vendor_id, item_id), delta)
+                else:
+                    cache.decr(_queue_key(vendor_id, item_id), -delta)
+            except ValueError:
+                # Evicted, or the item is new. This runs after commit, so
+                # seeding the counter from the database counts the change.
+                stale.add(vendor_id)
+    _rebuild_states(stale)
+
+
+def record_orders_created(orders):
+    """Add new orders to their vendor's queue once the transaction commits."""
+    queue_deltas = defaultdict(lambda: defaultdict(int))
+    for order in orders:
+        if order.status in OPEN_STATUSES:
+            queue_deltas[order.vendor_id][order.menu_item_id] += 1
+    if queue_deltas:
+        transaction.on_commit(lambda: _update_queues(queue_deltas))
+
+
+def record_orders_deleted(orders):
+    """Take deleted open orders out of their vendor's queue once committed."""
+    queue_deltas = defaultdict(lambda: defaultdict(int))
+    for order in orders:
+        if order.status in OPEN_STATUSES:
+            queue_deltas[order.vendor_id][order.menu_item_id] -= 1
+    if queue_deltas:
+        transaction.on_commit(lambda: _update_queues(queue_deltas))
+
+
+def _fold_samples(item_id, values, alpha):
+    """
+    Fold samples into an existing moving average with a single UPDATE.
+    Folding n samples in turn is ``avg * (1 - alpha)^n + offset``.
+    """
+    n = len(values)
+    offset = sum(alpha * (1 - alpha) ** (n - 1 - i) * value for i, value in enumerate(values))
+    return PrepTimeEstimate.objects.filter(menu_item_id=item_id).update(
+        avg_seconds=F('avg_seconds') * (1 - alpha) ** n + offset,
+        samples=F('samples') + n,
+    )
+
+
+def _learn(samples):
+    """
+    Fold prep time samples into each item's moving average with one UPDATE
+    per item, and return the new averages keyed by (vendor_id, item_id).
+    """
+    alpha = _smoothing()
+    for (vendor_id, item_id), values in samples.items():
+        if _fold_samples(item_id, values, alpha):
+            continue
+
+        # First samples for the item: start the average at the first one
+        avg = values[0]
+        for value in values[1:]:
+            avg += alpha * (value - avg)
+        try:
+            with transaction.atomic():
+                PrepTimeEstimate.objects.create(menu_item_id=item_id, avg_seconds=avg, samples=len(values))
+        except IntegrityError:
+            # Another request created the row first
+            _fold_samples(item_id, values, alpha)
+
+    averages = dict(
+        PrepTimeEstimate.objects.filter(menu_item_id__in=[item_id for _, item_id in samples])
+        .values_list('menu_item_id', 'avg_seconds')
+    )
+    return {(vendor_id, item_id): averages[item_id] for vendor_id, item_id in samples}
+
+
+def record_status_changes(changes):
+    """
+    Learn prep times from orders that became ready and take orders that left
+    the queue out of it.
+    """
+    queue_deltas = defaultdict(lambda: defaultdict(int))
+    samples = defaultdict(list)
+    for order, previous_status in changes:
+        was_open = previous_status in OPEN_STATUSES
+        is_open = order.status in OPEN_STATUSES
+        if was_open and not is_open:
+            queue_deltas[order.vendor_id][order.menu_item_id] -= 1
+        if order.status == 'ready' and was_open:
+            seconds = (order.updated_at - order.created_at).total_seconds()
+            if 0 < seconds <= MAX_SAMPLE_SECONDS:
+                samples[(order.vendor_id, order.menu_item_id)].append(seconds)
+
+    if queue_deltas:
+        transaction.on_commit(lambda: _update_queues(queue_deltas))
+    if samples:
+        learned = _learn(samples)
+        transaction.on_commit(lambda: _rebuild_states({vendor_id for vendor_id, _ in learned}))
@@ -0,0 +1,36 @@
+# order/eventlog.py
+from auth.models import is_admin
+
+from .models import OrderEvent
+
+
+def _event(event_type, order, previous_status=None):
+    return OrderEvent(
+        event_type=event_type,
+        order_id=order.id,
+        user_id=order.user_id,
+        vendor_id=order.vendor_id,
+        status=order.status,
+        previous_status=previous_status,
+    )
+
+
+def record_orders_created(orders):
+    """Append a created event for every new order with one INSERT."""
+    OrderEvent.objects.bulk_create(_event('created', order) for order in orders)
+
+
+def record_status_changes(changes):
+    """Append a status change event (including cancellations) for every changed order."""
+    OrderEvent.objects.bulk_create(
+        _event('status_changed', order, previous_status) for order, previous_status in changes
+    )
+
+
+def events_for_user(user):
+    """Return the event log rows a user may sync."""
+    if is_admin(user):
+        return OrderEvent.objects.all()
+    if getattr(user, 'role', None) == 'vendor':
+        return OrderEvent.objects.filter(vendor_id=user.id)
+    return OrderEvent.objects.filter(user_id=user.id)
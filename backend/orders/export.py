@@ -0,0 +1,71 @@
+# order/export.py
+import csv
+import heapq
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# (column name, queryset lookup) pairs written for every exported order
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+    ('status', 'status'),
+    ('quantity', 'quantity'),
+    ('total_price', 'total_price'),
+    ('user_id', 'user_id'),
+    ('user_name', 'customer_name'),
+    ('menu_item_id', 'menu_item_id'),
+    ('menu_item_name', 'item_name'),
+    ('unit_price', 'unit_price'),
+    ('vendor_id', 'vendor_id'),
+    ('vendor_name', 'vendor_name'),
+]
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the csv writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(querysets, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one tuple of column values per order, newest first, reading each
+    queryset with a chunked server-side iterator so no more than
+    ``chunk_size`` rows per queryset are held in memory at a time.
+
+    The querysets must be ordered by ``-created_at, -id``; their rows are
+    merged so the export stays in that order across tables.
+    """
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    created_at, order_id = lookups.index('created_at'), lookups.index('id')
+    return heapq.merge(
+        *(queryset.values_list(*lookups).iterator(chunk_size=chunk_size) for queryset in querysets),
+        key=lambda row: (row[created_at], row[order_id]),
+        reverse=True,
+    )
+
+
+def stream_csv(rows):
+    """Yield a CSV header line followed by one line per row."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(rows):
+    """Yield one JSON object per line for every row."""
+    names = [name for name, _ in EXPORT_COLUMNS]
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', stream_csv),
+    'ndjson': ('application/x-ndjson', stream_ndjson),
+}
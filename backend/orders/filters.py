@@ -0,0 +1,58 @@
+# order/filters.py
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+def day_start(value):
+    """
+    Return the aware datetime at which the given YYYY-MM-DD day starts, or None.
+    """
+    try:
+        day = parse_date(value) if value else None
+    except ValueError:
+        day = None
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_orders(queryset, params):
+    """Apply the status, vendor and date range filters of an order list query."""
+    # Filter by status
+    status_filter = params.get('status')
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    # Filter by vendor
+    vendor_id = params.get('vendor')
+    if vendor_id:
+        try:
+            queryset = queryset.filter(vendor_id=int(vendor_id))
+        except ValueError:
+            pass
+
+    # Half-open [start, end + 1 day) timestamp range so the created_at index is usable
+    start = day_start(params.get('start_date'))
+    if start:
+        queryset = queryset.filter(created_at__gte=start)
+
+    end = day_start(params.get('end_date'))
+    if end:
+        queryset = queryset.filter(created_at__lt=end + timedelta(days=1))
+
+    return queryset
+
+
+def search_orders(queryset, params):
+    """Apply the free-text ``search`` parameter of an order list query."""
+    search = params.get('search', '').strip()
+    if search:
+        queryset = queryset.filter(
+            Q(customer_name__icontains=search) |
+            Q(item_name__icontains=search) |
+            Q(vendor_name__icontains=search)
+        )
+    return queryset
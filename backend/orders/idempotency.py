@@ -0,0 +1,131 @@
+# order/idempotency.py
+import functools
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def _ttl():
+    return timedelta(hours=getattr(settings, 'IDEMPOTENCY_KEY_TTL_HOURS', 24))
+
+
+def _claim_lease():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_CLAIM_LEASE_SECONDS', 30))
+
+
+def _request_hash(request):
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.get_full_path().encode())
+    digest.update(request.body)
+    return digest.hexdigest()
+
+
+def _claim(user_id, key, request_hash):
+    """
+    Return ``(row, created)`` for a key. Retries find their row with one
+    SELECT; new keys are inserted, relying on the unique (user, key)
+    constraint to pick a single winner among concurrent duplicates.
+
+    A claim still pending after its lease belongs to a request whose worker
+    died; the first retry to re-stamp it takes it over.
+    """
+    existing = IdempotencyKey.objects.filter(user_id=user_id, key=key).first()
+    if existing is not None:
+        now = timezone.now()
+        if existing.created_at >= now - _ttl():
+            abandoned = (
+                existing.status_code is None
+                and existing.request_hash == request_hash
+                and existing.created_at < now - _claim_lease()
+            )
+            if abandoned and IdempotencyKey.objects.filter(
+                pk=existing.pk, status_code__isnull=True, created_at=existing.created_at
+            ).update(created_at=now):
+                existing.created_at = now
+                return existing, True
+            return existing, False
+        # Expired keys are evicted and the request runs as new
+        IdempotencyKey.objects.filter(pk=existing.pk).delete()
+
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(user_id=user_id, key=key, request_hash=request_hash), True
+    except IntegrityError:
+        # A concurrent duplicate inserted the key first
+        return IdempotencyKey.objects.get(user_id=user_id, key=key), False
+
+
+def idempotent(handler):
+    """
+    Make an APIView handler replay its first response for retries that carry
+    the same Idempotency-Key header.
+
+    Retries get the stored status and body without running validation or any
+    write. A key reused for a different request gets 422, and a retry that
+    arrives while the first request is still running gets 409 until the
+    claim's IDEMPOTENCY_CLAIM_LEASE_SECONDS run out. Server errors are not
+    stored so the client can retry them.
+    """
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return handler(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        request_hash = _request_hash(request)
+        # By id: JWT authentication yields an auth.User, not the UserProfile the key belongs to
+        record, created = _claim(request.user.id, key, request_hash)
+        if not created:
+            if record.request_hash != request_hash:
+                return Response(
+                    {'error': f'{IDEMPOTENCY_HEADER} was already used for a different request.'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            if record.status_code is None:
+                return Response(
+                    {'error': 'A request with this idempotency key is still being processed.'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            response = Response(record.response_body, status=record.status_code)
+            response['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = handler(self, request, *args, **kwargs)
+        except BaseException:
+            # Also on worker timeouts (SystemExit), so the retry is not
+            # refused until the lease runs out
+            IdempotencyKey.objects.filter(pk=record.pk, status_code__isnull=True).delete()
+            raise
+
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status_code=response.status_code, response_body=response.data
+            )
+        return response
+
+    return wrapper
+
+
+def purge_expired_keys():
+    """Delete idempotency keys older than the TTL. Returns the number deleted."""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=timezone.now() - _ttl()).delete()
+    return deleted
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.archive import archive_orders
+
+
+class Command(BaseCommand):
+    help = "Move completed and cancelled orders older than a given age into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'ORDER_ARCHIVE_AFTER_DAYS', 30),
+            help="Archive terminal orders not updated for this many days.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Number of orders moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        archived = archive_orders(before, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} orders last updated before {before:%Y-%m-%d %H:%M}."))
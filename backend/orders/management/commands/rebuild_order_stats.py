@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from orders.stats import rebuild_all_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute every order stats counter row from the order and archive tables."
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_all_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} order stats rows."))
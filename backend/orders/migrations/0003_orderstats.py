@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_checkout_order_checkout'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('global', 'Global'), ('vendor', 'Vendor'), ('student', 'Student')], max_length=10)),
+                ('subject_id', models.PositiveBigIntegerField(default=0, help_text='Vendor or student id, 0 for global')),
+                ('total_orders', models.IntegerField(default=0)),
+                ('pending_orders', models.IntegerField(default=0)),
+                ('preparing_orders', models.IntegerField(default=0)),
+                ('ready_orders', models.IntegerField(default=0)),
+                ('completed_orders', models.IntegerField(default=0)),
+                ('cancelled_orders', models.IntegerField(default=0)),
+                ('revenue_orders', models.IntegerField(default=0, help_text='Orders counted towards revenue')),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Order stats',
+                'constraints': [models.UniqueConstraint(fields=('scope', 'subject_id'), name='unique_order_stats_scope')],
+            },
+        ),
+    ]
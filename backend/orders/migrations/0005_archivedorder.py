@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('menu', '0002_alter_menu_image'),
+        ('orders', '0004_order_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('preparing', 'Preparing'), ('ready', 'Ready'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('checkout', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_items', to='orders.checkout')),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='menu.menu')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='authentication.userprofile')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_vendor_orders', to='authentication.userprofile')),
+            ],
+            options={
+                'verbose_name_plural': 'Archived orders',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['vendor', '-created_at', '-id'], name='archived_order_vendor_created'), models.Index(fields=['user', '-created_at', '-id'], name='archived_order_user_created'), models.Index(fields=['-created_at', '-id'], name='archived_order_created')],
+            },
+        ),
+    ]
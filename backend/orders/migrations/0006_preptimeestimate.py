@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0002_alter_menu_image'),
+        ('orders', '0005_archivedorder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrepTimeEstimate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('avg_seconds', models.FloatField()),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('menu_item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='prep_time', to='menu.menu')),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_preptimeestimate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('created', 'Created'), ('status_changed', 'Status changed')], max_length=20)),
+                ('order_id', models.BigIntegerField()),
+                ('user_id', models.BigIntegerField()),
+                ('vendor_id', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('preparing', 'Preparing'), ('ready', 'Ready'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('previous_status', models.CharField(blank=True, choices=[('pending', 'Pending'), ('preparing', 'Preparing'), ('ready', 'Ready'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['user_id', 'id'], name='order_event_user'), models.Index(fields=['vendor_id', 'id'], name='order_event_vendor')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedorder',
+            name='customer_name',
+            field=models.CharField(default='', max_length=150),
+        ),
+        migrations.AddField(
+            model_name='archivedorder',
+            name='item_name',
+            field=models.CharField(default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='archivedorder',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='archivedorder',
+            name='vendor_name',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='customer_name',
+            field=models.CharField(default='', max_length=150),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='item_name',
+            field=models.CharField(default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='vendor_name',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
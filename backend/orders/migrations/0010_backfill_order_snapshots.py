@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery
+
+
+def backfill_snapshots(apps, schema_editor):
+    """
+    Fill the snapshot columns of existing orders with one UPDATE per table.
+    The unit price is taken from what was paid rather than today's menu price.
+    """
+    Menu = apps.get_model('menu', 'Menu')
+    UserProfile = apps.get_model('authentication', 'UserProfile')
+
+    for model_name in ('Order', 'ArchivedOrder'):
+        model = apps.get_model('orders', model_name)
+        model.objects.update(
+            item_name=Subquery(Menu.objects.filter(pk=OuterRef('menu_item_id')).values('name')[:1]),
+            unit_price=ExpressionWrapper(
+                F('total_price') / F('quantity'), output_field=DecimalField(max_digits=10, decimal_places=2)
+            ),
+            vendor_name=Subquery(UserProfile.objects.filter(pk=OuterRef('vendor_id')).values('vendor_name')[:1]),
+            customer_name=Subquery(UserProfile.objects.filter(pk=OuterRef('user_id')).values('username')[:1]),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('menu', '0002_alter_menu_image'),
+        ('orders', '0009_order_snapshots'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,68 @@
 from os import read
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
-from auth.models import UserProfile
+from auth.models import UserProfile, is_admin
 from menu.models import Menu
 
+STATUS_CHOICES = [
+    ('pending', 'Pending'),
+    ('preparing', 'Preparing'),
+    ('ready', 'Ready'),
+    ('completed', 'Completed'),
+    ('cancelled', 'Cancelled')
+]
+
+# Orders in these statuses never change again and can be archived
+TERMINAL_STATUSES = ('completed', 'cancelled')
+
+
+class OrderQuerySet(models.QuerySet):
+    """
+    Row-level scopes for orders. Ownership rules are applied in the WHERE
+    clause so a detail lookup or mutation is a single indexed query.
+    """
+
+    def visible_to(self, user):
+        """Orders a user may read: all for admins, otherwise placed by or with them."""
+        if not user.is_authenticated:
+            return self.none()
+        if is_admin(user):
+            return self
+        return self.filter(models.Q(user=user) | models.Q(vendor=user))
+
+    def placed_by(self, user):
+        """Orders a student placed."""
+        if not user.is_authenticated:
+            return self.none()
+        return self.filter(user=user)
+
+    def managed_by(self, user):
+        """Orders placed with a vendor."""
+        if not user.is_authenticated:
+            return self.none()
+        return self.filter(vendor=user)
+
+
 # Create your models here.
+class Checkout(models.Model):
+    """
+    Groups the orders placed together from a student's cart.
+    Each line item is an Order so the vendor workflow stays per item.
+    """
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='checkouts')
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    item_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Checkout {self.id} by {self.user_id}"
+
+    class Meta:
+        verbose_name_plural = "Checkouts"
+        ordering = ['-created_at']
+
+
 class Order(models.Model):
     """
     Represents an order in the food vendor application.
@@ -12,21 +70,179 @@ class Order(models.Model):
     user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='orders')
     menu_item = models.ForeignKey(Menu, on_delete=models.CASCADE, related_name='orders')
     vendor = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='vendor_orders')
+    checkout = models.ForeignKey(Checkout, on_delete=models.CASCADE, related_name='items', blank=True, null=True)
     quantity = models.PositiveIntegerField(default=1)
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
-    status = models.CharField(max_length=20, choices=[
-        ('pending', 'Pending'),
-        ('preparing', 'Preparing'),
-        ('ready', 'Ready'),
-        ('completed', 'Completed'),
-        ('cancelled', 'Cancelled')
-    ], default='pending')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Snapshot of the order line when it was placed, so listings need no joins
+    # and historical orders keep the price that was paid
+    item_name = models.CharField(max_length=100, default='')
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    vendor_name = models.CharField(max_length=100, blank=True, null=True)
+    customer_name = models.CharField(max_length=150, default='')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
     def __str__(self):
         return f"Order {self.id} by {self.user.username}"
 
+    def save(self, *args, **kwargs):
+        # Snapshot the line on first save unless the creator already did
+        if self._state.adding and not self.item_name:
+            self.item_name = self.menu_item.name
+            self.unit_price = self.menu_item.price
+            self.vendor_name = self.vendor.vendor_name
+            self.customer_name = self.user.username
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name_plural = "Orders"
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        # Trailing -id matches the keyset pagination tiebreaker so no sort step is needed
+        indexes = [
+            # Vendor queue filtered by status, newest first
+            models.Index(fields=['vendor', 'status', '-created_at', '-id'], name='order_vendor_status_created'),
+            # Vendor and student order lists, newest first
+            models.Index(fields=['vendor', '-created_at', '-id'], name='order_vendor_created'),
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_created'),
+            # Admin list and date range filters
+            models.Index(fields=['-created_at', '-id'], name='order_created'),
+        ]
+
+
+class ArchivedOrder(models.Model):
+    """
+    A completed or cancelled order moved out of the hot orders table by the
+    archive_orders command. Keeps the original order id and fields so the
+    order serializers work on it unchanged.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='archived_orders')
+    menu_item = models.ForeignKey(Menu, on_delete=models.CASCADE, related_name='archived_orders')
+    vendor = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='archived_vendor_orders')
+    checkout = models.ForeignKey(Checkout, on_delete=models.CASCADE, related_name='archived_items', blank=True, null=True)
+    quantity = models.PositiveIntegerField(default=1)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    item_name = models.CharField(max_length=100, default='')
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    vendor_name = models.CharField(max_length=100, blank=True, null=True)
+    customer_name = models.CharField(max_length=150, default='')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = OrderQuerySet.as_manager()
+
+    def __str__(self):
+        return f"Archived order {self.id}"
+
+    class Meta:
+        verbose_name_plural = "Archived orders"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['vendor', '-created_at', '-id'], name='archived_order_vendor_created'),
+            models.Index(fields=['user', '-created_at', '-id'], name='archived_order_user_created'),
+            models.Index(fields=['-created_at', '-id'], name='archived_order_created'),
+        ]
+
+
+class OrderStats(models.Model):
+    """
+    Running order counters for one stats scope (global, a vendor or a student).
+    Rows are built from the orders table on first read and then kept up to date
+    incrementally on every order write.
+    """
+    scope = models.CharField(max_length=10, choices=[
+        ('global', 'Global'),
+        ('vendor', 'Vendor'),
+        ('student', 'Student')
+    ])
+    subject_id = models.PositiveBigIntegerField(default=0, help_text="Vendor or student id, 0 for global")
+    total_orders = models.IntegerField(default=0)
+    pending_orders = models.IntegerField(default=0)
+    preparing_orders = models.IntegerField(default=0)
+    ready_orders = models.IntegerField(default=0)
+    completed_orders = models.IntegerField(default=0)
+    cancelled_orders = models.IntegerField(default=0)
+    revenue_orders = models.IntegerField(default=0, help_text="Orders counted towards revenue")
+    total_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.scope} stats {self.subject_id}"
+
+    class Meta:
+        verbose_name_plural = "Order stats"
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'subject_id'], name='unique_order_stats_scope'),
+        ]
+
+
+class PrepTimeEstimate(models.Model):
+    """
+    Learned preparation time of a menu item: an exponentially weighted moving
+    average of how long its orders took from being placed to being ready.
+    """
+    menu_item = models.OneToOneField(Menu, on_delete=models.CASCADE, related_name='prep_time')
+    avg_seconds = models.FloatField()
+    samples = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.menu_item}: {self.avg_seconds:.0f}s"
+
+
+class OrderEvent(models.Model):
+    """
+    Append-only log of order changes. Rows are never updated; the id is the
+    sync cursor clients pass back to fetch the events after it. Ids are plain
+    integers rather than foreign keys so events outlive archived orders.
+    """
+    EVENT_TYPES = [
+        ('created', 'Created'),
+        ('status_changed', 'Status changed'),
+    ]
+
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
+    order_id = models.BigIntegerField()
+    user_id = models.BigIntegerField()
+    vendor_id = models.BigIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    previous_status = models.CharField(max_length=20, choices=STATUS_CHOICES, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Order {self.order_id} {self.event_type}"
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['user_id', 'id'], name='order_event_user'),
+            models.Index(fields=['vendor_id', 'id'], name='order_event_vendor'),
+        ]
+
+
+class IdempotencyKey(models.Model):
+    """
+    The stored outcome of a state-changing order request sent with an
+    Idempotency-Key header. A retry with the same key replays the stored
+    response instead of running the request again. ``status_code`` stays
+    empty while the first request is still in flight.
+    """
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64, help_text="SHA-256 of the method, path and body")
+    status_code = models.PositiveSmallIntegerField(blank=True, null=True)
+    response_body = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.user_id}:{self.key}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
@@ -1,6 +1,8 @@
 # order/permissions.py
 from rest_framework import permissions
 
+from auth.models import is_admin
+
 
 class IsStudentOrReadOnly(permissions.BasePermission):
     """
@@ -31,7 +33,7 @@ class IsOrderOwnerOrVendor(permissions.BasePermission):
             return True
         
         # Admins can access all orders
-        if request.user.is_admin:
+        if is_admin(request.user):
             return True
         
         return False
@@ -78,13 +80,7 @@ class CanUpdateOrderStatus(permissions.BasePermission):
     """
     
     def has_permission(self, request, view):
-        print(f"Checking permission for user {request.user.is_authenticated} and role {request.user.role == 'vendor'}")
         return request.user.is_authenticated and request.user.role == 'vendor'
-    
-    def has_object_permission(self, request, view, obj):
-        print(f"Checking object permission for order {obj.vendor.id == request.user.id}")
-        # Only vendor of the order can update status
-        return obj.vendor.id == request.user.id
 
 
 class IsStudentOnly(permissions.BasePermission):
@@ -111,4 +107,12 @@ class IsAdminOnly(permissions.BasePermission):
     """
     
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.is_admin
\ No newline at end of file
+        return request.user.is_authenticated and is_admin(request.user)
+
+class IsVendorOrAdmin(permissions.BasePermission):
+    """
+    Permission that only allows vendors and admins to access the view.
+    """
+    
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (getattr(request.user, 'role', None) == 'vendor' or is_admin(request.user))
@@ -0,0 +1,68 @@
+# order/receivers.py
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .broker import order_event, publish_order_events
+from .models import ArchivedOrder, Order
+from .signals import orders_created, orders_status_changed
+from . import eta, eventlog, stats
+
+
+@receiver(orders_created)
+def update_stats_on_create(sender, orders, **kwargs):
+    stats.record_orders_created(orders)
+
+
+@receiver(orders_status_changed)
+def update_stats_on_status_change(sender, changes, **kwargs):
+    stats.record_status_changes(changes)
+
+
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=ArchivedOrder)
+def update_stats_on_delete(sender, instance, **kwargs):
+    # Covers admin deletes and cascades from deleted menu items and users
+    stats.record_orders_deleted([instance])
+
+
+@receiver(orders_created)
+def log_created_events(sender, orders, **kwargs):
+    eventlog.record_orders_created(orders)
+
+
+@receiver(orders_status_changed)
+def log_status_events(sender, changes, **kwargs):
+    eventlog.record_status_changes(changes)
+
+
+@receiver(orders_created)
+def update_eta_on_create(sender, orders, **kwargs):
+    eta.record_orders_created(orders)
+
+
+@receiver(orders_status_changed)
+def update_eta_on_status_change(sender, changes, **kwargs):
+    eta.record_status_changes(changes)
+
+
+@receiver(post_delete, sender=Order)
+def update_eta_on_delete(sender, instance, **kwargs):
+    # Open orders deleted by admins or cascades leave the queue; archived
+    # orders are closed already
+    eta.record_orders_deleted([instance])
+
+
+@receiver(orders_created)
+def push_created_events(sender, orders, **kwargs):
+    events = [(order, order_event('order.created', order)) for order in orders]
+    transaction.on_commit(lambda: publish_order_events(events))
+
+
+@receiver(orders_status_changed)
+def push_status_events(sender, changes, **kwargs):
+    events = [
+        (order, order_event('order.status_changed', order, previous_status))
+        for order, previous_status in changes
+    ]
+    transaction.on_commit(lambda: publish_order_events(events))
@@ -1,7 +1,12 @@
 # order/serializers.py
+from django.db import transaction
 from rest_framework import serializers
-from .models import Order
+from .eta import estimate_order_wait_minutes
+from .models import Checkout, Order, OrderEvent
+from .signals import orders_created
+from .transitions import check_transition
 from menu.models import Menu
+from menu.serializers import ImageVariantsField
 from auth.models import UserProfile
 
 
@@ -9,33 +14,37 @@ class OrderSerializer(serializers.ModelSerializer):
     """
     Full serializer for Order model with all related information.
     """
-    user_name = serializers.CharField(source='user.username', read_only=True)
+    user_name = serializers.CharField(source='customer_name', read_only=True)
     user_email = serializers.CharField(source='user.email', read_only=True)
     user_phone = serializers.CharField(source='user.phone_number', read_only=True)
-    menu_item_name = serializers.CharField(source='menu_item.name', read_only=True)
-    menu_item_price = serializers.DecimalField(source='menu_item.price', max_digits=10, decimal_places=2, read_only=True)
+    menu_item_name = serializers.CharField(source='item_name', read_only=True)
+    menu_item_price = serializers.DecimalField(source='unit_price', max_digits=10, decimal_places=2, read_only=True)
     menu_item_image = serializers.ImageField(source='menu_item.image', read_only=True)
-    vendor_name = serializers.CharField(source='vendor.vendor_name', read_only=True)
+    menu_item_image_variants = ImageVariantsField(source='menu_item')
     vendor_phone = serializers.CharField(source='vendor.phone_number', read_only=True)
+    estimated_wait_minutes = serializers.SerializerMethodField()
     
     class Meta:
         model = Order
         fields = [
             'id', 'user', 'menu_item', 'vendor', 'quantity', 'total_price', 
             'status', 'created_at', 'updated_at', 'user_name', 'user_email', 
-            'user_phone', 'menu_item_name', 'menu_item_price', 'menu_item_image',
-            'vendor_name', 'vendor_phone'
+            'user_phone', 'menu_item_name', 'menu_item_price', 'menu_item_image', 'menu_item_image_variants',
+            'vendor_name', 'vendor_phone', 'estimated_wait_minutes'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'user', 'vendor', 'total_price']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'user', 'vendor', 'total_price', 'vendor_name']
+    
+    def get_estimated_wait_minutes(self, obj):
+        return estimate_order_wait_minutes(obj, self.context.setdefault('vendor_eta_states', {}))
 
 
 class OrderListSerializer(serializers.ModelSerializer):
     """
-    Simplified serializer for order list views.
+    Simplified serializer for order list views. Reads only the order's own
+    snapshot columns, so listings need no joins.
     """
-    user_name = serializers.CharField(source='user.username', read_only=True)
-    menu_item_name = serializers.CharField(source='menu_item.name', read_only=True)
-    vendor_name = serializers.CharField(source='vendor.vendor_name', read_only=True)
+    user_name = serializers.CharField(source='customer_name', read_only=True)
+    menu_item_name = serializers.CharField(source='item_name', read_only=True)
     
     class Meta:
         model = Order
@@ -43,6 +52,7 @@ class OrderListSerializer(serializers.ModelSerializer):
             'id', 'quantity', 'total_price', 'status', 'created_at',
             'user_name', 'menu_item_name', 'vendor_name'
         ]
+        read_only_fields = fields
 
 
 class OrderCreateSerializer(serializers.ModelSerializer):
@@ -87,17 +97,108 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         # Create order
         user_profile = UserProfile.objects.get(id=user.id)
         vendor_profile = UserProfile.objects.get(id=menu_item.vendor.id)
-        order = Order.objects.create(
-            user=user_profile,
-            menu_item=menu_item,
-            vendor=vendor_profile,
-            quantity=quantity,
-            total_price=total_price
-        )
+        with transaction.atomic():
+            order = Order.objects.create(
+                user=user_profile,
+                menu_item=menu_item,
+                vendor=vendor_profile,
+                quantity=quantity,
+                total_price=total_price,
+                item_name=menu_item.name,
+                unit_price=menu_item.price,
+                vendor_name=vendor_profile.vendor_name,
+                customer_name=user_profile.username
+            )
+            orders_created.send(sender=Order, orders=[order])
         
         return order
 
 
+class CheckoutItemSerializer(serializers.Serializer):
+    """
+    A single cart line submitted at checkout.
+    """
+    menu_item = serializers.IntegerField()
+    quantity = serializers.IntegerField(default=1)
+
+    def validate_quantity(self, value):
+        """
+        Validate that quantity is positive.
+        """
+        if value <= 0:
+            raise serializers.ValidationError("Quantity must be greater than 0.")
+        if value > 50:  # Set maximum order quantity
+            raise serializers.ValidationError("Maximum quantity per order is 50.")
+        return value
+
+
+class CheckoutCreateSerializer(serializers.Serializer):
+    """
+    Serializer for placing every item in a cart as one checkout.
+    """
+    MAX_ITEMS = 20
+
+    items = CheckoutItemSerializer(many=True)
+
+    def validate_items(self, value):
+        """
+        Validate every cart line against the menu with a single query.
+        """
+        if not value:
+            raise serializers.ValidationError("Cart cannot be empty.")
+        if len(value) > self.MAX_ITEMS:
+            raise serializers.ValidationError(f"Maximum {self.MAX_ITEMS} items per checkout.")
+
+        menu_ids = [item['menu_item'] for item in value]
+        if len(set(menu_ids)) != len(menu_ids):
+            raise serializers.ValidationError("Each menu item can only appear once per checkout.")
+
+        menus = Menu.objects.select_related('vendor').in_bulk(menu_ids)
+        unavailable = [menu_id for menu_id in menu_ids if menu_id not in menus or not menus[menu_id].available]
+        if unavailable:
+            raise serializers.ValidationError(
+                f"Menu items unavailable: {', '.join(str(menu_id) for menu_id in unavailable)}."
+            )
+
+        for item in value:
+            item['menu_item'] = menus[item['menu_item']]
+        return value
+
+    def create(self, validated_data):
+        """
+        Create the checkout and all of its orders in one transaction.
+        """
+        user = self.context['request'].user
+        items = validated_data['items']
+
+        with transaction.atomic():
+            checkout = Checkout.objects.create(
+                user_id=user.id,
+                total_price=sum(item['menu_item'].price * item['quantity'] for item in items),
+                item_count=len(items),
+            )
+            orders = Order.objects.bulk_create([
+                Order(
+                    user_id=user.id,
+                    menu_item=item['menu_item'],
+                    vendor=item['menu_item'].vendor,
+                    checkout=checkout,
+                    quantity=item['quantity'],
+                    total_price=item['menu_item'].price * item['quantity'],
+                    item_name=item['menu_item'].name,
+                    unit_price=item['menu_item'].price,
+                    vendor_name=item['menu_item'].vendor.vendor_name,
+                    customer_name=user.username,
+                )
+                for item in items
+            ])
+            orders_created.send(sender=Order, orders=orders)
+
+        # Keep the created orders around so the response needs no re-fetch
+        checkout.created_orders = orders
+        return checkout
+
+
 class OrderUpdateSerializer(serializers.ModelSerializer):
     """
     Serializer for updating order status (vendors only).
@@ -111,25 +212,31 @@ class OrderUpdateSerializer(serializers.ModelSerializer):
         Validate status transitions.
         """
         if self.instance:
-            current_status = self.instance.status
-            
-            # Define valid status transitions
-            valid_transitions = {
-                'pending': ['preparing', 'cancelled'],
-                'preparing': ['ready', 'cancelled'],
-                'ready': ['completed', 'cancelled'],
-                'completed': [],  # No transitions from completed
-                'cancelled': []   # No transitions from cancelled
-            }
-            
-            if value not in valid_transitions.get(current_status, []):
-                raise serializers.ValidationError(
-                    f"Cannot change status from {current_status} to {value}."
-                )
+            check_transition(self.instance.status, value)
         
         return value
 
 
+class OrderBulkStatusUpdateSerializer(serializers.Serializer):
+    """
+    Serializer for moving many orders to the same status (vendors only).
+    """
+    MAX_ORDERS = 200
+
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_ORDERS
+    )
+    status = serializers.ChoiceField(choices=Order._meta.get_field('status').choices)
+
+    def validate_order_ids(self, value):
+        """
+        Drop duplicate ids while keeping the submitted order.
+        """
+        return list(dict.fromkeys(value))
+
+
 class OrderCancelSerializer(serializers.ModelSerializer):
     """
     Serializer for cancelling orders (students only).
@@ -155,12 +262,26 @@ class OrderCancelSerializer(serializers.ModelSerializer):
         return value
 
 
+class OrderEventSerializer(serializers.ModelSerializer):
+    """
+    Serializer for entries of the order event log.
+    """
+    class Meta:
+        model = OrderEvent
+        fields = [
+            'id', 'event_type', 'order_id', 'user_id', 'vendor_id',
+            'status', 'previous_status', 'created_at'
+        ]
+        read_only_fields = fields
+
+
 class OrderStatsSerializer(serializers.Serializer):
     """
     Serializer for order statistics.
     """
     total_orders = serializers.IntegerField()
     pending_orders = serializers.IntegerField()
+    preparing_orders = serializers.IntegerField()
     ready_orders = serializers.IntegerField()
     completed_orders = serializers.IntegerField()
     cancelled_orders = serializers.IntegerField()
@@ -172,12 +293,11 @@ class VendorOrderSerializer(serializers.ModelSerializer):
     """
     Serializer for vendor's order view with customer information.
     """
-    customer_name = serializers.CharField(source='user.username', read_only=True)
     customer_email = serializers.CharField(source='user.email', read_only=True)
     customer_phone = serializers.CharField(source='user.phone_number', read_only=True)
     customer_matric = serializers.CharField(source='user.matric_number', read_only=True)
-    menu_item_name = serializers.CharField(source='menu_item.name', read_only=True)
-    menu_item_price = serializers.DecimalField(source='menu_item.price', max_digits=10, decimal_places=2, read_only=True)
+    menu_item_name = serializers.CharField(source='item_name', read_only=True)
+    menu_item_price = serializers.DecimalField(source='unit_price', max_digits=10, decimal_places=2, read_only=True)
     
     class Meta:
         model = Order
@@ -186,24 +306,46 @@ class VendorOrderSerializer(serializers.ModelSerializer):
             'customer_name', 'customer_email', 'customer_phone', 'customer_matric',
             'menu_item_name', 'menu_item_price'
         ]
-        read_only_fields = ['id', 'quantity', 'total_price', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'quantity', 'total_price', 'created_at', 'updated_at', 'customer_name']
 
 
 class StudentOrderSerializer(serializers.ModelSerializer):
     """
     Serializer for student's order view with vendor information.
     """
-    menu_item_name = serializers.CharField(source='menu_item.name', read_only=True)
-    menu_item_price = serializers.DecimalField(source='menu_item.price', max_digits=10, decimal_places=2, read_only=True)
+    menu_item_name = serializers.CharField(source='item_name', read_only=True)
+    menu_item_price = serializers.DecimalField(source='unit_price', max_digits=10, decimal_places=2, read_only=True)
     menu_item_image = serializers.ImageField(source='menu_item.image', read_only=True)
-    vendor_name = serializers.CharField(source='vendor.vendor_name', read_only=True)
+    menu_item_image_variants = ImageVariantsField(source='menu_item')
     vendor_phone = serializers.CharField(source='vendor.phone_number', read_only=True)
+    estimated_wait_minutes = serializers.SerializerMethodField()
     
     class Meta:
         model = Order
         fields = [
             'id', 'quantity', 'total_price', 'status', 'created_at', 'updated_at',
-            'menu_item_name', 'menu_item_price', 'menu_item_image',
-            'vendor_name', 'vendor_phone'
+            'menu_item_name', 'menu_item_price', 'menu_item_image', 'menu_item_image_variants',
+            'vendor_name', 'vendor_phone', 'estimated_wait_minutes'
         ]
-        read_only_fields = ['id', 'quantity', 'total_price', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['id', 'quantity', 'total_price', 'created_at', 'updated_at', 'vendor_name']
+    
+    def get_estimated_wait_minutes(self, obj):
+        return estimate_order_wait_minutes(obj, self.context.setdefault('vendor_eta_states', {}))
+
+
+class CheckoutSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a checkout and the orders it created.
+    """
+    items = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Checkout
+        fields = ['id', 'total_price', 'item_count', 'created_at', 'items']
+        read_only_fields = fields
+
+    def get_items(self, obj):
+        orders = getattr(obj, 'created_orders', None)
+        if orders is None:
+            orders = obj.items.select_related('menu_item', 'vendor')
+        return StudentOrderSerializer(orders, many=True).data
@@ -0,0 +1,11 @@
+# order/signals.py
+from django.dispatch import Signal
+
+# Sent inside the creating transaction once new orders exist.
+# Provides ``orders``: the list of created Order instances.
+orders_created = Signal()
+
+# Sent inside the updating transaction once order statuses have changed.
+# Provides ``changes``: a list of ``(order, previous_status)`` tuples where
+# ``order.status`` already holds the new status.
+orders_status_changed = Signal()
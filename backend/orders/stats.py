@@ -0,0 +1,176 @@
+# order/stats.py
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import ArchivedOrder, Order, OrderStats
+
+# Orders in these statuses count towards revenue
+REVENUE_STATUSES = ('ready', 'completed')
+
+STATUS_FIELDS = {
+    'pending': 'pending_orders',
+    'preparing': 'preparing_orders',
+    'ready': 'ready_orders',
+    'completed': 'completed_orders',
+    'cancelled': 'cancelled_orders',
+}
+
+# Set while orders are moved into the archive table; they keep counting
+_archiving = ContextVar('archiving_orders', default=False)
+
+
+def _scopes_for(order):
+    """Return every (scope, subject_id) pair an order contributes to."""
+    return [('global', 0), ('vendor', order.vendor_id), ('student', order.user_id)]
+
+
+def _scope_queryset(scope, subject_id, model=Order):
+    """Return the orders of a model covered by a stats scope."""
+    if scope == 'vendor':
+        return model.objects.filter(vendor_id=subject_id)
+    if scope == 'student':
+        return model.objects.filter(user_id=subject_id)
+    return model.objects.all()
+
+
+def compute_stats(queryset):
+    """
+    Compute every counter for a queryset in a single conditional-aggregation query.
+    """
+    revenue_filter = Q(status__in=REVENUE_STATUSES)
+    aggregates = {
+        'total_orders': Count('id'),
+        'revenue_orders': Count('id', filter=revenue_filter),
+        'total_revenue': Sum('total_price', filter=revenue_filter),
+    }
+    for status_value, field in STATUS_FIELDS.items():
+        aggregates[field] = Count('id', filter=Q(status=status_value))
+
+    counters = queryset.aggregate(**aggregates)
+    counters['total_revenue'] = counters['total_revenue'] or Decimal('0')
+    return counters
+
+
+def build_stats(scope, subject_id=0):
+    """
+    Recompute a scope's counters from the order and archive tables.
+
+    The row is created first, so order writes from then on apply their
+    deltas to it, and it is locked while counting: writes that commit during
+    the count wait for the lock and add their delta on top of the result
+    instead of being lost.
+    """
+    OrderStats.objects.get_or_create(scope=scope, subject_id=subject_id)
+    with transaction.atomic():
+        stats = OrderStats.objects.select_for_update().get(scope=scope, subject_id=subject_id)
+        # Archived orders still count; they are only stored elsewhere
+        counters = compute_stats(_scope_queryset(scope, subject_id))
+        archived = compute_stats(_scope_queryset(scope, subject_id, ArchivedOrder))
+        for field, value in counters.items():
+            setattr(stats, field, value + archived[field])
+        stats.save()
+    return stats
+
+
+def rebuild_all_stats():
+    """Recompute every existing counter row. Returns the number of rows rebuilt."""
+    keys = list(OrderStats.objects.values_list('scope', 'subject_id'))
+    for scope, subject_id in keys:
+        build_stats(scope, subject_id)
+    return len(keys)
+
+
+def get_order_stats(scope, subject_id=0):
+    """
+    Return the stats for a scope, building the counter row on first use.
+    """
+    stats = OrderStats.objects.filter(scope=scope, subject_id=subject_id).first()
+    if stats is None:
+        stats = build_stats(scope, subject_id)
+
+    avg_order_value = Decimal('0')
+    if stats.revenue_orders:
+        avg_order_value = stats.total_revenue / stats.revenue_orders
+
+    return {
+        'total_orders': stats.total_orders,
+        'pending_orders': stats.pending_orders,
+        'preparing_orders': stats.preparing_orders,
+        'ready_orders': stats.ready_orders,
+        'completed_orders': stats.completed_orders,
+        'cancelled_orders': stats.cancelled_orders,
+        'total_revenue': stats.total_revenue,
+        'avg_order_value': avg_order_value,
+    }
+
+
+def _apply_deltas(deltas):
+    """
+    Apply counter deltas with one UPDATE per scope. Scopes without a row are
+    skipped; they are built from the orders table on their next read.
+    """
+    for (scope, subject_id), fields in deltas.items():
+        updates = {field: F(field) + value for field, value in fields.items() if value}
+        if updates:
+            OrderStats.objects.filter(scope=scope, subject_id=subject_id).update(**updates)
+
+
+def record_orders_created(orders):
+    """Count newly created orders in every scope they belong to."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for order in orders:
+        for key in _scopes_for(order):
+            deltas[key]['total_orders'] += 1
+            deltas[key][STATUS_FIELDS[order.status]] += 1
+            if order.status in REVENUE_STATUSES:
+                deltas[key]['revenue_orders'] += 1
+                deltas[key]['total_revenue'] += order.total_price
+    _apply_deltas(deltas)
+
+
+@contextmanager
+def moving_to_archive():
+    """Deleting orders inside this block does not uncount them."""
+    token = _archiving.set(True)
+    try:
+        yield
+    finally:
+        _archiving.reset(token)
+
+
+def record_orders_deleted(orders):
+    """Uncount deleted orders (live or archived) from every scope they belong to."""
+    if _archiving.get():
+        return
+    deltas = defaultdict(lambda: defaultdict(int))
+    for order in orders:
+        for key in _scopes_for(order):
+            deltas[key]['total_orders'] -= 1
+            deltas[key][STATUS_FIELDS[order.status]] -= 1
+            if order.status in REVENUE_STATUSES:
+                deltas[key]['revenue_orders'] -= 1
+                deltas[key]['total_revenue'] -= order.total_price
+    _apply_deltas(deltas)
+
+
+def record_status_changes(changes):
+    """Move orders between status counters after a status change."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for order, previous_status in changes:
+        was_revenue = previous_status in REVENUE_STATUSES
+        is_revenue = order.status in REVENUE_STATUSES
+        for key in _scopes_for(order):
+            deltas[key][STATUS_FIELDS[previous_status]] -= 1
+            deltas[key][STATUS_FIELDS[order.status]] += 1
+            if is_revenue and not was_revenue:
+                deltas[key]['revenue_orders'] += 1
+                deltas[key]['total_revenue'] += order.total_price
+            elif was_revenue and not is_revenue:
+                deltas[key]['revenue_orders'] -= 1
+                deltas[key]['total_revenue'] -= order.total_price
+    _apply_deltas(deltas)
@@ -1,10 +1,26 @@
+import asyncio
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 
 from auth.models import UserProfile
 from menu.models import Menu
-from orders.models import Order
+from orders.broker import broker, channels_for_user
+from orders.models import ArchivedOrder, IdempotencyKey, Order, OrderStats, PrepTimeEstimate
+from orders.transitions import TransitionConflict, transition_order
+from turbocafe.token import CustomTokenObtainPairSerializer
 
 
 class OrderAPITests(APITestCase):
@@ -46,6 +62,12 @@ class OrderAPITests(APITestCase):
     def authenticate(self, user):
         self.client.force_authenticate(user=user)
 
+    def authenticate_with_token(self, user):
+        # Real JWT authentication yields a plain auth.User, not a UserProfile
+        self.client.force_authenticate(user=None)
+        access = CustomTokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
     def test_student_can_create_order_for_available_menu(self):
         url = reverse("order:order-create")
 
@@ -107,6 +129,16 @@ class OrderAPITests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+        # the same scopes through real access tokens, for the detail and the lists
+        for user, expected in [
+            (other_student, status.HTTP_403_FORBIDDEN), (self.student, status.HTTP_200_OK),
+            (self.vendor, status.HTTP_200_OK), (self.admin, status.HTTP_200_OK),
+        ]:
+            self.authenticate_with_token(user)
+            self.assertEqual(self.client.get(url).status_code, expected)
+            for list_url in ["order:order-list", "order:order-search", "order:recent-orders"]:
+                self.assertEqual(self.client.get(reverse(list_url)).status_code, status.HTTP_200_OK)
+
     def test_vendor_can_update_status_valid_transitions(self):
         url = reverse("order:order-update-status", args=[self.order.id])
 
@@ -147,3 +179,581 @@ class OrderAPITests(APITestCase):
         # paginated list payload
         self.assertIn("results", response.data)
 
+    def test_student_checkout_creates_all_items_in_one_request(self):
+        url = reverse("order:order-checkout")
+        drink = Menu.objects.create(
+            name="Zobo", price=2.00, available=True, vendor=self.vendor,
+        )
+
+        # vendor cannot check out
+        self.authenticate(self.vendor)
+        response = self.client.post(url, {"items": [{"menu_item": drink.id}]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.authenticate(self.student)
+        with CaptureQueriesContext(connection) as single_item:
+            response = self.client.post(url, {"items": [{"menu_item": drink.id}]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        payload = {"items": [
+            {"menu_item": self.menu_item.id, "quantity": 2},
+            {"menu_item": drink.id, "quantity": 3},
+        ]}
+        # query count does not grow with the cart size
+        with self.assertNumQueries(len(single_item)):
+            response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["item_count"], 2)
+        self.assertEqual(str(response.data["total_price"]), "27.00")
+        self.assertEqual(len(response.data["items"]), 2)
+        self.assertEqual(Order.objects.filter(checkout_id=response.data["id"]).count(), 2)
+
+    def test_checkout_rejects_unavailable_items_atomically(self):
+        url = reverse("order:order-checkout")
+        sold_out = Menu.objects.create(
+            name="Suya", price=5.00, available=False, vendor=self.vendor,
+        )
+
+        self.authenticate(self.student)
+        payload = {"items": [
+            {"menu_item": self.menu_item.id, "quantity": 1},
+            {"menu_item": sold_out.id, "quantity": 1},
+        ]}
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_stats_are_kept_up_to_date_incrementally(self):
+        url = reverse("order:order-stats")
+
+        # first read builds the vendor counters from the orders table
+        self.authenticate(self.vendor)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_orders"], 1)
+        self.assertEqual(response.data["pending_orders"], 1)
+
+        # later reads are a single counter lookup
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        self.authenticate(self.student)
+        self.client.post(reverse("order:order-create"), {"menu_item": self.menu_item.id, "quantity": 1}, format="json")
+
+        self.authenticate(self.vendor)
+        status_url = reverse("order:order-update-status", args=[self.order.id])
+        self.client.patch(status_url, {"status": "preparing"}, format="json")
+        self.client.patch(status_url, {"status": "ready"}, format="json")
+
+        response = self.client.get(url)
+        self.assertEqual(response.data["total_orders"], 2)
+        self.assertEqual(response.data["pending_orders"], 1)
+        self.assertEqual(response.data["ready_orders"], 1)
+        self.assertEqual(str(response.data["total_revenue"]), "21.00")
+        self.assertEqual(str(response.data["avg_order_value"]), "21.00")
+
+        # deletes are uncounted, including cascades from a deleted menu item
+        Order.objects.filter(status="pending").delete()
+        response = self.client.get(url)
+        self.assertEqual((response.data["total_orders"], response.data["pending_orders"]), (1, 0))
+        self.menu_item.delete()
+        response = self.client.get(url)
+        self.assertEqual((response.data["total_orders"], response.data["ready_orders"]), (0, 0))
+        self.assertEqual(str(response.data["total_revenue"]), "0.00")
+
+        # drifted counters are recomputed from the order tables
+        OrderStats.objects.update(total_orders=99)
+        call_command("rebuild_order_stats", stdout=StringIO())
+        self.assertEqual(self.client.get(url).data["total_orders"], 0)
+
+    def test_list_orders_date_range_is_inclusive_of_end_day(self):
+        url = reverse("order:order-list")
+        today = timezone.localdate()
+        old_order = Order.objects.create(
+            user=self.student, menu_item=self.menu_item, vendor=self.vendor,
+            quantity=1, total_price=self.menu_item.price,
+        )
+        Order.objects.filter(pk=old_order.pk).update(created_at=timezone.now() - timedelta(days=3))
+
+        self.authenticate(self.student)
+        response = self.client.get(url, {"start_date": today.isoformat(), "end_date": today.isoformat()})
+        ids = [o["id"] for o in response.data["results"]]
+        self.assertEqual(ids, [self.order.id])
+
+        start = (today - timedelta(days=3)).isoformat()
+        response = self.client.get(url, {"start_date": start, "end_date": today.isoformat()})
+        ids = [o["id"] for o in response.data["results"]]
+        self.assertEqual(ids, [self.order.id, old_order.id])
+
+    def test_status_changes_are_pushed_to_scoped_subscribers(self):
+        loop = asyncio.new_event_loop()
+        other_student = UserProfile.objects.create_user(
+            username="student2", password="pass1234", role="student"
+        )
+
+        async def subscribe(user):
+            return broker.subscribe(channels_for_user(user))
+
+        student_events = loop.run_until_complete(subscribe(self.student))
+        vendor_events = loop.run_until_complete(subscribe(self.vendor))
+        other_events = loop.run_until_complete(subscribe(other_student))
+        try:
+            self.authenticate(self.vendor)
+            url = reverse("order:order-update-status", args=[self.order.id])
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(url, {"status": "preparing"}, format="json")
+
+            for subscription in (student_events, vendor_events):
+                event = loop.run_until_complete(asyncio.wait_for(subscription.queue.get(), timeout=1))
+                self.assertEqual(event["type"], "order.status_changed")
+                self.assertEqual(event["order"]["id"], self.order.id)
+                self.assertEqual(event["order"]["status"], "preparing")
+                self.assertEqual(event["order"]["previous_status"], "pending")
+            loop.run_until_complete(asyncio.sleep(0))
+            self.assertTrue(other_events.queue.empty())
+        finally:
+            for subscription in (student_events, vendor_events, other_events):
+                broker.unsubscribe(subscription)
+            loop.close()
+
+    def test_event_stream_requires_authentication(self):
+        url = reverse("order:order-events")
+        stream = async_to_sync(self.async_client.get)
+        response = stream(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # access tokens are not accepted in the URL, only short-lived tickets
+        access = str(CustomTokenObtainPairSerializer.get_token(self.student).access_token)
+        response = stream(url, {"token": access})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.authenticate(self.student)
+        ticket = self.client.post(reverse("order:order-event-ticket")).data["ticket"]
+        expired = self.client.post(reverse("order:order-event-ticket")).data["ticket"]
+        self.client.force_authenticate(user=None)
+        response = stream(url, {"ticket": ticket})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        response.close()
+
+        # a ticket opens the stream once
+        response = stream(url, {"ticket": ticket})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        with override_settings(ORDER_EVENT_TICKET_MAX_AGE=-1):
+            response = stream(url, {"ticket": expired})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # WSGI servers cannot hold the stream open
+        response = self.client.get(url, {"ticket": expired})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_publishing_drops_subscribers_whose_loop_is_closed(self):
+        loop = asyncio.new_event_loop()
+
+        async def subscribe():
+            return broker.subscribe(channels_for_user(self.student))
+
+        subscription = loop.run_until_complete(subscribe())
+        loop.close()
+
+        broker.publish([f"student:{self.student.id}"], {"type": "order.created"})
+        broker.publish([f"student:{self.student.id}"], {"type": "order.created"})
+        self.assertNotIn(subscription, broker._subscriptions.get(f"student:{self.student.id}", ()))
+
+    def test_transition_is_compare_and_set(self):
+        stale = Order.objects.get(pk=self.order.pk)
+
+        # another request moves the order first
+        transition_order(Order.objects.get(pk=self.order.pk), "preparing", vendor_id=self.vendor.id)
+
+        with self.assertRaises(TransitionConflict):
+            transition_order(stale, "cancelled", vendor_id=self.vendor.id)
+        self.assertEqual(Order.objects.get(pk=self.order.pk).status, "preparing")
+
+        # scoped to the vendor of the order
+        other_vendor = UserProfile.objects.create_user(
+            username="vendor2", password="pass1234", role="vendor", vendor_name="Vendor Two"
+        )
+        with self.assertRaises(TransitionConflict):
+            transition_order(Order.objects.get(pk=self.order.pk), "ready", vendor_id=other_vendor.id)
+
+        # only status and updated_at are written
+        with CaptureQueriesContext(connection) as queries:
+            transition_order(Order.objects.get(pk=self.order.pk), "ready", vendor_id=self.vendor.id)
+        update = next(q["sql"] for q in queries if q["sql"].startswith('UPDATE "orders_order"'))
+        self.assertIn('SET "status" = \'ready\', "updated_at" =', update)
+        self.assertIn('"orders_order"."status" = \'preparing\'', update)
+
+    def test_vendor_bulk_status_update_reports_per_order_results(self):
+        url = reverse("order:order-bulk-update-status")
+        second = Order.objects.create(
+            user=self.student, menu_item=self.menu_item, vendor=self.vendor,
+            quantity=1, total_price=self.menu_item.price,
+        )
+        done = Order.objects.create(
+            user=self.student, menu_item=self.menu_item, vendor=self.vendor,
+            quantity=1, total_price=self.menu_item.price, status="completed",
+        )
+        other_vendor = UserProfile.objects.create_user(
+            username="vendor2", password="pass1234", role="vendor", vendor_name="Vendor Two"
+        )
+        foreign = Order.objects.create(
+            user=self.student, menu_item=self.menu_item, vendor=other_vendor,
+            quantity=1, total_price=self.menu_item.price,
+        )
+
+        # students cannot bulk update
+        self.authenticate(self.student)
+        response = self.client.post(url, {"order_ids": [self.order.id], "status": "preparing"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.authenticate(self.vendor)
+        payload = {"order_ids": [self.order.id, second.id, done.id, foreign.id], "status": "preparing"}
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 2)
+        results = {r["id"]: r["result"] for r in response.data["results"]}
+        self.assertEqual(results, {
+            self.order.id: "updated",
+            second.id: "updated",
+            done.id: "invalid_transition",
+            foreign.id: "not_found",
+        })
+        self.assertEqual(
+            set(Order.objects.filter(status="preparing").values_list("id", flat=True)),
+            {self.order.id, second.id},
+        )
+
+    def test_old_terminal_orders_are_archived_and_read_on_demand(self):
+        old = timezone.now() - timedelta(days=90)
+        done = Order.objects.create(
+            user=self.student, menu_item=self.menu_item, vendor=self.vendor,
+            quantity=1, total_price=self.menu_item.price, status="completed",
+        )
+        Order.objects.filter(pk__in=[self.order.pk, done.pk]).update(updated_at=old)
+
+        call_command("archive_orders", "--days", "30", "--batch-size", "1", stdout=StringIO())
+
+        # only the terminal order moved; the pending one stays hot
+        self.assertFalse(Order.objects.filter(pk=done.pk).exists())
+        self.assertTrue(Order.objects.filter(pk=self.order.pk).exists())
+        self.assertEqual(ArchivedOrder.objects.get(pk=done.pk).status, "completed")
+
+        self.authenticate(self.student)
+        url = reverse("order:order-list")
+        ids = [o["id"] for o in self.client.get(url).data["results"]]
+        self.assertEqual(ids, [self.order.id])
+
+        response = self.client.get(url, {"include_archived": "true", "count": "true"})
+        self.assertEqual([o["id"] for o in response.data["results"]], [done.id, self.order.id])
+        self.assertEqual(response.data["count"], 2)
+
+        response = self.client.get(reverse("order:student-order-list"), {"status": "completed"})
+        self.assertEqual([o["id"] for o in response.data["results"]], [done.id])
+
+        # detail falls back to the archive
+        response = self.client.get(reverse("order:order-detail", args=[done.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "completed")
+
+        # archived orders still count in stats
+        response = self.client.get(reverse("order:order-stats"))
+        self.assertEqual(response.data["total_orders"], 2)
+
+    def test_export_streams_scoped_orders_as_csv_and_ndjson(self):
+        other_vendor = UserProfile.objects.create_user(
+            username="vendor2", password="pass1234", role="vendor", vendor_name="Vendor Two"
+        )
+        Order.objects.create(
+            user=self.student, menu_item=self.menu_item, vendor=other_vendor,
+            quantity=1, total_price=self.menu_item.price,
+        )
+
+        # students cannot export
+        self.authenticate(self.student)
+        response = self.client.get(reverse("order:order-export", args=["csv"]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.authenticate(self.vendor)
+        response = self.client.get(reverse("order:order-export", args=["csv"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith("id,created_at,"))
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(f"{self.order.id},"))
+        self.assertIn("Vendor One", lines[1])
+
+        # admins see everything; filters apply
+        self.authenticate(self.admin)
+        response = self.client.get(reverse("order:order-export", args=["ndjson"]), {"vendor": self.vendor.id})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.order.id])
+        self.assertEqual(rows[0]["total_price"], "21.00")
+
+        response = self.client.get(reverse("order:order-export", args=["xml"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # archived orders are merged in by creation time
+        now = timezone.now()
+        older = Order.objects.create(
+            user=self.student, menu_item=self.menu_item, vendor=self.vendor,
+            quantity=1, total_price=self.menu_item.price,
+        )
+        Order.objects.filter(pk=older.pk).update(created_at=now - timedelta(days=3))
+        Order.objects.filter(pk=self.order.pk).update(created_at=now)
+        archived = ArchivedOrder.objects.create(
+            id=older.pk + 100, user=self.student, menu_item=self.menu_item, vendor=self.vendor,
+            total_price=self.menu_item.price, status="completed",
+            created_at=now - timedelta(days=1), updated_at=now - timedelta(days=1),
+        )
+        self.authenticate(self.vendor)
+        response = self.client.get(reverse("order:order-export", args=["ndjson"]), {"include_archived": "true"})
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.order.id, archived.id, older.id])
+
+    def test_wait_time_estimate_learns_prep_times_and_tracks_the_queue(self):
+        cache.clear()
+        menu_url = reverse("menu:menu-list")
+
+        # one pending order ahead, no samples yet: 7.5 min queued + 7.5 min prep
+        self.authenticate(self.student)
+        item = self.client.get(menu_url).data["results"][0]
+        self.assertEqual(item["estimated_wait_minutes"], 15)
+
+        # a new order joins the queue without rebuilding the estimate
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("order:order-create"), {"menu_item": self.menu_item.id, "quantity": 1}, format="json"
+            )
+        order_url = reverse("order:order-detail", args=[response.data["id"]])
+        self.assertEqual(self.client.get(order_url).data["estimated_wait_minutes"], 23)
+        # the cached menu list is served with a live estimate and no queries
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(menu_url).data["results"][0]["estimated_wait_minutes"], 23)
+        # once the vendor's state expires, cache hits still make no queries and serve the last known state
+        cache.delete(f"orders:eta:fresh:{self.vendor.id}")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(menu_url).data["results"][0]["estimated_wait_minutes"], 23)
+        # and with the state evicted entirely, the estimate the response was cached with
+        cache.delete(f"orders:eta:prep:{self.vendor.id}")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(menu_url).data["results"][0]["estimated_wait_minutes"], 15)
+        # an uncached read rebuilds it
+        self.assertEqual(self.client.get(order_url).data["estimated_wait_minutes"], 23)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(menu_url).data["results"][0]["estimated_wait_minutes"], 23)
+
+        # the first order took just under 5 minutes from being placed to ready
+        Order.objects.filter(pk=self.order.pk).update(created_at=timezone.now() - timedelta(minutes=5) + timedelta(seconds=10))
+        self.authenticate(self.vendor)
+        status_url = reverse("order:order-update-status", args=[self.order.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(status_url, {"status": "preparing"}, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(status_url, {"status": "ready"}, format="json")
+        self.assertIsNone(response.data["estimated_wait_minutes"])
+
+        estimate = PrepTimeEstimate.objects.get(menu_item=self.menu_item)
+        self.assertEqual(estimate.samples, 1)
+        self.assertAlmostEqual(estimate.avg_seconds, 290, delta=5)
+
+        # one order left in the queue, learned prep time of 5 minutes
+        self.authenticate(self.student)
+        self.assertEqual(self.client.get(menu_url).data["results"][0]["estimated_wait_minutes"], 10)
+
+        # a deleted open order leaves the queue too
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.filter(status="pending").delete()
+        self.assertEqual(self.client.get(menu_url).data["results"][0]["estimated_wait_minutes"], 5)
+
+    def test_changes_endpoint_returns_events_after_cursor_by_role(self):
+        url = reverse("order:order-changes")
+        other_student = UserProfile.objects.create_user(
+            username="student2", password="pass1234", role="student"
+        )
+
+        self.authenticate(self.student)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cursor = response.data["next_cursor"]
+
+        self.client.post(reverse("order:order-create"), {"menu_item": self.menu_item.id, "quantity": 1}, format="json")
+        self.client.patch(reverse("order:order-cancel", args=[self.order.id]), {"status": "cancelled"}, format="json")
+
+        self.authenticate(other_student)
+        self.client.post(reverse("order:order-create"), {"menu_item": self.menu_item.id, "quantity": 1}, format="json")
+
+        # only the student's own events after the cursor
+        self.authenticate(self.student)
+        response = self.client.get(url, {"since": cursor})
+        events = [(e["event_type"], e["status"], e["previous_status"]) for e in response.data["results"]]
+        self.assertEqual(events, [("created", "pending", None), ("status_changed", "cancelled", "pending")])
+        self.assertFalse(response.data["has_more"])
+
+        # nothing new after the returned cursor
+        response = self.client.get(url, {"since": response.data["next_cursor"]})
+        self.assertEqual(response.data["results"], [])
+
+        # the vendor sees events of every order placed with them
+        self.authenticate(self.vendor)
+        response = self.client.get(url, {"since": cursor})
+        self.assertEqual(len(response.data["results"]), 3)
+
+        response = self.client.get(url, {"since": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # the same scopes through a real access token
+        for user, count in [(self.student, 2), (self.vendor, 3), (self.admin, 3)]:
+            self.authenticate_with_token(user)
+            response = self.client.get(url, {"since": cursor})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data["results"]), count)
+
+    def test_idempotency_key_replays_the_first_response(self):
+        url = reverse("order:order-create")
+        payload = {"menu_item": self.menu_item.id, "quantity": 1}
+        self.authenticate(self.student)
+
+        first = self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        # the retry is a single key lookup: no validation or writes
+        with self.assertNumQueries(1):
+            retry = self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json()["id"], first.data["id"])
+        self.assertEqual(Order.objects.filter(user=self.student).count(), 2)
+
+        # the same key cannot be reused for another request
+        response = self.client.post(url, {"menu_item": self.menu_item.id, "quantity": 3}, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        # error responses are replayed too, even after the order changed
+        self.authenticate(self.vendor)
+        status_url = reverse("order:order-update-status", args=[self.order.id])
+        response = self.client.patch(status_url, {"status": "ready"}, format="json", HTTP_IDEMPOTENCY_KEY="ready")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.patch(status_url, {"status": "preparing"}, format="json")
+        retry = self.client.patch(status_url, {"status": "ready"}, format="json", HTTP_IDEMPOTENCY_KEY="ready")
+        self.assertEqual(retry.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.authenticate(self.student)
+
+        # the same through a real access token
+        self.authenticate_with_token(self.student)
+        first = self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="token")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        retry = self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="token")
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json()["id"], first.data["id"])
+
+        # a claim left pending by a crashed request is refused, then taken over once its lease runs out
+        request_hash = IdempotencyKey.objects.get(key="token").request_hash
+        IdempotencyKey.objects.create(user=self.student, key="crashed", request_hash=request_hash)
+        response = self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="crashed")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        IdempotencyKey.objects.filter(key="crashed").update(created_at=timezone.now() - timedelta(minutes=1))
+        response = self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="crashed")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(IdempotencyKey.objects.get(key="crashed").status_code, status.HTTP_201_CREATED)
+
+        # a request that raises releases its claim
+        with mock.patch("orders.views.OrderCreateSerializer.save", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="raised")
+        self.assertFalse(IdempotencyKey.objects.filter(key="raised").exists())
+
+        # expired keys are purged and run as new requests
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        call_command("purge_idempotency_keys", stdout=StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
+        response = self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertNotEqual(response.data["id"], first.data["id"])
+
+    @override_settings(THROTTLE_RATES={"student": {"default": "100/min", "search": "3/min"}})
+    def test_search_is_throttled_per_role_with_retry_after(self):
+        url = reverse("order:order-search")
+        self.authenticate(self.student)
+        for _ in range(3):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+        # other endpoint classes and roles have their own windows
+        self.assertEqual(self.client.get(reverse("order:order-list")).status_code, status.HTTP_200_OK)
+        self.authenticate(self.vendor)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    @override_settings(
+        THROTTLE_RATES={"student": {"default": "100/min", "search": "3/min"}, "vendor": {"search": "0/min"}},
+        THROTTLE_BACKEND={"BACKEND": "turbocafe.throttling.CacheBackend"},
+    )
+    def test_shared_throttle_counts_and_zero_rates_block(self):
+        cache.clear()
+        url = reverse("order:order-search")
+        self.authenticate(self.student)
+        # 30 seconds into a minute window
+        with mock.patch("turbocafe.throttling.time.time", return_value=60 * 100000 + 30):
+            for _ in range(3):
+                self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            # rejected requests are taken back out of the shared count
+            for _ in range(2):
+                self.assertEqual(self.client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(cache.get(f"throttle:student:search:{self.student.pk}:100000"), 3)
+
+            # a zero rate blocks the endpoint class until the next window
+            self.authenticate(self.vendor)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(response["Retry-After"], "30")
+
+    def test_detail_and_mutations_are_single_scoped_queries(self):
+        # the ownership rule is part of the lookup query
+        self.authenticate(self.student)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("order:order-detail", args=[self.order.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # orders outside the scope are still forbidden, missing ones not found
+        other_vendor = UserProfile.objects.create_user(
+            username="vendor2", password="pass1234", role="vendor", vendor_name="Vendor Two"
+        )
+        self.authenticate(other_vendor)
+        response = self.client.patch(
+            reverse("order:order-update-status", args=[self.order.id]), {"status": "preparing"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse("order:order-detail", args=[999999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            list(Menu.objects.editable_by(other_vendor).filter(pk=self.menu_item.pk)), []
+        )
+
+        # a student cannot cancel an order twice
+        self.authenticate(self.student)
+        cancel_url = reverse("order:order-cancel", args=[self.order.id])
+        self.assertEqual(self.client.patch(cancel_url, {"status": "cancelled"}, format="json").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.patch(cancel_url, {"status": "cancelled"}, format="json").status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_order_lists_serve_snapshots_without_joins(self):
+        self.authenticate(self.student)
+        self.client.post(reverse("order:order-create"), {"menu_item": self.menu_item.id, "quantity": 1}, format="json")
+
+        # later menu edits do not rewrite order history
+        Menu.objects.filter(pk=self.menu_item.pk).update(name="Cheeseburger", price=99)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("order:order-list"))
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("JOIN", queries[0]["sql"])
+        self.assertEqual({o["menu_item_name"] for o in response.data["results"]}, {"Burger"})
+        self.assertEqual({o["user_name"] for o in response.data["results"]}, {"student1"})
+        self.assertEqual({o["vendor_name"] for o in response.data["results"]}, {"Vendor One"})
+
+        response = self.client.get(reverse("order:student-order-list"))
+        self.assertEqual({o["menu_item_price"] for o in response.data["results"]}, {"10.50"})
@@ -0,0 +1,131 @@
+# order/transitions.py
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from .models import Order
+from .signals import orders_status_changed
+
+# Define valid status transitions
+VALID_TRANSITIONS = {
+    'pending': ['preparing', 'cancelled'],
+    'preparing': ['ready', 'cancelled'],
+    'ready': ['completed', 'cancelled'],
+    'completed': [],  # No transitions from completed
+    'cancelled': []   # No transitions from cancelled
+}
+
+
+class TransitionConflict(APIException):
+    """
+    Raised when the order changed between being read and being updated.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Order status was changed by another request. Reload the order and try again.'
+    default_code = 'conflict'
+
+
+def check_transition(current_status, new_status):
+    """
+    Raise a validation error unless the transition is in the transition table.
+    """
+    if new_status not in VALID_TRANSITIONS.get(current_status, []):
+        raise serializers.ValidationError(
+            f"Cannot change status from {current_status} to {new_status}."
+        )
+
+
+def transition_order(order, new_status, vendor_id=None, user_id=None):
+    """
+    Move an order to a new status with a single compare-and-set UPDATE.
+
+    The UPDATE only matches while the row still has the status ``order`` was
+    read with (and belongs to the given vendor/user), and only writes
+    ``status`` and ``updated_at``. If another request got there first no row
+    matches and TransitionConflict is raised.
+    """
+    previous_status = order.status
+    check_transition(previous_status, new_status)
+
+    lookup = {'pk': order.pk, 'status': previous_status}
+    if vendor_id is not None:
+        lookup['vendor_id'] = vendor_id
+    if user_id is not None:
+        lookup['user_id'] = user_id
+
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Order.objects.filter(**lookup).update(status=new_status, updated_at=now)
+        if not updated:
+            raise TransitionConflict()
+
+        order.status = new_status
+        order.updated_at = now
+        orders_status_changed.send(sender=Order, changes=[(order, previous_status)])
+
+    return order
+
+
+def bulk_transition_orders(order_ids, new_status, vendor_id):
+    """
+    Move many of a vendor's orders to a new status with one set-based UPDATE.
+
+    Every id is checked against the transition table using the status it was
+    read with; the UPDATE matches each valid row on ``(id, status)`` so rows
+    changed concurrently are reported as conflicts instead of being
+    overwritten. Returns a dict of ``{order_id: (result, status)}`` where
+    result is one of ``updated``, ``not_found``, ``invalid_transition`` or
+    ``conflict``.
+    """
+    orders = Order.objects.filter(pk__in=order_ids, vendor_id=vendor_id).in_bulk()
+
+    results = {}
+    candidates = defaultdict(list)
+    for order_id in order_ids:
+        order = orders.get(order_id)
+        if order is None:
+            results[order_id] = ('not_found', None)
+        elif new_status not in VALID_TRANSITIONS.get(order.status, []):
+            results[order_id] = ('invalid_transition', order.status)
+        else:
+            candidates[order.status].append(order_id)
+
+    if not candidates:
+        return results
+
+    condition = Q()
+    for previous_status, ids in candidates.items():
+        condition |= Q(pk__in=ids, status=previous_status)
+    candidate_ids = [order_id for ids in candidates.values() for order_id in ids]
+
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Order.objects.filter(condition, vendor_id=vendor_id).update(status=new_status, updated_at=now)
+        if updated == len(candidate_ids):
+            applied = set(candidate_ids)
+        else:
+            # Some rows changed underneath us; find the ones this UPDATE wrote
+            applied = set(
+                Order.objects.filter(pk__in=candidate_ids, status=new_status, updated_at=now)
+                .values_list('pk', flat=True)
+            )
+
+        changes = []
+        for order_id in candidate_ids:
+            order = orders[order_id]
+            if order_id in applied:
+                changes.append((order, order.status))
+                order.status = new_status
+                order.updated_at = now
+                results[order_id] = ('updated', new_status)
+            else:
+                results[order_id] = ('conflict', None)
+
+        if changes:
+            orders_status_changed.send(sender=Order, changes=changes)
+
+    return results
@@ -9,13 +9,19 @@ urlpatterns = [
     path('', views.OrderListView.as_view(), name='order-list'),
     path('<int:pk>/', views.OrderDetailView.as_view(), name='order-detail'),
     path('create/', views.OrderCreateView.as_view(), name='order-create'),
+    path('checkout/', views.CheckoutView.as_view(), name='order-checkout'),
     path('search/', views.OrderSearchView.as_view(), name='order-search'),
     path('stats/', views.OrderStatsView.as_view(), name='order-stats'),
     path('recent/', views.RecentOrdersView.as_view(), name='recent-orders'),
+    path('events/', views.OrderEventStreamView.as_view(), name='order-events'),
+    path('events/ticket/', views.OrderEventTicketView.as_view(), name='order-event-ticket'),
+    path('changes/', views.OrderChangesView.as_view(), name='order-changes'),
+    path('export/<str:export_format>/', views.OrderExportView.as_view(), name='order-export'),
     
     # Order management endpoints
     path('<int:pk>/update-status/', views.OrderUpdateStatusView.as_view(), name='order-update-status'),
     path('<int:pk>/cancel/', views.OrderCancelView.as_view(), name='order-cancel'),
+    path('bulk-update-status/', views.OrderBulkUpdateStatusView.as_view(), name='order-bulk-update-status'),
     
     # Student-specific endpoints
     path('student/my-orders/', views.StudentOrderListView.as_view(), name='student-order-list'),
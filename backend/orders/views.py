@@ -1,25 +1,59 @@
 # order/views.py
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
-from django.db.models import Q, Sum, Avg, Count
-from django.shortcuts import get_object_or_404
-from django.core.paginator import Paginator
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views import View
 from django.utils import timezone
 from datetime import timedelta
 from drf_spectacular.utils import extend_schema, OpenApiResponse
-from .models import Order
+from rest_framework_simplejwt.exceptions import InvalidToken
+from turbocafe.authentication import CustomJWTAuthentication
+from turbocafe.pagination import get_page_size, paginate
+from auth.models import UserProfile, is_admin
+from .broker import broker, channels_for_user, issue_stream_ticket, read_stream_ticket
+from .eventlog import events_for_user
+from .archive import wants_archive
+from .export import EXPORT_FORMATS, export_rows
+from .filters import filter_orders, search_orders
+from .idempotency import idempotent
+from .models import ArchivedOrder, Order, TERMINAL_STATUSES
+from .stats import get_order_stats
+from .transitions import bulk_transition_orders, transition_order
 from .serializers import (
     OrderSerializer, OrderListSerializer, OrderCreateSerializer,
     OrderUpdateSerializer, OrderCancelSerializer, OrderStatsSerializer,
-    VendorOrderSerializer, StudentOrderSerializer
+    VendorOrderSerializer, StudentOrderSerializer, CheckoutCreateSerializer,
+    CheckoutSerializer, OrderBulkStatusUpdateSerializer, OrderEventSerializer
 )
 from .permissions import (
-    IsStudentOrReadOnly, IsOrderOwnerOrVendor, IsOrderOwner, IsVendorOfOrder,
-    CanCancelOrder, CanUpdateOrderStatus, IsStudentOnly, IsVendorOnly, IsAdminOnly
+    CanUpdateOrderStatus, IsStudentOnly, IsVendorOnly, IsAdminOnly, IsVendorOrAdmin
 )
 
 
+def get_scoped_order(pk, *scoped_querysets):
+    """
+    Fetch an order through row-level scopes, one query per scope until it is
+    found. Misses fall back to an existence check so orders outside the
+    scope still answer 403 rather than 404.
+    """
+    for queryset in scoped_querysets:
+        order = queryset.filter(pk=pk).first()
+        if order is not None:
+            return order
+    for queryset in scoped_querysets:
+        if queryset.model.objects.filter(pk=pk).exists():
+            raise PermissionDenied()
+    raise Http404
+
+
 @extend_schema(
     description="List all orders (admin only) or user's own orders. Supports filtering, searching, and ordering.",
     summary="List orders",
@@ -35,97 +69,46 @@ class OrderListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        if request.user.is_admin:
-            queryset = Order.objects.select_related('user', 'menu_item', 'vendor').all()
-        else:
-            # Regular users can only see their own orders
-            queryset = Order.objects.select_related('user', 'menu_item', 'vendor').filter(user=request.user)
+        queryset = self._get_queryset(Order, request)
         
-        # Apply filters
-        queryset = self._apply_filters(queryset, request)
-        
-        # Apply search
-        queryset = self._apply_search(queryset, request)
+        # Historical queries also read the archive table
+        archived = []
+        if wants_archive(request):
+            archived.append(self._get_queryset(ArchivedOrder, request))
         
         # Apply ordering
-        queryset = self._apply_ordering(queryset, request)
+        ordering = self._get_ordering(request)
         
         # Paginate results
-        page_size = int(request.GET.get('page_size', 20))
-        page = int(request.GET.get('page', 1))
-        
-        paginator = Paginator(queryset, page_size)
-        page_obj = paginator.get_page(page)
-        
-        serializer = OrderListSerializer(page_obj, many=True)
-        
-        return Response({
-            'count': paginator.count,
-            'num_pages': paginator.num_pages,
-            'current_page': page,
-            'has_next': page_obj.has_next(),
-            'has_previous': page_obj.has_previous(),
-            'results': serializer.data
-        })
+        return Response(paginate(queryset, request, ordering, OrderListSerializer, archived))
     
-    def _apply_filters(self, queryset, request):
-        """Apply filtering based on query parameters."""
-        # Filter by status
-        status_filter = request.GET.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        # Filter by vendor
-        vendor_id = request.GET.get('vendor')
-        if vendor_id:
-            try:
-                queryset = queryset.filter(vendor_id=int(vendor_id))
-            except ValueError:
-                pass
-        
-        # Filter by date range
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
-        
-        if start_date:
-            try:
-                queryset = queryset.filter(created_at__date__gte=start_date)
-            except ValueError:
-                pass
+    def _get_queryset(self, model, request):
+        """Return the filtered orders of a model the user may see."""
+        # The list serializer reads snapshot columns only, so no joins are needed
+        if is_admin(request.user):
+            queryset = model.objects.all()
+        else:
+            # Regular users can only see their own orders
+            queryset = model.objects.placed_by(request.user)
         
-        if end_date:
-            try:
-                queryset = queryset.filter(created_at__date__lte=end_date)
-            except ValueError:
-                pass
+        # Apply filters
+        queryset = filter_orders(queryset, request.GET)
         
-        return queryset
-    
-    def _apply_search(self, queryset, request):
-        """Apply search based on query parameters."""
-        search = request.GET.get('search', '').strip()
-        if search:
-            queryset = queryset.filter(
-                Q(user__username__icontains=search) |
-                Q(menu_item__name__icontains=search) |
-                Q(vendor__vendor_name__icontains=search)
-            )
-        return queryset
+        # Apply search
+        return search_orders(queryset, request.GET)
     
-    def _apply_ordering(self, queryset, request):
-        """Apply ordering based on query parameters."""
+    def _get_ordering(self, request):
+        """Return the ordering requested in the query parameters."""
         ordering = request.GET.get('ordering', '-created_at')
         valid_orderings = [
             'created_at', '-created_at', 'total_price', '-total_price',
             'status', '-status', 'quantity', '-quantity'
         ]
         
-        if ordering in valid_orderings:
-            queryset = queryset.order_by(ordering)
-        else:
-            queryset = queryset.order_by('-created_at')
+        if ordering not in valid_orderings:
+            ordering = '-created_at'
         
-        return queryset
+        return ordering
 
 @extend_schema(
     description="Retrieve a specific order. Users can only view their own orders or orders for their menu items.",
@@ -140,13 +123,15 @@ class OrderDetailView(APIView):
     """
     Retrieve a specific order. Users can only view their own orders or orders for their menu items.
     """
-    permission_classes = [IsOrderOwnerOrVendor]
+    permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request, pk):
-        order = get_object_or_404(Order.objects.select_related('user', 'menu_item', 'vendor'), pk=pk)
-        
-        # Check permissions
-        self.check_object_permissions(request, order)
+        # Old terminal orders live in the archive table
+        order = get_scoped_order(
+            pk,
+            Order.objects.visible_to(request.user).select_related('user', 'menu_item', 'vendor'),
+            ArchivedOrder.objects.visible_to(request.user).select_related('user', 'menu_item', 'vendor'),
+        )
         
         serializer = OrderSerializer(order)
         return Response(serializer.data)
@@ -167,6 +152,7 @@ class OrderCreateView(APIView):
     """
     permission_classes = [IsStudentOnly]
     
+    @idempotent
     def post(self, request):
         serializer = OrderCreateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
@@ -175,6 +161,30 @@ class OrderCreateView(APIView):
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@extend_schema(
+    description="Place every item in the cart as one checkout. Only students can check out.",
+    summary="Checkout cart",
+    request=CheckoutCreateSerializer,
+    responses={
+        201: OpenApiResponse(response=CheckoutSerializer, description="Checkout created successfully"),
+        400: OpenApiResponse(description="Validation error")
+    }
+)
+class CheckoutView(APIView):
+    """
+    Place every item in the cart as one checkout. Only students can check out.
+    """
+    permission_classes = [IsStudentOnly]
+    
+    @idempotent
+    def post(self, request):
+        serializer = CheckoutCreateSerializer(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            checkout = serializer.save()
+            response_serializer = CheckoutSerializer(checkout)
+            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
 @extend_schema(
     description="Update order status. Only vendors can update status of their orders.",
     summary="Update order status",
@@ -182,7 +192,8 @@ class OrderCreateView(APIView):
     responses={
         200: OpenApiResponse(response=OrderSerializer, description="Order status updated successfully"),
         400: OpenApiResponse(description="Validation error"),
-        404: OpenApiResponse(description="Order not found or you do not have permission to modify it")
+        404: OpenApiResponse(description="Order not found or you do not have permission to modify it"),
+        409: OpenApiResponse(description="Order status was changed by another request")
     }
 )
 class OrderUpdateStatusView(APIView):
@@ -191,19 +202,54 @@ class OrderUpdateStatusView(APIView):
     """
     permission_classes = [CanUpdateOrderStatus]
     
+    @idempotent
     def patch(self, request, pk):
-        order = get_object_or_404(Order, pk=pk)
-        
-        # Check permissions
-        self.check_object_permissions(request, order)
+        # Only the vendor of the order can update it
+        order = get_scoped_order(pk, Order.objects.managed_by(request.user).select_related('user', 'menu_item', 'vendor'))
         
         serializer = OrderUpdateSerializer(order, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            new_status = serializer.validated_data.get('status')
+            if new_status:
+                # Compare-and-set on the status we just read; 409 if we lost a race
+                transition_order(order, new_status, vendor_id=request.user.id)
             response_serializer = OrderSerializer(order)
             return Response(response_serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@extend_schema(
+    description="Move many orders to the same status in one request. Only the vendor of the orders can update them.",
+    summary="Bulk update order status",
+    request=OrderBulkStatusUpdateSerializer,
+    responses={
+        200: OpenApiResponse(description="Per-order results"),
+        400: OpenApiResponse(description="Validation error")
+    }
+)
+class OrderBulkUpdateStatusView(APIView):
+    """
+    Move many orders to the same status in one request.
+    """
+    permission_classes = [IsVendorOnly]
+    
+    def post(self, request):
+        serializer = OrderBulkStatusUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        order_ids = serializer.validated_data['order_ids']
+        new_status = serializer.validated_data['status']
+        results = bulk_transition_orders(order_ids, new_status, vendor_id=request.user.id)
+        
+        return Response({
+            'status': new_status,
+            'updated': sum(1 for result, _ in results.values() if result == 'updated'),
+            'results': [
+                {'id': order_id, 'result': results[order_id][0], 'status': results[order_id][1]}
+                for order_id in order_ids
+            ]
+        })
+
 @extend_schema(
     description="Cancel an order. Only order owners can cancel their orders.",
     summary="Cancel order",
@@ -211,24 +257,28 @@ class OrderUpdateStatusView(APIView):
     responses={
         200: OpenApiResponse(response=OrderSerializer, description="Order cancelled successfully"),
         400: OpenApiResponse(description="Validation error"),
-        404: OpenApiResponse(description="Order not found or you do not have permission to modify it")
+        404: OpenApiResponse(description="Order not found or you do not have permission to modify it"),
+        409: OpenApiResponse(description="Order status was changed by another request")
     }
 )
 class OrderCancelView(APIView):
     """
     Cancel an order. Only order owners can cancel their orders.
     """
-    permission_classes = [CanCancelOrder]
+    permission_classes = [permissions.IsAuthenticated]
     
+    @idempotent
     def patch(self, request, pk):
-        order = get_object_or_404(Order, pk=pk)
-        
-        # Check permissions
-        self.check_object_permissions(request, order)
+        # Only the owner can cancel, and not once the order is completed or cancelled
+        order = get_scoped_order(
+            pk,
+            Order.objects.placed_by(request.user).exclude(status__in=TERMINAL_STATUSES)
+            .select_related('user', 'menu_item', 'vendor')
+        )
         
         serializer = OrderCancelSerializer(order, data={'status': 'cancelled'}, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            transition_order(order, 'cancelled', user_id=request.user.id)
             response_serializer = OrderSerializer(order)
             return Response(response_serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -248,20 +298,12 @@ class StudentOrderListView(APIView):
     permission_classes = [IsStudentOnly]
     
     def get(self, request):
-        queryset = Order.objects.select_related('menu_item', 'vendor').filter(user=request.user)
+        queryset = self._get_queryset(Order, request)
         
-        # Apply filters
-        status_filter = request.GET.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        # Apply search
-        search = request.GET.get('search', '').strip()
-        if search:
-            queryset = queryset.filter(
-                Q(menu_item__name__icontains=search) |
-                Q(vendor__vendor_name__icontains=search)
-            )
+        # Historical queries also read the archive table
+        archived = []
+        if wants_archive(request):
+            archived.append(self._get_queryset(ArchivedOrder, request))
         
         # Apply ordering
         ordering = request.GET.get('ordering', '-created_at')
@@ -270,28 +312,29 @@ class StudentOrderListView(APIView):
             'status', '-status'
         ]
         
-        if ordering in valid_orderings:
-            queryset = queryset.order_by(ordering)
-        else:
-            queryset = queryset.order_by('-created_at')
+        if ordering not in valid_orderings:
+            ordering = '-created_at'
         
         # Paginate results
-        page_size = int(request.GET.get('page_size', 20))
-        page = int(request.GET.get('page', 1))
-        
-        paginator = Paginator(queryset, page_size)
-        page_obj = paginator.get_page(page)
+        return Response(paginate(queryset, request, ordering, StudentOrderSerializer, archived))
+    
+    def _get_queryset(self, model, request):
+        """Return the student's orders of a model, filtered and searched."""
+        queryset = model.objects.select_related('menu_item', 'vendor').placed_by(request.user)
         
-        serializer = StudentOrderSerializer(page_obj, many=True)
+        # Apply filters
+        status_filter = request.GET.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
         
-        return Response({
-            'count': paginator.count,
-            'num_pages': paginator.num_pages,
-            'current_page': page,
-            'has_next': page_obj.has_next(),
-            'has_previous': page_obj.has_previous(),
-            'results': serializer.data
-        })
+        # Apply search
+        search = request.GET.get('search', '').strip()
+        if search:
+            queryset = queryset.filter(
+                Q(item_name__icontains=search) |
+                Q(vendor_name__icontains=search)
+            )
+        return queryset
 
 @extend_schema(
     description="List orders for the authenticated vendor. Supports filtering, searching, and ordering.",
@@ -308,7 +351,30 @@ class VendorOrderListView(APIView):
     permission_classes = [IsVendorOnly]
     
     def get(self, request):
-        queryset = Order.objects.select_related('user', 'menu_item').filter(vendor=request.user)
+        queryset = self._get_queryset(Order, request)
+        
+        # Historical queries also read the archive table
+        archived = []
+        if wants_archive(request):
+            archived.append(self._get_queryset(ArchivedOrder, request))
+        
+        # Apply ordering
+        ordering = request.GET.get('ordering', '-created_at')
+        valid_orderings = [
+            'created_at', '-created_at', 'total_price', '-total_price',
+            'status', '-status', 'quantity', '-quantity'
+        ]
+        
+        if ordering not in valid_orderings:
+            ordering = '-created_at'
+        
+        # Paginate results
+        return Response(paginate(queryset, request, ordering, VendorOrderSerializer, archived))
+    
+    def _get_queryset(self, model, request):
+        """Return the vendor's orders of a model, filtered and searched."""
+        # Customer contact details still come from the user row
+        queryset = model.objects.select_related('user').managed_by(request.user)
         
         # Apply filters
         status_filter = request.GET.get('status')
@@ -319,39 +385,90 @@ class VendorOrderListView(APIView):
         search = request.GET.get('search', '').strip()
         if search:
             queryset = queryset.filter(
-                Q(user__username__icontains=search) |
-                Q(menu_item__name__icontains=search) |
+                Q(customer_name__icontains=search) |
+                Q(item_name__icontains=search) |
                 Q(user__matric_number__icontains=search)
             )
+        return queryset
+
+@extend_schema(
+    description="Stream orders as CSV or NDJSON (admins: all orders, vendors: their own). "
+                "Accepts the same filters and date range as the order list.",
+    summary="Export orders",
+    responses={
+        200: OpenApiResponse(description="Streamed CSV or NDJSON export"),
+        403: OpenApiResponse(description="Forbidden"),
+        404: OpenApiResponse(description="Unknown export format")
+    }
+)
+class OrderExportView(APIView):
+    """
+    Stream orders as CSV or NDJSON without loading them all into memory.
+    """
+    permission_classes = [IsVendorOrAdmin]
+    
+    def get(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            return Response({'error': 'Unknown export format'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Apply ordering
-        ordering = request.GET.get('ordering', '-created_at')
-        valid_orderings = [
-            'created_at', '-created_at', 'total_price', '-total_price',
-            'status', '-status', 'quantity', '-quantity'
-        ]
+        querysets = [self._get_queryset(Order, request)]
+        
+        # Historical queries also read the archive table
+        if wants_archive(request):
+            querysets.append(self._get_queryset(ArchivedOrder, request))
         
-        if ordering in valid_orderings:
-            queryset = queryset.order_by(ordering)
+        content_type, stream = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(stream(export_rows(querysets)), content_type=content_type)
+        filename = f"orders-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    def _get_queryset(self, model, request):
+        """Return the filtered orders of a model the user may export, newest first."""
+        if is_admin(request.user):
+            queryset = model.objects.all()
         else:
-            queryset = queryset.order_by('-created_at')
+            queryset = model.objects.managed_by(request.user)
         
-        # Paginate results
-        page_size = int(request.GET.get('page_size', 20))
-        page = int(request.GET.get('page', 1))
+        # Apply filters
+        queryset = filter_orders(queryset, request.GET)
         
-        paginator = Paginator(queryset, page_size)
-        page_obj = paginator.get_page(page)
+        # Apply search
+        queryset = search_orders(queryset, request.GET)
         
-        serializer = VendorOrderSerializer(page_obj, many=True)
+        return queryset.order_by('-created_at', '-id')
+
+@extend_schema(
+    description="Return order events after the `since` cursor (admins: all orders, vendors: their orders, "
+                "students: their own). Pass the returned `next_cursor` as `since` to fetch later changes.",
+    summary="Order changes since cursor",
+    responses={
+        200: OpenApiResponse(response=OrderEventSerializer, description="Events after the cursor"),
+        400: OpenApiResponse(description="Invalid cursor")
+    }
+)
+class OrderChangesView(APIView):
+    """
+    Incremental sync of order changes from the append-only event log.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            since = int(request.GET.get('since', 0))
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Indexed range scan over the user's slice of the log
+        limit = get_page_size(request)
+        events = list(events_for_user(request.user).filter(id__gt=since).order_by('id')[:limit + 1])
+        has_more = len(events) > limit
+        events = events[:limit]
         
         return Response({
-            'count': paginator.count,
-            'num_pages': paginator.num_pages,
-            'current_page': page,
-            'has_next': page_obj.has_next(),
-            'has_previous': page_obj.has_previous(),
-            'results': serializer.data
+            'results': OrderEventSerializer(events, many=True).data,
+            'next_cursor': str(events[-1].id if events else since),
+            'has_more': has_more,
         })
 
 @extend_schema(
@@ -371,37 +488,16 @@ class OrderStatsView(APIView):
     def get(self, request):
         if request.user.role == 'vendor':
             # Vendor-specific stats
-            queryset = Order.objects.filter(vendor=request.user)
+            stats = get_order_stats('vendor', request.user.id)
         elif request.user.role == 'student':
             # Student-specific stats
-            queryset = Order.objects.filter(user=request.user)
+            stats = get_order_stats('student', request.user.id)
         elif request.user.role == 'admin':
             # Admin can see all stats
-            queryset = Order.objects.all()
+            stats = get_order_stats('global')
         else:
             return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Calculate stats
-        total_orders = queryset.count()
-        pending_orders = queryset.filter(status='pending').count()
-        ready_orders = queryset.filter(status='ready').count()
-        completed_orders = queryset.filter(status='completed').count()
-        cancelled_orders = queryset.filter(status='cancelled').count()
-        
-        revenue_query = queryset.filter(status__in=['ready', 'completed'])
-        total_revenue = revenue_query.aggregate(total=Sum('total_price'))['total'] or 0
-        avg_order_value = revenue_query.aggregate(avg=Avg('total_price'))['avg'] or 0
-        
-        stats = {
-            'total_orders': total_orders,
-            'pending_orders': pending_orders,
-            'ready_orders': ready_orders,
-            'completed_orders': completed_orders,
-            'cancelled_orders': cancelled_orders,
-            'total_revenue': total_revenue,
-            'avg_order_value': avg_order_value
-        }
-        
         serializer = OrderStatsSerializer(stats)
         return Response(serializer.data)
 
@@ -418,15 +514,31 @@ class OrderSearchView(APIView):
     Advanced search for orders.
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'search'
     
     def get(self, request):
+        queryset = self._get_queryset(Order, request)
+        
+        # Historical queries also read the archive table
+        archived = []
+        if wants_archive(request):
+            archived.append(self._get_queryset(ArchivedOrder, request))
+        
+        # Newest first
+        ordering = '-created_at'
+        
+        # Paginate results
+        return Response(paginate(queryset, request, ordering, OrderListSerializer, archived))
+    
+    def _get_queryset(self, model, request):
+        """Return the orders of a model matching the search parameters."""
         # Base queryset based on user role
-        if request.user.is_admin:
-            queryset = Order.objects.select_related('user', 'menu_item', 'vendor').all()
-        elif request.user.is_vendor:
-            queryset = Order.objects.select_related('user', 'menu_item').filter(vendor=request.user)
+        if is_admin(request.user):
+            queryset = model.objects.all()
+        elif getattr(request.user, 'role', None) == 'vendor':
+            queryset = model.objects.managed_by(request.user)
         else:
-            queryset = Order.objects.select_related('menu_item', 'vendor').filter(user=request.user)
+            queryset = model.objects.placed_by(request.user)
         
         # Apply filters
         query = request.GET.get('q', '').strip()
@@ -438,9 +550,9 @@ class OrderSearchView(APIView):
         # Text search
         if query:
             queryset = queryset.filter(
-                Q(user__username__icontains=query) |
-                Q(menu_item__name__icontains=query) |
-                Q(vendor__vendor_name__icontains=query) |
+                Q(customer_name__icontains=query) |
+                Q(item_name__icontains=query) |
+                Q(vendor_name__icontains=query) |
                 Q(user__matric_number__icontains=query)
             )
         
@@ -463,28 +575,9 @@ class OrderSearchView(APIView):
         
         # Vendor filter
         if vendor_name:
-            queryset = queryset.filter(vendor__vendor_name__icontains=vendor_name)
-        
-        # Order by relevance
-        queryset = queryset.order_by('-created_at')
-        
-        # Paginate results
-        page_size = int(request.GET.get('page_size', 20))
-        page = int(request.GET.get('page', 1))
-        
-        paginator = Paginator(queryset, page_size)
-        page_obj = paginator.get_page(page)
-        
-        serializer = OrderListSerializer(page_obj, many=True)
+            queryset = queryset.filter(vendor_name__icontains=vendor_name)
         
-        return Response({
-            'count': paginator.count,
-            'num_pages': paginator.num_pages,
-            'current_page': page,
-            'has_next': page_obj.has_next(),
-            'has_previous': page_obj.has_previous(),
-            'results': serializer.data
-        })
+        return queryset
 
 @extend_schema(
     description="Get recent orders for the authenticated user.",
@@ -504,20 +597,18 @@ class RecentOrdersView(APIView):
         # Get orders from last 7 days
         last_week = timezone.now() - timedelta(days=7)
         
-        if request.user.is_vendor:
-            queryset = Order.objects.select_related('user', 'menu_item').filter(
-                vendor=request.user,
+        if getattr(request.user, 'role', None) == 'vendor':
+            queryset = Order.objects.select_related('user').managed_by(request.user).filter(
                 created_at__gte=last_week
             )
             serializer_class = VendorOrderSerializer
-        elif request.user.is_student:
-            queryset = Order.objects.select_related('menu_item', 'vendor').filter(
-                user=request.user,
+        elif getattr(request.user, 'role', None) == 'student':
+            queryset = Order.objects.select_related('menu_item', 'vendor').placed_by(request.user).filter(
                 created_at__gte=last_week
             )
             serializer_class = StudentOrderSerializer
         else:
-            queryset = Order.objects.select_related('user', 'menu_item', 'vendor').filter(
+            queryset = Order.objects.filter(
                 created_at__gte=last_week
             )
             serializer_class = OrderListSerializer
@@ -526,4 +617,87 @@ class RecentOrdersView(APIView):
         queryset = queryset.order_by('-created_at')[:10]
         
         serializer = serializer_class(queryset, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+@extend_schema(
+    description="Issue a ticket for opening the order event stream with EventSource, "
+                "as ?ticket=<ticket>. Tickets expire after ORDER_EVENT_TICKET_MAX_AGE seconds "
+                "and are only accepted by the event stream.",
+    summary="Issue an order event stream ticket",
+    request=None,
+    responses={
+        200: OpenApiResponse(description="The ticket and how long it is valid, in seconds")
+    }
+)
+class OrderEventTicketView(APIView):
+    """
+    Issue a short-lived ticket for the order event stream.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        return Response({
+            'ticket': issue_stream_ticket(request.user),
+            'expires_in': settings.ORDER_EVENT_TICKET_MAX_AGE,
+        }, status=status.HTTP_200_OK)
+
+
+class OrderEventStreamView(View):
+    """
+    Stream order create and status-change events for the caller's scope as
+    Server-Sent Events: own orders for students, the order queue for vendors
+    and every order for admins.
+
+    Browsers' EventSource cannot send headers, so instead of the access token
+    it may pass a short-lived ticket from OrderEventTicketView as
+    ``?ticket=<ticket>``. Needs to be served over ASGI.
+    """
+    heartbeat_interval = 15
+    
+    def _authenticate(self, request):
+        authentication = CustomJWTAuthentication()
+        try:
+            result = authentication.authenticate(request)
+            if result is not None:
+                return result[0]
+        except (InvalidToken, AuthenticationFailed):
+            return None
+        user_id = read_stream_ticket(request.GET.get('ticket', ''))
+        if user_id is None:
+            return None
+        return UserProfile.objects.filter(pk=user_id, is_active=True).first()
+    
+    async def _stream(self, channels):
+        subscription = broker.subscribe(channels)
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+    
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            # Under WSGI every open stream would hold a worker thread forever
+            return JsonResponse(
+                {'error': 'The order event stream requires an ASGI server.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        user = await sync_to_async(self._authenticate)(request)
+        if user is None:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        
+        response = StreamingHttpResponse(self._stream(channels_for_user(user)), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -1,7 +1,14 @@
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import UntypedToken
 
+# Ids of deactivated users, so stateless authentication can refuse them without
+# loading the user. Rebuilt from the users table whenever it is missing.
+INACTIVE_USERS_KEY = 'auth:inactive-user-ids'
+
 class CustomJWTAuthentication(JWTAuthentication):
     def get_user(self, validated_token):
         user = super().get_user(validated_token)
@@ -15,3 +22,31 @@ class CustomJWTAuthentication(JWTAuthentication):
         user.vendor_name = validated_token.get('vendor_name', None)
 
         return user
+
+
+def inactive_user_ids():
+    """Return the ids of deactivated users, from the cache when possible."""
+    ids = cache.get(INACTIVE_USERS_KEY)
+    if ids is None:
+        ids = frozenset(User.objects.filter(is_active=False).values_list('id', flat=True))
+        cache.set(INACTIVE_USERS_KEY, ids, None)
+    return ids
+
+
+def forget_inactive_users():
+    """Drop the cached deactivated user ids after a user's active flag may have changed."""
+    cache.delete(INACTIVE_USERS_KEY)
+
+
+class ActiveUserStatelessAuthentication(JWTStatelessUserAuthentication):
+    """
+    Trusts the token's claims instead of loading the user, like
+    JWTStatelessUserAuthentication, but still refuses deactivated users by
+    checking a cached list of their ids.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if user.id in inactive_user_ids():
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -0,0 +1,152 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+
+def get_page_size(request):
+    """
+    Return the requested page size, clamped to the server-enforced maximum.
+    """
+    default = getattr(settings, 'DEFAULT_PAGE_SIZE', 20)
+    maximum = getattr(settings, 'MAX_PAGE_SIZE', 100)
+    try:
+        page_size = int(request.GET.get('page_size', default))
+    except (TypeError, ValueError):
+        page_size = default
+    return max(1, min(page_size, maximum))
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class CursorPaginator:
+    """
+    Keyset paginator over a queryset ordered by a single field plus the primary key.
+
+    Each page is fetched with ``WHERE (field, pk) > (last_field, last_pk)`` instead
+    of an OFFSET, so page N costs the same as page 1. Exact counts are only
+    computed when the client asks for them with ``?count=true``.
+
+    ``extra_querysets`` are paged together with the main queryset, e.g. to read
+    an archive table alongside the live one. Primary keys must be unique
+    across all of them.
+    """
+
+    def __init__(self, queryset, ordering, extra_querysets=()):
+        self.queryset = queryset
+        self.extra_querysets = list(extra_querysets)
+        self.ordering = ordering
+        self.field = ordering.lstrip('-')
+        self.descending = ordering.startswith('-')
+
+    def _ordering_field(self):
+        """Return the model field or annotation output field the pages are ordered by."""
+        try:
+            return self.queryset.model._meta.get_field(self.field)
+        except FieldDoesNotExist:
+            return self.queryset.query.annotations[self.field].output_field
+
+    def _decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            # A well-formed cursor can still carry a value of the wrong type
+            value = payload['v']
+            if value is not None:
+                value = self._ordering_field().to_python(value)
+            return value, int(payload['pk']), bool(payload.get('r', False))
+        except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError, DjangoValidationError):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+
+    def _encode_cursor(self, obj, reverse=False):
+        payload = {'v': _encode_value(getattr(obj, self.field)), 'pk': obj.pk}
+        if reverse:
+            payload['r'] = True
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def _seek(self, queryset, value, pk, descending):
+        """Filter rows strictly after (value, pk) in the given direction."""
+        op = 'lt' if descending else 'gt'
+        return queryset.filter(
+            Q(**{f'{self.field}__{op}': value}) |
+            Q(**{self.field: value, f'pk__{op}': pk})
+        )
+
+    def _order(self, queryset, descending):
+        prefix = '-' if descending else ''
+        return queryset.order_by(f'{prefix}{self.field}', f'{prefix}pk')
+
+    def fetch(self, cursor, page_size):
+        """
+        Return up to ``page_size + 1`` rows after ``cursor`` in display order
+        direction (reversed when paging backwards).
+        """
+        descending = self.descending
+        if cursor is not None and cursor[2]:
+            descending = not descending
+
+        rows = []
+        for queryset in [self.queryset, *self.extra_querysets]:
+            if cursor is not None:
+                queryset = self._seek(queryset, cursor[0], cursor[1], descending)
+            rows.extend(self._order(queryset, descending)[:page_size + 1])
+
+        if self.extra_querysets:
+            rows.sort(key=lambda obj: (getattr(obj, self.field), obj.pk), reverse=descending)
+        return rows[:page_size + 1]
+
+    def get_page(self, request, raw_cursor=None):
+        """
+        Return a dict with the page's rows and the cursors around it.
+
+        ``raw_cursor`` replaces the request's ``?cursor=`` when given.
+        """
+        page_size = get_page_size(request)
+        if raw_cursor is None:
+            raw_cursor = request.GET.get('cursor')
+        cursor = self._decode_cursor(raw_cursor) if raw_cursor else None
+        reverse = bool(cursor and cursor[2])
+
+        rows = self.fetch(cursor, page_size)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+
+        page = {
+            'object_list': rows,
+            'page_size': page_size,
+            'has_next': has_next,
+            'has_previous': has_previous,
+            'next_cursor': self._encode_cursor(rows[-1]) if has_next and rows else None,
+            'previous_cursor': self._encode_cursor(rows[0], reverse=True) if has_previous and rows else None,
+        }
+        if request.GET.get('count', 'false').lower() == 'true':
+            page['count'] = sum(queryset.count() for queryset in [self.queryset, *self.extra_querysets])
+        return page
+
+
+def paginate(queryset, request, ordering, serializer_class, extra_querysets=(), cursor=None):
+    """
+    Paginate a queryset by cursor and return the response payload for it.
+    """
+    page = CursorPaginator(queryset, ordering, extra_querysets).get_page(request, cursor)
+    serializer = serializer_class(page.pop('object_list'), many=True)
+    page['results'] = serializer.data
+    return page
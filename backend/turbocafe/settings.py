@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import os
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -33,6 +34,8 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['*']
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
 
 # Application definition
 
@@ -50,6 +53,7 @@ INSTALLED_APPS = [
     'auth',
     'menu',
     'orders',
+    'analytics',
 ]
 
 MIDDLEWARE = [
@@ -82,6 +86,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'turbocafe.wsgi.application'
 
+# The order event stream (orders/events/) is only served over ASGI, e.g. by uvicorn
+ASGI_APPLICATION = 'turbocafe.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -93,6 +100,27 @@ DATABASES = {
     }
 }
 
+# Cache holding the menu version and cached menu responses, the catalog snapshot,
+# ETA queue counters and spent stream tickets. Set REDIS_URL (redis://host:6379/0)
+# when more than one process serves requests: the local-memory fallback is per process.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Worker processes serving requests (uvicorn and gunicorn read the same variable)
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -120,6 +148,9 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'EXCEPTION_HANDLER': 'turbocafe.exceptions.custom_exception_handler',
+    'DEFAULT_THROTTLE_CLASSES': [
+        'turbocafe.throttling.RoleRateThrottle',
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
@@ -180,10 +211,78 @@ STATIC_URL = 'static/'
 MEDIA_ROOT = os.getenv('MEDIA_ROOT', str(f'{BASE_DIR}/media'))
 MEDIA_URL = '/media/'
 
+# Menu images are stored once per distinct content under media/blobs/, with
+# immutable URLs; a front proxy should send `Cache-Control: immutable` for them too
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    'menu_images': {'BACKEND': 'turbocafe.storage.ContentAddressedStorage'},
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
-FRONTEND_HOST = os.getenv('FRONTEND_HOST', 'http://localhost:5173')
\ No newline at end of file
+FRONTEND_HOST = os.getenv('FRONTEND_HOST', 'http://localhost:5173')
+
+# List endpoints use keyset pagination; clients cannot request more than MAX_PAGE_SIZE rows
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Completed and cancelled orders older than this are moved to the archive table by `manage.py archive_orders`
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv('ORDER_ARCHIVE_AFTER_DAYS', 30))
+
+# Live wait-time estimates: weight of the newest prep time sample, orders a vendor
+# prepares at once, and how long a vendor's cached queue state is trusted before a rebuild
+PREP_TIME_SMOOTHING = float(os.getenv('PREP_TIME_SMOOTHING', 0.2))
+VENDOR_PARALLEL_ORDERS = int(os.getenv('VENDOR_PARALLEL_ORDERS', 1))
+ORDER_ETA_CACHE_TIMEOUT = int(os.getenv('ORDER_ETA_CACHE_TIMEOUT', 300))
+
+# Tickets for opening the order event stream from a browser are valid for this many seconds
+ORDER_EVENT_TICKET_MAX_AGE = int(os.getenv('ORDER_EVENT_TICKET_MAX_AGE', 60))
+
+# Idempotency-Key responses are replayed for this long, then purged by `manage.py purge_idempotency_keys`
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+# A request still running after this many seconds is presumed dead, and a retry with its key runs again
+IDEMPOTENCY_CLAIM_LEASE_SECONDS = int(os.getenv('IDEMPOTENCY_CLAIM_LEASE_SECONDS', 30))
+
+# Menu search backend. The SQLite FTS5 index is created by the menu migrations;
+# use menu.search.DatabaseBackend on databases without FTS5
+MENU_SEARCH_BACKEND = os.getenv('MENU_SEARCH_BACKEND', 'menu.search.SQLiteFTSBackend')
+
+# Menu list, search and detail responses are cached until the menu changes, for at most this long.
+# Not cached when several workers would each keep a local-memory cache (see CACHES).
+MENU_RESPONSE_CACHE_TIMEOUT = int(os.getenv('MENU_RESPONSE_CACHE_TIMEOUT', 3600))
+
+# Menu images are resized to these widths (as JPEG or PNG, and WebP) by this many
+# background threads after an upload; 0 resizes inline
+MENU_IMAGE_WIDTHS = [int(width) for width in os.getenv('MENU_IMAGE_WIDTHS', '160,320,640').split(',')]
+MENU_IMAGE_WORKERS = int(os.getenv('MENU_IMAGE_WORKERS', 2))
+
+# Unreferenced image blobs younger than this are left alone by `manage.py gc_media_blobs`,
+# so uploads whose menu item is still being saved are not reclaimed
+MEDIA_BLOB_GC_GRACE_HOURS = int(os.getenv('MEDIA_BLOB_GC_GRACE_HOURS', 1))
+
+# Trending leaderboards: an order's weight halves every TRENDING_HALF_LIFE_HOURS, leaderboards are
+# cached for TRENDING_CACHE_TIMEOUT seconds and `manage.py compact_trending` drops scores below TRENDING_MIN_SCORE
+TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', 6))
+TRENDING_CACHE_TIMEOUT = int(os.getenv('TRENDING_CACHE_TIMEOUT', 60))
+TRENDING_MIN_SCORE = float(os.getenv('TRENDING_MIN_SCORE', 0.05))
+
+# Sliding-window request limits per role and endpoint class (a view's `throttle_scope`).
+# A role's `default` rate applies to views without a rate of their own; None disables throttling.
+THROTTLE_RATES = {
+    'anonymous': {'default': '60/min', 'login': '10/min'},
+    'student': {'default': '600/min', 'search': '60/min'},
+    'vendor': {'default': '1200/min', 'search': '120/min'},
+    'admin': {'default': '2400/min', 'search': '240/min'},
+}
+
+# Where throttle counters live. The in-memory default is per process; use
+# turbocafe.throttling.CacheBackend with a shared cache alias to limit across workers.
+THROTTLE_BACKEND = {
+    'BACKEND': os.getenv('THROTTLE_BACKEND', 'turbocafe.throttling.LocalMemoryBackend'),
+    'OPTIONS': {},
+}
@@ -0,0 +1,85 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.views.static import serve
+
+# Directory under the storage root that content-addressed blobs live in
+BLOB_PREFIX = 'blobs'
+
+# A blob's URL names its content, so it can be cached forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_PREFIX + '/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names every file after the SHA-256 of its
+    content, so identical uploads share one file on disk.
+
+    Uploads are streamed chunk by chunk into a temporary file while being
+    hashed, then moved into place under ``blobs/<ab>/<hash><ext>``. A blob
+    that already exists is kept and the temporary copy discarded. Blobs are
+    never overwritten or renamed, which makes their URLs immutable. Which
+    blobs are still in use is tracked outside the storage, by reference
+    counts (see menu/blobs.py).
+    """
+
+    def blob_name(self, digest, extension):
+        return f'{BLOB_PREFIX}/{digest[:2]}/{digest}{extension}'
+
+    def get_available_name(self, name, max_length=None):
+        # The final name depends on the content, decided in _save()
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        directory = self.path(BLOB_PREFIX)
+        os.makedirs(directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp.write(chunk)
+
+            blob_name = self.blob_name(digest.hexdigest(), extension)
+            full_path = self.path(blob_name)
+            if os.path.exists(full_path):
+                os.remove(temp_path)
+                # Fresh again, so garbage collection gives the new reference time to commit
+                os.utime(full_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(temp_path, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return blob_name
+
+    def iter_blobs(self):
+        """Yield the name of every stored blob."""
+        if not self.exists(BLOB_PREFIX):
+            return
+        directories, _ = self.listdir(BLOB_PREFIX)
+        for directory in directories:
+            for file_name in self.listdir(f'{BLOB_PREFIX}/{directory}')[1]:
+                if not file_name.startswith('.'):
+                    yield f'{BLOB_PREFIX}/{directory}/{file_name}'
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """Development media view that marks blobs as cacheable forever."""
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    if is_blob(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -0,0 +1,189 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+def parse_rate(rate):
+    """
+    Turn a rate like ``'30/min'`` into ``(requests, seconds)``, or None for
+    an unthrottled rate.
+    """
+    if rate is None:
+        return None
+    count, period = rate.split('/')
+    return int(count), DURATIONS[period]
+
+
+def _over_limit(previous, current, weight, limit):
+    """Whether one more request would push the sliding window estimate over the limit."""
+    return previous * weight + current + 1 > limit
+
+
+class LocalMemoryBackend:
+    """
+    Per-process throttle counters in a dict. Each key holds the counts of the
+    current and previous fixed window, which is all the sliding window
+    estimate needs, so a check is a dict lookup under a lock.
+    """
+
+    # Stale keys are swept once the table grows past this size
+    MAX_KEYS = 10000
+
+    def __init__(self, **options):
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def _counts(self, key, window):
+        entry = self._windows.get(key)
+        if entry is None:
+            return 0, 0
+        stored_window, previous, current = entry
+        if stored_window == window:
+            return previous, current
+        if stored_window == window - 1:
+            return current, 0
+        return 0, 0
+
+    def hit(self, key, window, period, limit, weight):
+        """
+        Count a request in the current window unless it would exceed
+        ``limit``, checking and counting under one lock. Returns
+        ``(allowed, previous, current)`` with the counts before the request.
+        """
+        with self._lock:
+            previous, current = self._counts(key, window)
+            if _over_limit(previous, current, weight, limit):
+                return False, previous, current
+            self._windows[key] = (window, previous, current + 1)
+            if len(self._windows) > self.MAX_KEYS:
+                self._windows = {k: v for k, v in self._windows.items() if v[0] >= window - 1}
+            return True, previous, current
+
+    def clear(self):
+        with self._lock:
+            self._windows = {}
+
+
+class CacheBackend:
+    """
+    Throttle counters in a Django cache, shared by every process using it.
+    One counter per key and fixed window, expiring after two windows.
+    """
+
+    def __init__(self, alias='default', **options):
+        self.cache = caches[alias]
+
+    def _key(self, key, window):
+        return f'throttle:{key}:{window}'
+
+    def hit(self, key, window, period, limit, weight):
+        """
+        Count a request first and take it back if it went over ``limit``.
+        Each concurrent request gets its own value from the atomic
+        add()/incr(), so no two of them can both take the last slot.
+        """
+        cache_key = self._key(key, window)
+        if self.cache.add(cache_key, 1, period * 2):
+            current = 1
+        else:
+            try:
+                current = self.cache.incr(cache_key)
+            except ValueError:
+                # Expired between add() and incr()
+                self.cache.set(cache_key, 1, period * 2)
+                current = 1
+        previous = self.cache.get(self._key(key, window - 1), 0)
+        if _over_limit(previous, current - 1, weight, limit):
+            try:
+                self.cache.decr(cache_key)
+            except ValueError:
+                pass
+            return False, previous, current - 1
+        return True, previous, current - 1
+
+    def clear(self):
+        self.cache.clear()
+
+
+_backend = None
+
+
+def get_backend():
+    """Return the configured counter backend, created on first use."""
+    global _backend
+    if _backend is None:
+        config = getattr(settings, 'THROTTLE_BACKEND', {})
+        backend_class = import_string(config.get('BACKEND', 'turbocafe.throttling.LocalMemoryBackend'))
+        _backend = backend_class(**config.get('OPTIONS', {}))
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    global _backend
+    if setting in ('THROTTLE_BACKEND', 'THROTTLE_RATES'):
+        _backend = None
+
+
+def get_role(user):
+    """Return the throttle role of a request's user."""
+    if not user or not user.is_authenticated:
+        return 'anonymous'
+    if getattr(user, 'role', None) == 'admin' or user.is_superuser:
+        return 'admin'
+    return getattr(user, 'role', None) or 'student'
+
+
+class RoleRateThrottle(BaseThrottle):
+    """
+    Sliding-window throttle with limits per role and endpoint class.
+
+    The endpoint class is the view's ``throttle_scope`` (``default`` when
+    unset) and limits come from ``settings.THROTTLE_RATES[role][scope]``,
+    falling back to the role's ``default`` rate. The request count over the
+    last period is estimated from the current and previous fixed windows,
+    weighting the previous one by how much of it still overlaps the
+    sliding window.
+    """
+
+    def allow_request(self, request, view):
+        role = get_role(request.user)
+        scope = getattr(view, 'throttle_scope', None) or 'default'
+        role_rates = getattr(settings, 'THROTTLE_RATES', {}).get(role, {})
+        rate = parse_rate(role_rates.get(scope, role_rates.get('default')))
+        if rate is None:
+            return True
+
+        self.limit, self.period = rate
+        ident = request.user.pk if request.user and request.user.is_authenticated else self.get_ident(request)
+        key = f'{role}:{scope}:{ident}'
+
+        now = time.time()
+        window = int(now // self.period)
+        self.elapsed = now - window * self.period
+        weight = 1 - self.elapsed / self.period
+        allowed, self.previous, self.current = get_backend().hit(key, window, self.period, self.limit, weight)
+        return allowed
+
+    def wait(self):
+        """Seconds until the sliding window estimate drops below the limit."""
+        if self.limit <= 0:
+            # A zero rate blocks the endpoint outright; check back next window
+            seconds = self.period - self.elapsed
+        elif self.current >= self.limit:
+            # Wait for the next window, then for this one's weight to decay
+            seconds = (self.period - self.elapsed) + self.period * (1 - (self.limit - 1) / self.current)
+        else:
+            # The previous window's weight has to decay enough
+            needed = 1 - (self.limit - 1 - self.current) / self.previous
+            seconds = self.period * needed - self.elapsed
+        return max(1, math.ceil(seconds))
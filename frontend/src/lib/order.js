@@ -1,9 +1,23 @@
 import { api } from "./api"
 
+// Send a state-changing request under one Idempotency-Key, retrying when the
+// network drops it so the server can replay the first response instead of
+// running the request twice
+const sendIdempotent = async (method, url, data, retries = 2) => {
+  const headers = { "Idempotency-Key": crypto.randomUUID() }
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await api.request({ method, url, data, headers })
+    } catch (error) {
+      if (error.response || attempt >= retries) throw error
+    }
+  }
+}
+
 // Create new order (students only)
 const createOrder = async (menu_item, quantity) => {
   try {
-    const response = await api.post("/orders/create/", {
+    const response = await sendIdempotent("post", "/orders/create/", {
       menu_item,
       quantity,
     })
@@ -14,6 +28,35 @@ const createOrder = async (menu_item, quantity) => {
   }
 }
 
+// Flatten DRF validation errors (strings, lists, or per-item objects) into messages
+const collectErrors = (value) => {
+  if (!value) return []
+  if (typeof value === "string") return [value]
+  if (Array.isArray(value)) return value.flatMap(collectErrors)
+  if (typeof value === "object") return Object.values(value).flatMap(collectErrors)
+  return []
+}
+
+// Checkout rejects the cart under `items` (stock, availability, duplicates) or `detail`
+const checkoutErrorMessage = (data) => {
+  const messages = collectErrors(data?.items)
+  if (messages.length) return messages.join(" ")
+  return data?.detail || data?.message || data?.error || "Failed to place order"
+}
+
+// Place every cart item as one checkout (students only)
+const checkout = async (items) => {
+  try {
+    const response = await sendIdempotent("post", "/orders/checkout/", {
+      items,
+    })
+    return response.data
+  } catch (error) {
+    console.error("Error checking out:", error)
+    throw new Error(checkoutErrorMessage(error.response?.data))
+  }
+}
+
 // Get all orders (admin) or user's own orders
 const getAllOrders = async () => {
   try {
@@ -39,7 +82,7 @@ const getOrderDetails = async (id) => {
 // Cancel order (order owners only)
 const cancelOrder = async (id) => {
   try {
-    const response = await api.patch(`/orders/${id}/cancel/`, {
+    const response = await sendIdempotent("patch", `/orders/${id}/cancel/`, {
       status: "cancelled"
     })
     return response.data
@@ -52,7 +95,7 @@ const cancelOrder = async (id) => {
 // Update order status (vendors only)
 const updateOrderStatus = async (id, status) => {
   try {
-    const response = await api.patch(`/orders/${id}/update-status/`, {
+    const response = await sendIdempotent("patch", `/orders/${id}/update-status/`, {
       status,
     })
     return response.data
@@ -117,8 +160,51 @@ const getVendorOrders = async () => {
   }
 }
 
+// Subscribe to live order events for the current user (Server-Sent Events).
+// EventSource cannot send the access token, so every connection opens with a
+// fresh short-lived ticket; on errors the stream reconnects with a new one.
+const subscribeToOrderEvents = (onEvent) => {
+  let source = null
+  let retryTimer = null
+  let closed = false
+  const handler = (message) => onEvent(JSON.parse(message.data))
+
+  const connect = async () => {
+    try {
+      const response = await api.post("/orders/events/ticket/")
+      if (closed) return
+      const url = new URL("orders/events/", api.defaults.baseURL)
+      url.searchParams.set("ticket", response.data.ticket)
+
+      source = new EventSource(url)
+      source.addEventListener("order.created", handler)
+      source.addEventListener("order.status_changed", handler)
+      source.onerror = () => {
+        source.close()
+        reconnect()
+      }
+    } catch (error) {
+      console.error("Error opening order event stream:", error)
+      reconnect()
+    }
+  }
+
+  const reconnect = () => {
+    if (!closed) retryTimer = setTimeout(connect, 3000)
+  }
+
+  connect()
+
+  return () => {
+    closed = true
+    clearTimeout(retryTimer)
+    if (source) source.close()
+  }
+}
+
 export {
   createOrder,
+  checkout,
   getAllOrders,
   getOrderDetails,
   cancelOrder,
@@ -128,4 +214,5 @@ export {
   getOrderStats,
   getStudentOrders,
   getVendorOrders,
+  subscribeToOrderEvents,
 }
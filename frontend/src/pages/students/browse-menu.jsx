@@ -15,6 +15,14 @@ export default function BrowseMenu({ cart, onAddToCart, onGoToCart }) {
     fetchMenuItems()
   }, [])
 
+  // Resized variants as an <img> srcset, e.g. "/media/...-160w.webp 160w, ..."
+  const toSrcSet = (variants) =>
+    variants
+      ? Object.entries(variants)
+          .map(([width, url]) => `${mediaBaseUrl}${url} ${width}`)
+          .join(", ")
+      : undefined
+
   const fetchMenuItems = async () => {
     try {
       setLoading(true)
@@ -28,6 +36,7 @@ export default function BrowseMenu({ cart, onAddToCart, onGoToCart }) {
           price: Number.parseFloat(item.price),
           waitTime: `${item.wait_time_low}-${item.wait_time_high} mins`,
           image: `${mediaBaseUrl}${item.image}`,
+          imageSrcSet: toSrcSet(item.image_variants?.webp),
           description: item.description || "Delicious food item",
           vendor: item.vendor_name,
           available: item.available,
@@ -135,6 +144,8 @@ export default function BrowseMenu({ cart, onAddToCart, onGoToCart }) {
             <div className="relative overflow-hidden">
               <img
                 src={item.image || "/placeholder.svg"}
+                srcSet={item.imageSrcSet}
+                sizes="(min-width: 1280px) 25vw, (min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw"
                 alt={item.name}
                 className="w-full h-48 sm:h-40 lg:h-48 object-cover group-hover:scale-105 transition-transform duration-300"
               />
@@ -2,7 +2,7 @@
 
 import { ShoppingBag, ArrowLeft, Plus, Minus, Trash2, Loader2 } from "lucide-react"
 import { useState } from "react"
-import { createOrder } from "@lib/order"
+import { checkout } from "@lib/order"
 
 export default function CartPage({ cart, onRemoveFromCart, onContinueShopping, onOrderPlaced }) {
   const [quantities, setQuantities] = useState({})
@@ -26,10 +26,8 @@ export default function CartPage({ cart, onRemoveFromCart, onContinueShopping, o
       setPlacingOrder(true)
       setError(null)
 
-      // Create orders for each item in cart
-      const orderPromises = cart.map((item) => createOrder(item.id, getItemQuantity(item.id)))
-
-      await Promise.all(orderPromises)
+      // Place the whole cart in a single checkout request
+      await checkout(cart.map((item) => ({ menu_item: item.id, quantity: getItemQuantity(item.id) })))
 
       // Clear cart and redirect to orders page
       cart.forEach((item) => onRemoveFromCart(item.id))
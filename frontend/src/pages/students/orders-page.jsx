@@ -2,7 +2,7 @@
 
 import { useState, useEffect } from "react"
 import { Clock, Package, CheckCircle, XCircle, Phone, Loader2, RefreshCw } from "lucide-react"
-import { getStudentOrders, cancelOrder } from "@lib/order"
+import { getStudentOrders, cancelOrder, subscribeToOrderEvents } from "@lib/order"
 
 export default function OrdersPage() {
   const [orders, setOrders] = useState([])
@@ -15,6 +15,19 @@ export default function OrdersPage() {
     fetchOrders()
   }, [])
 
+  // Apply pushed status changes instead of re-fetching the order list
+  useEffect(() => {
+    return subscribeToOrderEvents((event) => {
+      if (event.type === "order.created") {
+        fetchOrders()
+        return
+      }
+      setOrders((prev) =>
+        prev.map((order) => (order.id === event.order.id ? { ...order, status: event.order.status } : order))
+      )
+    })
+  }, [])
+
   const fetchOrders = async () => {
     try {
       setLoading(true)
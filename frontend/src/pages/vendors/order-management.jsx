@@ -2,7 +2,7 @@
 
 import { useState, useEffect } from "react"
 import { Clock, Phone, CheckCircle, Package, User, Loader2, RefreshCw } from "lucide-react"
-import { getVendorOrders, updateOrderStatus } from "@lib/order"
+import { getVendorOrders, updateOrderStatus, subscribeToOrderEvents } from "@lib/order"
 
 export default function OrderManagement() {
   const [orders, setOrders] = useState([])
@@ -16,6 +16,19 @@ export default function OrderManagement() {
     fetchOrders()
   }, [])
 
+  // New orders are fetched in full, status changes are applied in place
+  useEffect(() => {
+    return subscribeToOrderEvents((event) => {
+      if (event.type === "order.created") {
+        fetchOrders()
+        return
+      }
+      setOrders((prev) =>
+        prev.map((order) => (order.id === event.order.id ? { ...order, status: event.order.status } : order))
+      )
+    })
+  }, [])
+
   const fetchOrders = async () => {
     try {
       setLoading(true)